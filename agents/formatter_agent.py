@@ -1,3 +1,9 @@
+from services.sections import section_hash
+from services.plan_signature import SIGNATURE_FIELD, sign_plan
+
+formatter_stats = {"sections_formatted": 0, "sections_reused": 0}
+
+
 def apply_adaptive_pacing(curriculum: dict, learner_profile: dict):
 
     if not learner_profile:
@@ -19,16 +25,27 @@ def apply_adaptive_pacing(curriculum: dict, learner_profile: dict):
     return curriculum
 
 
-async def inject_video_links(curriculum: dict):
+def _already_formatted(section, formatted_sections) -> bool:
+    if formatted_sections and section_hash(section) in formatted_sections:
+        formatter_stats["sections_reused"] += 1
+        return True
+    formatter_stats["sections_formatted"] += 1
+    return False
+
+
+async def inject_video_links(curriculum: dict, formatted_sections=None):
     """
     Traverse curriculum and inject video links for all topics.
     Supports both semester and personal planner modes.
+    Sections whose hash is in `formatted_sections` are skipped.
     """
     from services.video_service import get_video_link
     
     # ===== SEMESTER MODE =====
     if curriculum.get("semesters"):
         for semester in curriculum["semesters"]:
+            if _already_formatted(semester, formatted_sections):
+                continue
             for course in semester.get("courses", []):
                 topics = course.get("topics", [])
                 # Handle both list of strings and list of dicts
@@ -52,6 +69,8 @@ async def inject_video_links(curriculum: dict):
     # ===== PERSONAL PLANNER MODE =====
     if curriculum.get("roadmap"):
         for phase in curriculum["roadmap"]:
+            if _already_formatted(phase, formatted_sections):
+                continue
             for milestone in phase.get("milestones", []):
                 topics = milestone.get("topics", [])
                 processed_topics = []
@@ -74,11 +93,14 @@ async def inject_video_links(curriculum: dict):
     return curriculum
 
 
-async def formatter_agent(curriculum: dict, validation: dict):
+async def formatter_agent(curriculum: dict, validation: dict, formatted_sections=None):
     """
     Format and validate curriculum output.
     Ensures correct structure for frontend rendering.
     Injects video links for all topics.
+    Signs the result (validation_signature) over its content and validation.
+    `formatted_sections` holds the section hashes of the stored version a
+    refinement started from; sections still matching one are kept as is.
     """
     
     # ===== MERGE CURRICULUM WITH VALIDATION =====
@@ -103,6 +125,10 @@ async def formatter_agent(curriculum: dict, validation: dict):
     )
     
     # ===== 🎥 Inject Video Links =====
-    formatted = await inject_video_links(formatted)
+    formatted = await inject_video_links(formatted, formatted_sections)
+
+    # ===== 🔏 Sign the formatted plan =====
+    # lets /export-pdf render it as is when it comes back unchanged
+    formatted[SIGNATURE_FIELD] = sign_plan(formatted)
     
     return formatted
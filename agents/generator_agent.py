@@ -1,4 +1,19 @@
+import os
+import asyncio
+
 from services.llm_client import call_llm
+from services.request_context import DeadlineExceeded
+from services.logger import get_logger
+from models.schemas import (
+    SemesterSkeleton, SemesterSection, SemesterCurriculum,
+    RoadmapSkeleton, Phase, RoadmapCurriculum,
+)
+
+logger = get_logger("generator_agent")
+
+# Skeleton first, then every semester / roadmap phase concurrently.
+# Set GENERATOR_FANOUT=false to go back to one whole-program call.
+GENERATOR_FANOUT = os.getenv("GENERATOR_FANOUT", "true").lower() in ("1", "true", "yes")
 
 
 # =====================================================
@@ -262,10 +277,302 @@ CONSTRAINTS
 
 
 
+# =====================================================
+# 🧩 FAN-OUT PROMPTS (skeleton → sections)
+# =====================================================
+SEMESTER_SKELETON_PROMPT = """
+You are an advanced academic curriculum architect.
+
+Goal:
+Design the SKELETON of a semester-wise program from the planner output.
+Do NOT write course details yet — only the outline that section writers will expand.
+
+Rules:
+- Respect the semester count strictly.
+- Semester 1 = Beginner, middle semesters = Intermediate, final semesters = Advanced + Industry-ready.
+- Use courses_per_semester course titles per semester; titles must not repeat across semesters.
+- Align course titles with focus_tags.
+- If include_capstone = true, the final semester MUST contain a Major Capstone Project and an Industry Immersion / Internship style course.
+
+Return ONLY valid JSON.
+
+{
+  "program_title": "",
+  "summary": "",
+  "semesters": [
+    {
+      "semester": 1,
+      "theme": "",
+      "difficulty": "Beginner",
+      "course_titles": []
+    }
+  ]
+}
+"""
+
+SEMESTER_SECTION_PROMPT = """
+You are an advanced academic curriculum architect.
+
+You receive the planner output (`plan`), the program skeleton (`skeleton`)
+and the number of ONE semester to write (`semester`).
+
+Write ONLY that semester. Expand every course title listed for it in the
+skeleton, in the same order, keeping the skeleton's difficulty.
+
+Each course MUST include:
+- title (exactly as in the skeleton)
+- difficulty (Beginner / Intermediate / Advanced)
+- skills (2-4 real abilities gained)
+- topics (learning content; do not repeat topics from other semesters' course titles)
+- outcome_project (mini practical deliverable)
+
+Courses must feel industry-relevant. Avoid generic topic dumping.
+
+Return ONLY valid JSON.
+
+{
+  "semester": 1,
+  "courses": [
+    {
+      "title": "",
+      "difficulty": "Beginner",
+      "skills": [],
+      "topics": [
+        {
+          "name": "",
+          "video_url": ""
+        }
+      ],
+      "outcome_project": ""
+    }
+  ]
+}
+"""
+
+PERSONAL_SKELETON_PROMPT = """You are an expert AI Learning Path Coach specialized in time-bounded curriculum design.
+
+Design the SKELETON of a learning roadmap from the learner inputs.
+Do NOT write milestone details yet — only the phase outline.
+
+Duration-to-weeks: 3 Months = 12, 6 Months = 24, 9 Months = 36, 12 Months = 48.
+Pace: Fast → reduce timeline by 20%, Moderate → base, Slow → extend by 30%.
+
+Rules:
+- 3 phases maximum (Foundation, Advanced, Mastery).
+- 2-3 milestone titles per phase, showing real progress jumps (Beginner → Applied → Production).
+- Phase `duration_weeks` must sum to `total_weeks`; `weeks` ranges must be sequential.
+- Adapt to learner_profile (persona_type, pacing_strategy, difficulty_preference).
+
+Return ONLY valid JSON.
+
+{
+  "program_title": "",
+  "summary": "",
+  "total_weeks": 24,
+  "weekly_hours": 15,
+  "roadmap": [
+    {
+      "phase": "",
+      "duration_weeks": 6,
+      "weeks": "Week 1-6",
+      "milestone_titles": []
+    }
+  ]
+}
+"""
+
+PERSONAL_PHASE_PROMPT = """You are an expert AI Learning Path Coach specialized in time-bounded curriculum design.
+
+You receive the learner inputs (`program`), the roadmap skeleton (`skeleton`)
+and the number of ONE phase to write (`phase_number`, 1-based).
+
+Write ONLY that phase. Expand every milestone title listed for it in the
+skeleton, in the same order, within the phase's week range.
+
+For EVERY milestone include:
+- title (exactly as in the skeleton)
+- timeline_weeks (sequential, inside the phase's weeks)
+- estimated_total_hours (consistent with weekly_hours)
+- skills (practical abilities the learner can DO after)
+- topics (3-4, chronological, each with name, estimated_hours, weeks)
+- certification (ONLY when a realistic one from Google, AWS, Microsoft, NVIDIA,
+  DeepLearning.AI, Meta or IBM fits the milestone's level; otherwise omit the field)
+
+Use concise descriptions (1-2 sentences max). No commentary.
+
+Return ONLY valid JSON.
+
+{
+  "phase": "",
+  "duration_weeks": 6,
+  "weeks": "Week 1-6",
+  "milestones": [
+    {
+      "title": "",
+      "timeline_weeks": "Week 1-3",
+      "estimated_total_hours": 18,
+      "skills": [],
+      "topics": [
+        {
+          "name": "",
+          "estimated_hours": 6,
+          "weeks": "Week 1-2",
+          "video_url": ""
+        }
+      ],
+      "certification": {
+        "name": "",
+        "provider": "",
+        "reason": ""
+      }
+    }
+  ]
+}
+"""
+
+
+def _unwrap_section(section, list_key: str, item_key: str):
+    """Models sometimes wrap a single section in the whole-program shape."""
+    if isinstance(section, dict) and item_key not in section and section.get(list_key):
+        section = section[list_key][0]
+    if not isinstance(section, dict) or not isinstance(section.get(item_key), list):
+        raise Exception(f"Section is missing '{item_key}'")
+    return section
+
+
+async def _emit(on_event, event: str, payload: dict):
+    if on_event is not None:
+        await on_event(event, payload)
+
+
+def _program_fields(plan: dict) -> dict:
+    """Top-level fields generator_agent adds to every result."""
+    if plan.get("planner_type") == "personal":
+        return {"planner_type": "personal"}
+    fields = {"planner_type": "semester"}
+    if plan.get("include_capstone"):
+        fields["include_capstone"] = plan["include_capstone"]
+    return fields
+
+
+async def _gather_sections(coros: list) -> list:
+    """
+    Results of the section calls, in order. The first failure cancels the
+    sections still running — the whole-program fallback replaces them, so
+    they would only spend provider quota — and is raised.
+    """
+    tasks = [asyncio.ensure_future(coro) for coro in coros]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        for task in tasks:
+            if task.done() and not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+        return [task.result() for task in tasks]
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def _generate_semesters_fanout(plan: dict, on_event=None):
+    skeleton = await call_llm(SEMESTER_SKELETON_PROMPT, plan, schema=SemesterSkeleton)
+    outline = skeleton.get("semesters") if isinstance(skeleton, dict) else None
+    if not outline:
+        raise Exception("Skeleton has no semesters")
+
+    logger.info("Skeleton ready: %d semesters — generating concurrently", len(outline))
+    # the skeleton event carries every top-level field of the finished
+    # curriculum, so section reviews can start before it is assembled
+    await _emit(on_event, "skeleton", {
+        "kind": "semester",
+        "program_title": skeleton.get("program_title", ""),
+        "summary": skeleton.get("summary", ""),
+        **_program_fields(plan),
+        "total": len(outline),
+    })
+
+    async def write_semester(idx: int, entry: dict):
+        number = entry.get("semester", idx + 1)
+        section = await call_llm(SEMESTER_SECTION_PROMPT, {
+            "plan": plan,
+            "skeleton": skeleton,
+            "semester": number,
+        }, schema=SemesterSection)
+        section = _unwrap_section(section, "semesters", "courses")
+        semester = {
+            "semester": number,
+            "courses": section["courses"],
+        }
+        await _emit(on_event, "section", {"kind": "semester", "index": idx, "total": len(outline), "section": semester})
+        return semester
+
+    semesters = await _gather_sections([
+        write_semester(idx, entry) for idx, entry in enumerate(outline)
+    ])
+
+    return {
+        "program_title": skeleton.get("program_title", ""),
+        "summary": skeleton.get("summary", ""),
+        "semesters": list(semesters),
+    }
+
+
+async def _generate_roadmap_fanout(plan: dict, on_event=None):
+    skeleton = await call_llm(PERSONAL_SKELETON_PROMPT, plan, schema=RoadmapSkeleton)
+    outline = skeleton.get("roadmap") if isinstance(skeleton, dict) else None
+    if not outline:
+        raise Exception("Skeleton has no roadmap phases")
+
+    logger.info("Skeleton ready: %d phases — generating concurrently", len(outline))
+    await _emit(on_event, "skeleton", {
+        "kind": "phase",
+        "program_title": skeleton.get("program_title", ""),
+        "summary": skeleton.get("summary", ""),
+        "total_weeks": skeleton.get("total_weeks"),
+        "weekly_hours": skeleton.get("weekly_hours", plan.get("weekly_hours")),
+        **_program_fields(plan),
+        "total": len(outline),
+    })
+
+    async def write_phase(idx: int, entry: dict):
+        section = await call_llm(PERSONAL_PHASE_PROMPT, {
+            "program": plan,
+            "skeleton": skeleton,
+            "phase_number": idx + 1,
+        }, schema=Phase)
+        section = _unwrap_section(section, "roadmap", "milestones")
+        # the skeleton owns the timeline so phases stay sequential
+        phase = {
+            "phase": entry.get("phase", section.get("phase", "")),
+            "duration_weeks": entry.get("duration_weeks", section.get("duration_weeks")),
+            "weeks": entry.get("weeks", section.get("weeks")),
+            "milestones": section["milestones"],
+        }
+        await _emit(on_event, "section", {"kind": "phase", "index": idx, "total": len(outline), "section": phase})
+        return phase
+
+    roadmap = await _gather_sections([
+        write_phase(idx, entry) for idx, entry in enumerate(outline)
+    ])
+
+    return {
+        "program_title": skeleton.get("program_title", ""),
+        "summary": skeleton.get("summary", ""),
+        "total_weeks": skeleton.get("total_weeks"),
+        "weekly_hours": skeleton.get("weekly_hours", plan.get("weekly_hours")),
+        "roadmap": list(roadmap),
+    }
+
+
 # =====================================================
 # 🚀 GENERATOR AGENT (DUAL MODE)
 # =====================================================
-async def generator_agent(plan: dict):
+async def generator_agent(plan: dict, on_event=None):
+    """
+    Generate the full curriculum for a planner output.
+    `on_event(event, payload)` (optional, async) receives the skeleton and
+    each semester / phase as soon as it is ready, and `reset` when a failed
+    fan-out falls back to one call that sends every section again.
+    """
 
     # -------------------------------------------------
     # Detect planner type safely
@@ -277,31 +584,51 @@ async def generator_agent(plan: dict):
     # -------------------------------------------------
     if planner_type == "personal":
       system_prompt = PERSONAL_GENERATOR_PROMPT
-      from services.logger import get_logger
-      logger = get_logger("generator_agent")
       logger.info("Generator Mode: PERSONAL PLANNER")
     else:
       system_prompt = SEMESTER_GENERATOR_PROMPT
-      from services.logger import get_logger
-      logger = get_logger("generator_agent")
       logger.info("Generator Mode: SEMESTER PLANNER")
 
     # -------------------------------------------------
-    # Call LLM
+    # Fan-out: skeleton, then sections in parallel
+    # -------------------------------------------------
+    result = None
+    if GENERATOR_FANOUT:
+        try:
+            if planner_type == "personal":
+                result = await _generate_roadmap_fanout(plan, on_event)
+            else:
+                result = await _generate_semesters_fanout(plan, on_event)
+        except DeadlineExceeded:
+            # no time left for a whole-program call either
+            raise
+        except Exception as e:
+            logger.warning("Fan-out generation failed (%s) — falling back to a single call", e)
+            result = None
+            # the fallback streams every section again: drop what was shown
+            await _emit(on_event, "reset", {"reason": str(e)})
+
+    # -------------------------------------------------
+    # Call LLM (whole program in one response)
     # -------------------------------------------------
-    result = await call_llm(system_prompt, plan)
+    if result is None:
+        # stream the reply and forward each semester / phase as it closes
+        async def forward_section(path, item):
+            if len(path) == 2 and path[0] in ("semesters", "roadmap"):
+                kind = "semester" if path[0] == "semesters" else "phase"
+                await _emit(on_event, "section", {"kind": kind, "index": path[1], "total": None, "section": item})
+
+        on_item = forward_section if on_event is not None else None
+
+        schema = RoadmapCurriculum if planner_type == "personal" else SemesterCurriculum
+        result = await call_llm(system_prompt, plan, on_item=on_item, schema=schema)
 
     # -------------------------------------------------
     # Preserve context for personal planner mode
     # -------------------------------------------------
-    if planner_type == "personal":
-        if plan.get("learner_profile"):
-            result["learner_profile"] = plan["learner_profile"]
-        result["planner_type"] = "personal"
-    else:
-        result["planner_type"] = "semester"
-        if plan.get("include_capstone"):
-            result["include_capstone"] = plan["include_capstone"]
+    if planner_type == "personal" and plan.get("learner_profile"):
+        result["learner_profile"] = plan["learner_profile"]
+    result.update(_program_fields(plan))
 
     # -------------------------------------------------
     # Safety Guard (prevents UI crash)
@@ -1,4 +1,9 @@
 from services.llm_client import call_llm
+from services.learner_profiles import lookup_learner_profile, table_version
+from services.logger import get_logger
+from models.schemas import LearnerProfile
+
+logger = get_logger("personal_planner_agent")
 
 PERSONAL_PLANNER_PROMPT = """
 You are an AI Learner Persona Architect.
@@ -46,5 +51,12 @@ Return STRICT JSON:
 """
 
 async def personal_planner_agent(data: dict):
-    result = await call_llm(PERSONAL_PLANNER_PROMPT, data)
+    # Enumerated form inputs map deterministically — no LLM round-trip needed
+    profile = lookup_learner_profile(data)
+    if profile is not None:
+        logger.info("Learner profile from table v%s", table_version())
+        return profile
+
+    logger.info("Learner profile not in table — asking the LLM")
+    result = await call_llm(PERSONAL_PLANNER_PROMPT, data, schema=LearnerProfile)
     return result
@@ -1,4 +1,5 @@
 from services.llm_client import call_llm
+from models.schemas import PlannerOutput
 
 
 
@@ -34,7 +35,8 @@ async def planner_agent(user_input: dict):
 
     result = await call_llm(
         PLANNER_SYSTEM_PROMPT,
-        user_input
+        user_input,
+        schema=PlannerOutput
     )
 
     return result
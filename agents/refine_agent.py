@@ -1,7 +1,20 @@
-import json
+import os
+import re
 from typing import Dict, Any
 
 from services.llm_client import call_llm
+from services.json_patch import apply_patch
+from services.request_context import DeadlineExceeded
+from services.logger import get_logger
+from models.schemas import RefinedPlan, RefinePatch
+
+logger = get_logger("refine_agent")
+
+# patch — the model returns JSON Patch ops for the sections it changes
+# full  — the model re-emits the whole plan
+REFINE_MODE = os.getenv("REFINE_MODE", "patch").lower()
+
+refine_stats = {"patch": 0, "full": 0, "fallbacks": 0, "ops_applied": 0}
 
 
 PERSONAL_REFINE_PROMPT = """
@@ -65,9 +78,148 @@ Output: Return the full refined JSON object (no wrappers, no text).
 """
 
 
+REFINE_PATCH_PROMPT = """
+You are an AI curriculum refinement assistant.
+
+You receive:
+- `refinement_instruction`: what the user wants changed (plain English).
+- `program`: the plan's top-level fields.
+- `outline`: every semester / phase with its course or milestone titles (context only).
+- `sections`: the full content of the sections to work on, each with its JSON Pointer `path`.
+
+Return ONLY the changes, as JSON Patch operations:
+
+{
+    "ops": [
+        {"op": "replace", "path": "/semesters/2", "value": {"semester": 3, "courses": []}},
+        {"op": "replace", "path": "/semesters/2/courses/1/outcome_project", "value": ""},
+        {"op": "add", "path": "/semesters/2/courses/-", "value": {"title": "", "difficulty": "", "skills": [""], "topics": [""], "outcome_project": ""}},
+        {"op": "remove", "path": "/semesters/2/courses/0"},
+        {"op": "replace", "path": "/summary", "value": ""}
+    ]
+}
+
+Rules:
+- Paths are JSON Pointers into the full plan. List indexes are 0-based; the `path` given for each section is authoritative.
+- Use the smallest ops that carry out the instruction. NEVER re-emit sections or fields that do not change.
+- Added or replaced courses keep the full course shape: title, difficulty, skills (2-4), topics, outcome_project.
+- Added or replaced milestones keep: title, timeline_weeks, estimated_total_hours, skills, topics.
+- Roadmaps: if a phase's `duration_weeks` changes, also update its `weeks`, the `weeks` of later phases and `/total_weeks`, so phase durations still sum to total_weeks.
+- Do NOT add explanations, commentary, or markdown — return ONLY the JSON object with "ops".
+"""
+
+_ORDINALS = {
+    "first": 1, "second": 2, "third": 3, "fourth": 4, "fifth": 5,
+    "sixth": 6, "seventh": 7, "eighth": 8, "ninth": 9, "tenth": 10,
+}
+# "semester 3", "semesters 2 and 4", "phases 1-3", "semester 2, 3 & 5"
+_NUMBERED_REF = re.compile(r"\b(semester|phase)s?\s+(\d+(?:\s*(?:,|and|&|or|to|-|–)\s*\d+)*)", re.I)
+_ORDINAL_REF = re.compile(r"\b(first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|tenth|last|final)\s+(semester|phase)\b", re.I)
+
+
+def _referenced_sections(plan: dict, list_key: str, instruction: str):
+    """
+    Indexes of the semesters / phases an instruction refers to, by number
+    ("semester 3", "phases 1-2"), ordinal ("the last phase") or by naming
+    one of their courses / milestones. Empty when nothing specific is named.
+    """
+    sections = plan.get(list_key) or []
+    kind = "semester" if list_key == "semesters" else "phase"
+    numbers = set()
+
+    for m in _NUMBERED_REF.finditer(instruction):
+        if m.group(1).lower() != kind:
+            continue
+        parts = re.split(r"\s*(,|and|&|or|to|-|–)\s*", m.group(2))
+        previous, joiner = None, None
+        for part in parts:
+            if part.isdigit():
+                n = int(part)
+                if previous is not None and joiner in ("to", "-", "–"):
+                    numbers.update(range(previous, n + 1))
+                numbers.add(n)
+                previous = n
+            else:
+                joiner = part.lower()
+
+    for m in _ORDINAL_REF.finditer(instruction):
+        if m.group(2).lower() == kind:
+            word = m.group(1).lower()
+            numbers.add(len(sections) if word in ("last", "final") else _ORDINALS[word])
+
+    indexes = set()
+    for n in numbers:
+        if kind == "semester":
+            match = next((i for i, s in enumerate(sections) if s.get("semester") == n), None)
+            indexes.add(match if match is not None else n - 1)
+        else:
+            indexes.add(n - 1)
+
+    # a course / milestone named verbatim pins its section
+    lowered = instruction.lower()
+    child_key = "courses" if kind == "semester" else "milestones"
+    for i, section in enumerate(sections):
+        for child in section.get(child_key) or []:
+            title = (child.get("title") or "").strip().lower()
+            if len(title) > 3 and title in lowered:
+                indexes.add(i)
+
+    return sorted(i for i in indexes if 0 <= i < len(sections))
+
+
+def _outline(plan: dict, list_key: str):
+    if list_key == "semesters":
+        return [
+            {"semester": s.get("semester"), "courses": [c.get("title") for c in s.get("courses") or []]}
+            for s in plan.get("semesters") or []
+        ]
+    return [
+        {
+            "phase": p.get("phase"),
+            "duration_weeks": p.get("duration_weeks"),
+            "weeks": p.get("weeks"),
+            "milestones": [m.get("title") for m in p.get("milestones") or []],
+        }
+        for p in plan.get("roadmap") or []
+    ]
+
+
+async def _refine_with_patch(current_plan: Dict[str, Any], instruction: str) -> Dict[str, Any]:
+    list_key = "roadmap" if current_plan.get("roadmap") else "semesters"
+    sections = current_plan.get(list_key) or []
+    if not sections:
+        raise Exception(f"Plan has no '{list_key}' to patch")
+
+    # send only the sections the instruction names; all of them when it names none
+    indexes = _referenced_sections(current_plan, list_key, instruction) or list(range(len(sections)))
+    payload = {
+        "refinement_instruction": instruction,
+        "program": {
+            k: v for k, v in current_plan.items()
+            if k != list_key and not k.startswith("validation_")
+        },
+        "outline": _outline(current_plan, list_key),
+        "sections": [{"path": f"/{list_key}/{i}", "value": sections[i]} for i in indexes],
+    }
+
+    patch = await call_llm(REFINE_PATCH_PROMPT, payload, schema=RefinePatch)
+    ops = patch["ops"]
+    refined = apply_patch(current_plan, ops)
+    # the patched plan must still be a complete plan
+    RefinedPlan.model_validate(refined)
+
+    refine_stats["patch"] += 1
+    refine_stats["ops_applied"] += len(ops)
+    logger.info("Refined with %d patch ops (%d of %d sections sent)", len(ops), len(indexes), len(sections))
+    return refined
+
+
 async def refine_agent(current_plan: Dict[str, Any], instruction: str) -> Dict[str, Any]:
     """Call the LLM to refine an existing curriculum plan.
 
+    In patch mode (default) the model returns JSON Patch ops for just the
+    sections it changes; if that fails the whole plan is rewritten.
+
     Args:
         current_plan: The curriculum JSON previously generated.
         instruction: Natural language instruction describing the refinement.
@@ -76,6 +228,15 @@ async def refine_agent(current_plan: Dict[str, Any], instruction: str) -> Dict[s
         The refined curriculum JSON (parsed).
     """
 
+    if REFINE_MODE == "patch" and isinstance(current_plan, dict):
+        try:
+            return await _refine_with_patch(current_plan, instruction)
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            refine_stats["fallbacks"] += 1
+            logger.warning("Patch refinement failed (%s) — falling back to a full rewrite", e)
+
     # Align with other agents: merge instruction into the plan dict so
     # the LLM receives a flat, predictable payload (same style as generator_agent)
     payload = {}
@@ -89,10 +250,11 @@ async def refine_agent(current_plan: Dict[str, Any], instruction: str) -> Dict[s
     payload["refinement_instruction"] = instruction
 
     # call_llm will raise if providers fail; let caller handle exceptions
-    result = await call_llm(PERSONAL_REFINE_PROMPT, payload)
+    result = await call_llm(PERSONAL_REFINE_PROMPT, payload, schema=RefinedPlan)
 
     # Ensure result is a dict
     if not isinstance(result, dict):
         raise Exception("Refine agent returned invalid format")
 
+    refine_stats["full"] += 1
     return result
@@ -1,5 +1,39 @@
+import os
+import asyncio
+
 from services.llm_client import call_llm
+from services.structural_validator import structural_validate
+from services.sections import section_list_key, content_hash
+from services.request_context import stage_priority, remaining_time, VALIDATION
+from models.schemas import ValidationResult
+
+# rules  — deterministic structural checks only (no LLM call)
+# hybrid — structural checks + LLM qualitative review, merged
+# llm    — LLM review only
+VALIDATOR_MODE = os.getenv("VALIDATOR_MODE", "rules").lower()
+
+# hybrid mode: review each semester / phase on its own and reuse the reviews
+# of sections a refinement did not change; false = one whole-plan review
+VALIDATOR_INCREMENTAL = os.getenv("VALIDATOR_INCREMENTAL", "true").lower() == "true"
 
+# hybrid + incremental: review each section as soon as the generator emits
+# it, overlapping validation with the rest of generation
+VALIDATOR_SPECULATIVE = os.getenv("VALIDATOR_SPECULATIVE", "true").lower() == "true"
+
+# the LLM review is skipped when less than this is left of the request deadline
+VALIDATOR_MIN_SECONDS = float(os.getenv("VALIDATOR_MIN_SECONDS", "5"))
+
+STATUS_RANK = {"approved": 0, "needs_revision": 1, "rejected": 2}
+
+validator_stats = {
+    "plan_reviews": 0,
+    "section_reviews": 0,
+    "sections_reused": 0,
+    "section_review_failures": 0,
+    "skipped_for_deadline": 0,
+    "sections_speculated": 0,
+    "speculative_discarded": 0,
+}
 
 
 VALIDATOR_SYSTEM_PROMPT = """
@@ -59,19 +93,283 @@ Examples:
 """
 
 
-async def validator_agent(curriculum: dict):
+SECTION_VALIDATOR_PROMPT = """
+You are an academic curriculum validator.
+
+You receive ONE section of a larger curriculum:
+- "program": top-level context (title, goal, total weeks, ...)
+- "section": a semester (courses with title, difficulty, skills, topics,
+  outcome_project) or a roadmap phase (milestones with skills and topics)
+
+Evaluate this section only:
+- Skill coherence and practicality
+- Redundancy or gaps in its topics
+- Industry/career relevance
+- Realistic time allocation
+- (Semester only) Outcome projects are practical and achievable
+
+Progression across sections, counts and week arithmetic are checked
+elsewhere — do NOT comment on them.
+
+IMPORTANT RULES:
+- Do NOT regenerate the section.
+- Output STRICT JSON.
+
+Return format:
+
+{
+  "status": "approved|needs_revision|rejected",
+  "issues": [],
+  "suggestions": [],
+  "metadata_warnings": []
+}
+"""
+
+
+async def validator_agent(curriculum: dict, plan: dict = None, previous: dict = None, speculative=None):
+    """
+    Validate a curriculum according to VALIDATOR_MODE.
+    `plan` is the generation input, used by the structural checks.
+    `previous` is the stored validation of the version `curriculum` was
+    refined from; its section reviews are reused for unchanged sections.
+    `speculative` (a SpeculativeReview fed during generation) supplies
+    section reviews that were started before the curriculum was complete.
+    """
+    reusable = (previous or {}).get("section_reviews") or {}
+    remaining = remaining_time()
+    if VALIDATOR_MODE != "rules" and remaining is not None and remaining < VALIDATOR_MIN_SECONDS:
+        # not enough time left for a model round-trip: degrade, don't time out
+        validator_stats["skipped_for_deadline"] += 1
+        skipped = _skipped_review("LLM review skipped: request deadline nearly reached")
+        if VALIDATOR_MODE == "llm":
+            return skipped
+        result = structural_validate(curriculum, plan)
+        if speculative is not None and section_list_key(curriculum):
+            # keep the section reviews that already finished; start no new ones
+            review = await _section_review(curriculum, reusable, speculative, fresh_calls=False)
+            if review["section_reviews"]:
+                result = merge_validations(result, review)
+                result["section_reviews"] = review["section_reviews"]
+                result["metadata_warnings"].append(skipped["metadata_warnings"][0])
+                return result
+        return merge_validations(result, skipped)
+
+    with stage_priority(VALIDATION):
+        if VALIDATOR_MODE == "llm":
+            return await _llm_review(curriculum)
+
+        result = structural_validate(curriculum, plan)
+        if VALIDATOR_MODE == "hybrid":
+            if VALIDATOR_INCREMENTAL and section_list_key(curriculum):
+                review = await _section_review(curriculum, reusable, speculative)
+                result = merge_validations(result, review)
+                result["section_reviews"] = review["section_reviews"]
+            else:
+                result = merge_validations(result, await _llm_review(curriculum))
+        return result
+
+
+# =====================================================
+# 🧩 PER-SECTION REVIEW
+# =====================================================
+def _section_label(kind: str, section: dict, position: int) -> str:
+    if kind == "roadmap":
+        return section.get("phase") or f"Phase {position}"
+    return f"Semester {section.get('semester', position)}"
+
+
+def _program_context(curriculum: dict, kind: str) -> dict:
+    return {
+        k: v for k, v in curriculum.items()
+        if k != kind and not k.startswith("validation_") and not isinstance(v, (dict, list))
+    }
 
+
+async def _review_one(payload: dict):
+    try:
+        review = await call_llm(SECTION_VALIDATOR_PROMPT, payload, schema=ValidationResult)
+    except Exception:
+        return None
+    return review if review.get("status") in STATUS_RANK else None
+
+
+async def _claimed_review(task, payload: dict):
+    review = await task
+    # a speculative review that failed (e.g. cut off with generation's
+    # share of the deadline) gets one more try now
+    return review if review is not None else await _review_one(payload)
+
+
+async def _section_review(curriculum: dict, reusable: dict, speculative=None, fresh_calls: bool = True) -> dict:
+    """
+    LLM review of each semester / phase. Reviews are keyed by the content
+    hash of what the model saw (section + program context), so a section a
+    refinement left alone keeps its stored review and costs no call, and a
+    review started speculatively during generation is picked up if its
+    section came out unchanged. `fresh_calls=False` only collects reviews
+    that already finished.
+    """
+    kind = section_list_key(curriculum)
+    program = _program_context(curriculum, kind)
+    sections = [s for s in curriculum.get(kind) or [] if isinstance(s, dict)]
+
+    keys, pending = [], {}
+    for section in sections:
+        payload = {"program": program, "section": section}
+        key = content_hash(payload)
+        keys.append(key)
+        if key not in reusable and key not in pending:
+            pending[key] = payload
+
+    calls = {}
+    for key, payload in pending.items():
+        task = speculative.claim(key, done_only=not fresh_calls) if speculative is not None else None
+        if task is not None:
+            validator_stats["sections_speculated"] += 1
+            calls[key] = _claimed_review(task, payload) if fresh_calls else task
+        elif fresh_calls:
+            calls[key] = _review_one(payload)
+    if speculative is not None:
+        speculative.close()
+    reused = len(sections) - len(pending)
+    pending = {key: pending[key] for key in calls}
+    fresh = await asyncio.gather(*calls.values())
+    reviews = {key: reusable[key] for key in keys if key in reusable}
+    failed = 0
+    for key, review in zip(pending, fresh):
+        if review is None:
+            failed += 1
+        else:
+            reviews[key] = {k: review.get(k) or [] for k in ("issues", "suggestions", "metadata_warnings")}
+            reviews[key]["status"] = review["status"]
+
+    validator_stats["section_reviews"] += len(pending)
+    validator_stats["sections_reused"] += reused
+    validator_stats["section_review_failures"] += failed
+
+    merged = {"status": "approved", "issues": [], "suggestions": [], "metadata_warnings": []}
+    for position, (section, key) in enumerate(zip(sections, keys), start=1):
+        label = _section_label(kind, section, position)
+        review = reviews.get(key)
+        if review is None:
+            merged["metadata_warnings"].append(f"{label} — qualitative LLM review was skipped")
+            continue
+        if STATUS_RANK[review["status"]] > STATUS_RANK[merged["status"]]:
+            merged["status"] = review["status"]
+        for field in ("issues", "suggestions", "metadata_warnings"):
+            for text in review[field]:
+                text = text if label in text else f"{label} — {text}"
+                if text not in merged[field]:
+                    merged[field].append(text)
+
+    if sections and not reviews:
+        merged["status"] = "skipped"
+    merged["section_reviews"] = reviews
+    return merged
+
+
+class SpeculativeReview:
+    """
+    Per-section reviews started while the generator is still writing.
+    Fed the generator's `skeleton` / `section` events, it reviews each
+    section against the program fields the skeleton announced; the final
+    validator_agent call claims the reviews whose content hash matches the
+    finished curriculum and the rest are cancelled.
+    """
+
+    def __init__(self):
+        self.program = None
+        self.tasks = {}
+
+    def listen(self, on_event=None):
+        """An on_event callback that observes the events and passes them on."""
+        async def forward(event: str, payload: dict):
+            self.observe(event, payload)
+            if on_event is not None:
+                await on_event(event, payload)
+        return forward
+
+    def observe(self, event: str, payload: dict):
+        if event == "skeleton":
+            self.program = {
+                k: v for k, v in payload.items()
+                if k not in ("kind", "total") and not isinstance(v, (dict, list))
+            }
+        elif event == "reset":
+            # the generator started over: these sections will not be in the result
+            self.close()
+            self.program = None
+        elif event == "section" and self.program is not None:
+            review_payload = {"program": self.program, "section": payload["section"]}
+            key = content_hash(review_payload)
+            if key not in self.tasks:
+                # the task copies the context: the request's class and deadline
+                with stage_priority(VALIDATION):
+                    self.tasks[key] = asyncio.create_task(_review_one(review_payload))
+
+    def claim(self, key: str, done_only: bool = False):
+        task = self.tasks.get(key)
+        if task is None or (done_only and not task.done()):
+            return None
+        return self.tasks.pop(key)
+
+    def close(self):
+        for task in self.tasks.values():
+            if not task.done():
+                # only reviews still waiting on the provider save a call
+                validator_stats["speculative_discarded"] += 1
+                task.cancel()
+        self.tasks.clear()
+
+
+def speculative_review():
+    """A SpeculativeReview when the validator reviews sections with the LLM, else None."""
+    if VALIDATOR_MODE == "hybrid" and VALIDATOR_INCREMENTAL and VALIDATOR_SPECULATIVE:
+        return SpeculativeReview()
+    return None
+
+
+# =====================================================
+# 📄 WHOLE-PLAN REVIEW
+# =====================================================
+async def _llm_review(curriculum: dict):
+
+    validator_stats["plan_reviews"] += 1
     try:
         result = await call_llm(
             VALIDATOR_SYSTEM_PROMPT,
-            curriculum
+            curriculum,
+            schema=ValidationResult
         )
         return result
 
     except Exception:
-        # ⭐ Fallback when quota exhausted
-        return {
-            "status": "skipped",
-            "issues": [],
-            "suggestions": []
-        }
+        # ⭐ Fallback when quota exhausted (or the request deadline passed)
+        return _skipped_review()
+
+
+def _skipped_review(reason: str = None) -> dict:
+    return {
+        "status": "skipped",
+        "issues": [],
+        "suggestions": [],
+        "metadata_warnings": [reason] if reason else [],
+    }
+
+
+def merge_validations(rules: dict, review: dict) -> dict:
+    """Combine structural and LLM findings; the stricter status wins."""
+    merged = {key: list(rules.get(key, [])) for key in ("issues", "suggestions", "metadata_warnings")}
+    for key, values in merged.items():
+        for value in review.get(key) or []:
+            if value not in values:
+                values.append(value)
+
+    status = rules.get("status", "approved")
+    review_status = review.get("status")
+    if review_status in STATUS_RANK and STATUS_RANK[review_status] > STATUS_RANK.get(status, 0):
+        status = review_status
+    elif review_status not in STATUS_RANK and not review.get("metadata_warnings"):
+        merged["metadata_warnings"].append("Qualitative LLM review was skipped")
+
+    return {"status": status, **merged}
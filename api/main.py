@@ -1,5 +1,7 @@
 import sys
 import os
+import json
+import asyncio
 
 # Ensure project root is on sys.path when running from the `api/` folder
 ROOT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -10,17 +12,42 @@ from fastapi import FastAPI, Request
 from fastapi.responses import HTMLResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from orchestrator.pipeline import run_agent_pipeline
+from orchestrator.pipeline import (
+    run_agent_pipeline, pipeline_flight, pipeline_jobs, pipeline_deadline,
+    PIPELINE_FINALIZE_SECONDS, PIPELINE_FORMAT_SECONDS,
+)
+from services.job_queue import QueueFull
+from orchestrator.batch import run_batch, BATCH_MAX_ITEMS, BATCH_CONCURRENCY, BATCH_MAX_CONCURRENCY
+from orchestrator.bulk_export import run_bulk_export, BULK_EXPORT_MAX_ITEMS, BULK_EXPORT_CONCURRENCY
 from agents import refine_agent
-from agents.validator_agent import validator_agent
-from agents.formatter_agent import formatter_agent
-from services.pdf_generator import generate_pdf_from_curriculum
+from agents.validator_agent import validator_agent, validator_stats
+from services.structural_validator import structural_validate
+from services.plan_store import plan_store, with_plan_ref, strip_plan_ref
+from services.plan_signature import verify_plan
+from agents.formatter_agent import formatter_agent, formatter_stats
+from services.pdf_export import pdf_exporter, iter_file
+from services.exporters import EXPORTERS, export_stream
 from services.logger import get_logger
+from services.llm_client import close_llm_clients, llm_flight, llm_output_stats
+from services.provider_health import provider_health
+from services.hedging import llm_hedging
+from services.llm_scheduler import llm_scheduler
+from services.request_context import use_priority, reserve_time, INTERACTIVE, DeadlineExceeded
+from services.llm_cache import llm_cache
 from fastapi import HTTPException
-from io import BytesIO
+from contextlib import asynccontextmanager
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await pipeline_jobs.shutdown()
+    pdf_exporter.shutdown()
+    # Release pooled keep-alive connections to the LLM providers
+    await close_llm_clients()
+
+
+app = FastAPI(lifespan=lifespan)
 
 logger = get_logger("api")
 
@@ -33,9 +60,52 @@ def home(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
 
+@app.get("/llm/cache-stats")
+def llm_cache_stats():
+    """Hit/miss counters and provider time saved by the LLM response cache."""
+    return llm_cache.stats()
+
+
+@app.get("/llm/single-flight")
+def single_flight_stats():
+    """How many identical in-flight requests were coalesced."""
+    return {
+        "pipeline": pipeline_flight.stats(),
+        "call_llm": llm_flight.stats(),
+    }
+
+
+@app.get("/llm/hedging")
+def llm_hedging_stats():
+    """How often hedged requests fired, how often the hedge answered first."""
+    return llm_hedging.stats()
+
+
+@app.get("/llm/stats")
+def llm_stats():
+    """Provider replies, repair calls and JSON / schema failures."""
+    return llm_output_stats()
+
+
+@app.get("/llm/scheduler")
+def llm_scheduler_stats():
+    """Per-provider queue, in-flight requests, RPM / TPM / concurrency utilisation and 429 retries."""
+    return llm_scheduler.stats()
+
+
+@app.get("/llm/providers")
+def llm_providers():
+    """Circuit state, rolling error rate and latency percentiles per provider."""
+    return provider_health.snapshot()
+
+
 @app.post("/generate")
 async def generate_curriculum(data: dict):
-    result = await run_agent_pipeline(data)
+    try:
+        with pipeline_deadline():
+            result = await run_agent_pipeline(data)
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     
     logger.info("GENERATE ENDPOINT RESPONSE")
     logger.debug("Response keys: %s", list(result.keys()))
@@ -49,65 +119,347 @@ async def generate_curriculum(data: dict):
 
 
 
+@app.post("/generate/batch")
+async def generate_batch(data: dict):
+    """
+    Generate many curricula in one request: `{ items: [<generate input>, ...],
+    concurrency?: int }`. Answers NDJSON — one line per item as it finishes
+    (in completion order, with its `index`), then a `summary` line.
+    """
+    items = data.get("items")
+    if not isinstance(items, list) or not items or not all(isinstance(i, dict) for i in items):
+        raise HTTPException(status_code=400, detail="'items' must be a non-empty list of generate inputs")
+    if len(items) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} items per batch")
+    try:
+        concurrency = int(data.get("concurrency") or BATCH_CONCURRENCY)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="'concurrency' must be an integer")
+    concurrency = max(1, min(concurrency, BATCH_MAX_CONCURRENCY))
+
+    async def lines():
+        async for line in run_batch(items, concurrency):
+            yield json.dumps(line) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(data: dict):
+    """
+    Queue a /generate run and return its job_id at once. The run continues
+    if the client disconnects; poll GET /jobs/{job_id} for the result.
+    """
+    try:
+        job = pipeline_jobs.submit(data)
+    except QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "30"})
+    return {"job_id": job.id, "status": job.status, "status_url": f"/jobs/{job.id}"}
+
+
+@app.get("/jobs/stats")
+def job_stats():
+    """Queue depth, running jobs, outcomes and wait / run time percentiles."""
+    return pipeline_jobs.stats()
+
+
+@app.get("/jobs/{job_id}")
+def get_job(job_id: str):
+    """Status, current stage and — once done — the result or error."""
+    job = pipeline_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
+
+
+@app.post("/generate/stream")
+async def generate_curriculum_stream(data: dict):
+    """
+    Streaming variant of /generate (Server-Sent Events).
+    Emits `stage` progress, the generator `skeleton`, each `section`
+    (semester / phase) as soon as it is parsed, `reset` when a failed
+    fan-out restarts as one call (sections shown so far are replaced),
+    then the final `result` with the same body /generate returns — or an
+    `error` event.
+    """
+    queue = asyncio.Queue()
+
+    async def on_event(event: str, payload: dict):
+        await queue.put((event, payload))
+
+    async def run():
+        try:
+            with pipeline_deadline():
+                result = await run_agent_pipeline(data, on_event=on_event)
+            await queue.put(("result", result))
+        except Exception as e:
+            logger.exception("Streaming generation failed: %s", str(e))
+            await queue.put(("error", {"detail": str(e)}))
+        finally:
+            await queue.put(None)
+
+    async def event_stream():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                event, payload = item
+                yield f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+        finally:
+            # client went away — stop spending provider calls on it
+            if not task.done():
+                task.cancel()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+
+def _load_plan(plan_id: str, version=None) -> dict:
+    """Stored plan record for `plan_id` (latest version unless given), or 404."""
+    if version is not None:
+        try:
+            version = int(version)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="'version' must be an integer")
+    record = plan_store.get(plan_id, version)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Plan '{plan_id}' version {version or 'latest'} not found")
+    return record
+
+
+@app.get("/plans/stats")
+def plan_store_stats():
+    """Stored plans, versions added, lookups and evictions."""
+    return plan_store.stats()
+
+
+@app.get("/plans/{plan_id}")
+def get_plan(plan_id: str, version: int = None):
+    record = _load_plan(plan_id, version)
+    return with_plan_ref(record["plan"], plan_id, record["version"])
+
+
+@app.get("/plans/{plan_id}/versions")
+def get_plan_versions(plan_id: str):
+    history = plan_store.history(plan_id)
+    if not history:
+        raise HTTPException(status_code=404, detail=f"Plan '{plan_id}' not found")
+    return {"plan_id": plan_id, "versions": history}
+
+
+@app.get("/refine-plan/stats")
+def refine_stats():
+    """
+    Patch vs full-rewrite refinements, fallbacks and patch ops applied, plus
+    how many section reviews / formatting passes were reused.
+    """
+    return {**refine_agent.refine_stats, "validation": validator_stats, "formatting": formatter_stats}
+
+
 @app.post("/refine-plan")
 async def refine_plan(data: dict):
     instruction = data.get("instruction")
+    plan_id = data.get("plan_id")
     current = data.get("current_plan")
 
-    if not instruction or not current:
-        raise HTTPException(status_code=400, detail="Both 'instruction' and 'current_plan' are required")
+    if not instruction or not (plan_id or current):
+        raise HTTPException(status_code=400, detail="'instruction' and either 'plan_id' or 'current_plan' are required")
+
+    stored = None
+    if plan_id:
+        stored = _load_plan(plan_id, data.get("version"))
+        current = stored["plan"]
+    else:
+        current = strip_plan_ref(current)
 
     try:
-        # 1) Obtain refined curriculum from the refine agent
-        refined = await refine_agent.refine_agent(current, instruction)
+        # a user is waiting: this request's provider calls jump the queue
+        with use_priority(INTERACTIVE), pipeline_deadline():
+            # 1) Obtain refined curriculum from the refine agent
+            with reserve_time(PIPELINE_FINALIZE_SECONDS):
+                refined = await refine_agent.refine_agent(current, instruction)
+
+            # 2) Validate the refined curriculum; sections the refinement left
+            #    untouched keep the stored version's reviews
+            with reserve_time(PIPELINE_FORMAT_SECONDS):
+                validation = await validator_agent(refined, previous=(stored or {}).get("validation"))
 
-        # 2) Validate the refined curriculum (same flow as generation pipeline)
-        validation = await validator_agent(refined)
+            # 3) Format the refined curriculum with validation metadata,
+            #    re-formatting only the sections that changed
+            final_output = await formatter_agent(
+                refined, validation, formatted_sections=set((stored or {}).get("section_hashes") or [])
+            )
 
-        # 3) Format the refined curriculum with validation metadata
-        final_output = await formatter_agent(refined, validation)
+        # 4) Store it as the plan's next version
+        if plan_id:
+            version = plan_store.add_version(plan_id, final_output, validation, instruction)
+            if version is None:
+                # evicted while refining: the UI posts the whole plan instead
+                raise HTTPException(status_code=404, detail=f"Plan '{plan_id}' not found")
+        else:
+            plan_id, version = plan_store.create(final_output, validation)
 
-        return final_output
+        return with_plan_ref(final_output, plan_id, version)
 
+    except HTTPException:
+        raise
+    except DeadlineExceeded as e:
+        raise HTTPException(status_code=504, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 
+@app.get("/export-pdf/stats")
+def export_pdf_stats():
+    """PDF renders, cache hits, coalesced exports and render time percentiles."""
+    return pdf_exporter.stats()
+
+
+@app.post("/export-pdf/bulk")
+async def export_pdf_bulk(data: dict):
+    """
+    Export many plans as one ZIP of PDFs: `{ items: [{plan_id, version?} |
+    {curriculum}, ...], concurrency?: int }`. The archive streams as PDFs
+    finish; `manifest.json` at the end lists each item's file, status and
+    render time.
+    """
+    items = data.get("items")
+    if not isinstance(items, list) or not items or not all(isinstance(i, dict) for i in items):
+        raise HTTPException(status_code=400, detail="'items' must be a non-empty list of {plan_id} or {curriculum} objects")
+    if len(items) > BULK_EXPORT_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_EXPORT_MAX_ITEMS} items per export")
+    try:
+        concurrency = int(data.get("concurrency") or BULK_EXPORT_CONCURRENCY)
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="'concurrency' must be an integer")
+    concurrency = max(1, min(concurrency, BULK_EXPORT_MAX_ITEMS))
+
+    return StreamingResponse(
+        run_bulk_export(items, concurrency),
+        media_type="application/zip",
+        headers={"Content-Disposition": "attachment; filename=curricula.zip"},
+    )
+
+
+async def _export_curriculum(plan_id, stored, curriculum: dict) -> dict:
+    """
+    The formatted curriculum an export renders: the stored plan, a posted
+    curriculum whose validation signature still matches its content, or
+    else the posted curriculum after the structural validator and formatter
+    (422 with the issues when its entries are not objects).
+    """
+    if stored is not None:
+        logger.info("Exporting stored plan %s v%s", plan_id, stored["version"])
+        return stored["plan"]
+
+    if not isinstance(curriculum, dict):
+        raise HTTPException(status_code=400, detail="'curriculum' must be an object")
+    curriculum = strip_plan_ref(curriculum)
+    logger.debug("Curriculum keys: %s", list(curriculum.keys()))
+    logger.debug("Has semesters: %s", 'semesters' in curriculum)
+
+    if verify_plan(curriculum):
+        # formatted and signed by this service, unchanged since
+        logger.info("Exporting signed curriculum as is")
+        return curriculum
+
+    # 1) Validate the curriculum — structural checks only, no network round-trip
+    validation = structural_validate(curriculum)
+    logger.debug("Validation result: %s", validation)
+    if validation.get("malformed"):
+        # entries that are not objects cannot be formatted or rendered
+        raise HTTPException(status_code=422, detail={"issues": validation["issues"]})
+
+    # 2) Format the curriculum with validation metadata
+    formatted_curriculum = await formatter_agent(curriculum, validation)
+    logger.debug("Formatting complete. Keys: %s", list(formatted_curriculum.keys()))
+    return formatted_curriculum
+
+
 @app.post("/export-pdf")
 async def export_pdf(data: dict):
     """
     Generate and return a PDF from curriculum data.
-    Process through validator and formatter agents to ensure proper formatting.
+    With `plan_id` (+ optional `version`) the stored, already validated and
+    formatted plan is rendered directly, as is a posted `curriculum` whose
+    validation signature still matches its content; any other curriculum
+    goes through the structural validator and formatter agent first.
     """
+    plan_id = data.get("plan_id")
     curriculum = data.get("curriculum")
-    
-    if not curriculum:
-        raise HTTPException(status_code=400, detail="'curriculum' field is required")
-    
-    try:
-        logger.info("EXPORT PDF REQUEST")
-        logger.debug("Curriculum keys: %s", list(curriculum.keys()))
-        logger.debug("Has semesters: %s", 'semesters' in curriculum)
 
-        # 1) Validate the curriculum
-        validation = await validator_agent(curriculum)
-        logger.debug("Validation result: %s", validation)
+    if not plan_id and not curriculum:
+        raise HTTPException(status_code=400, detail="'plan_id' or 'curriculum' field is required")
 
-        # 2) Format the curriculum with validation metadata
-        formatted_curriculum = await formatter_agent(curriculum, validation)
-        logger.debug("Formatting complete. Keys: %s", list(formatted_curriculum.keys()))
+    stored = _load_plan(plan_id, data.get("version")) if plan_id else None
 
-        # 3) Generate PDF from formatted curriculum
+    try:
+        logger.info("EXPORT PDF REQUEST")
+        formatted_curriculum = await _export_curriculum(plan_id, stored, curriculum)
+
+        # 3) Render the PDF in a worker process (or reuse an identical earlier
+        #    render) and stream it from its spool file in chunks
         logger.info("Generating PDF")
-        pdf_bytes = generate_pdf_from_curriculum(formatted_curriculum)
-        logger.info("PDF generated successfully (%d bytes)", len(pdf_bytes))
+        handle, size = await pdf_exporter.open(formatted_curriculum)
+        logger.info("PDF generated successfully (%d bytes)", size)
 
         return StreamingResponse(
-            BytesIO(pdf_bytes),
+            iter_file(handle),
             media_type="application/pdf",
-            headers={"Content-Disposition": "attachment; filename=curriculum.pdf"}
+            headers={
+                "Content-Disposition": "attachment; filename=curriculum.pdf",
+                "Content-Length": str(size),
+            }
         )
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception("PDF generation failed: %s", str(e))
         raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+
+
+@app.post("/export")
+async def export(data: dict, format: str = "markdown"):
+    """
+    Export a plan as `format`: markdown, html, csv (services/exporters.py,
+    streamed as it is written) or pdf (same as /export-pdf). The body is
+    the same as /export-pdf's: `{ plan_id, version? }` or `{ curriculum }`.
+    """
+    format = format.lower()
+    if format == "pdf":
+        return await export_pdf(data)
+    if format not in EXPORTERS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown format '{format}' — use one of: {', '.join([*EXPORTERS, 'pdf'])}",
+        )
+
+    plan_id = data.get("plan_id")
+    curriculum = data.get("curriculum")
+
+    if not plan_id and not curriculum:
+        raise HTTPException(status_code=400, detail="'plan_id' or 'curriculum' field is required")
+
+    stored = _load_plan(plan_id, data.get("version")) if plan_id else None
+
+    try:
+        formatted_curriculum = await _export_curriculum(plan_id, stored, curriculum)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Export failed: %s", str(e))
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
+    exporter = EXPORTERS[format]
+    return StreamingResponse(
+        export_stream(format, formatted_curriculum),
+        media_type=exporter["media_type"],
+        headers={"Content-Disposition": f"attachment; filename=curriculum.{exporter['extension']}"},
+    )
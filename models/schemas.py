@@ -0,0 +1,171 @@
+"""
+Agent output schemas
+Every agent declares the JSON shape it expects back from the LLM. The provider
+layer requests JSON-mode output and validates replies against these models
+locally instead of sending a blind repair request.
+
+Models are deliberately lenient: unknown keys are kept (extra="allow"),
+optional fields default, and lax coercion turns "6" into 6. Only the fields
+an agent cannot work without are required, so an unrelated object fails.
+"""
+
+from typing import Any, List, Literal, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+
+class _Schema(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+
+# =====================================================
+# 🗺️ PLANNER
+# =====================================================
+class PlannerOutput(_Schema):
+    # required: a reply without them is not a plan, whatever else it holds
+    program_title: str
+    difficulty_progression: str
+    courses_per_semester: int = Field(ge=1)
+    focus_tags: List[str] = []
+    include_capstone: bool = False
+    semesters: Optional[int] = Field(default=None, ge=0)
+
+
+class LearnerProfile(_Schema):
+    persona_type: str
+    content_bias: str = ""
+    pacing_strategy: str = ""
+    innovation_index: str = ""
+    learning_style: str = ""
+    risk_tolerance: str = ""
+    assessment_preference: str = ""
+    collaboration_level: str = ""
+    career_alignment: str = ""
+    difficulty_preference: str = ""
+    research_intensity: str = ""
+    industry_orientation: str = ""
+
+
+# =====================================================
+# 🎓 SEMESTER CURRICULUM
+# =====================================================
+class Topic(_Schema):
+    name: str
+    video_url: Optional[str] = None
+    estimated_hours: Optional[Union[int, float]] = None
+    weeks: Optional[str] = None
+
+
+class Course(_Schema):
+    title: str
+    difficulty: str = ""
+    skills: List[str] = []
+    topics: List[Union[Topic, str]] = []
+    outcome_project: str = ""
+
+
+class Semester(_Schema):
+    semester: int
+    courses: List[Course] = Field(min_length=1)
+
+
+class SemesterSection(_Schema):
+    """One fan-out section; the skeleton already owns the semester number."""
+    semester: Optional[int] = None
+    courses: List[Course] = Field(min_length=1)
+
+
+class SemesterCurriculum(_Schema):
+    program_title: str = ""
+    summary: str = ""
+    semesters: List[Semester] = Field(min_length=1)
+
+
+class SemesterOutline(_Schema):
+    semester: int
+    theme: str = ""
+    difficulty: str = ""
+    course_titles: List[str] = Field(min_length=1)
+
+
+class SemesterSkeleton(_Schema):
+    program_title: str = ""
+    summary: str = ""
+    semesters: List[SemesterOutline] = Field(min_length=1)
+
+
+# =====================================================
+# 🧠 PERSONAL ROADMAP
+# =====================================================
+class Milestone(_Schema):
+    title: str
+    timeline_weeks: Optional[str] = None
+    estimated_total_hours: Optional[Union[int, float]] = None
+    skills: List[str] = []
+    topics: List[Union[Topic, str]] = []
+    certification: Optional[dict] = None
+
+
+class Phase(_Schema):
+    phase: str = ""
+    duration_weeks: Optional[int] = None
+    weeks: Optional[str] = None
+    milestones: List[Milestone] = Field(min_length=1)
+
+
+class RoadmapCurriculum(_Schema):
+    program_title: str = ""
+    summary: str = ""
+    total_weeks: Optional[int] = None
+    weekly_hours: Optional[Union[int, float]] = None
+    roadmap: List[Phase] = Field(min_length=1)
+
+
+class PhaseOutline(_Schema):
+    phase: str = ""
+    duration_weeks: Optional[int] = None
+    weeks: Optional[str] = None
+    milestone_titles: List[str] = Field(min_length=1)
+
+
+class RoadmapSkeleton(_Schema):
+    program_title: str = ""
+    summary: str = ""
+    total_weeks: Optional[int] = None
+    weekly_hours: Optional[Union[int, float]] = None
+    roadmap: List[PhaseOutline] = Field(min_length=1)
+
+
+# =====================================================
+# ✅ VALIDATION + REFINEMENT
+# =====================================================
+class ValidationResult(_Schema):
+    status: str
+    issues: List[Union[str, dict]] = []
+    suggestions: List[Union[str, dict]] = []
+    metadata_warnings: List[Union[str, dict]] = []
+
+
+class RefinedPlan(_Schema):
+    """Either curriculum format, matching whatever the input plan used."""
+    program_title: str = ""
+    summary: str = ""
+    semesters: Optional[List[Semester]] = None
+    roadmap: Optional[List[Phase]] = None
+
+    @model_validator(mode="after")
+    def _one_format(self):
+        if not self.semesters and not self.roadmap:
+            raise ValueError("refined plan must contain 'semesters' or 'roadmap'")
+        return self
+
+
+class PatchOp(_Schema):
+    op: Literal["add", "replace", "remove"]
+    path: str
+    value: Any = None
+
+
+class RefinePatch(_Schema):
+    """Patch-based refinement: JSON Patch ops against the stored plan."""
+    ops: List[PatchOp] = Field(min_length=1)
@@ -0,0 +1,154 @@
+"""
+Batch generation — many planner inputs in one request
+Identical inputs run once and their result is sent for every copy, each
+stored as a plan of its own. Inputs
+whose planner fields match after normalisation ("Data Science" / "data
+science ", 4 / "4", extra bookkeeping keys) share one planner call. Unique
+inputs run up to `concurrency` at a time; new items wait while every
+provider's circuit is open (e.g. all rate-limited). Results stream back as
+each finishes, followed by a summary with throughput and latency.
+"""
+
+import os
+import copy
+import time
+import asyncio
+from collections import OrderedDict
+
+from agents.planner_agent import planner_agent
+from agents.personal_planner_agent import personal_planner_agent
+from orchestrator.pipeline import generate_curriculum, store_plan
+from services.llm_cache import canonical_json
+from services.llm_client import provider_backoff_seconds
+from services.provider_health import _percentile
+from services.request_context import use_priority, BACKGROUND
+from services.logger import get_logger
+
+logger = get_logger("batch")
+
+# ================= CONFIG =================
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "100"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+BATCH_BACKOFF_POLL_SECONDS = 5.0
+
+# ==========================================
+
+# the input fields each planner reads
+PLANNER_FIELDS = {
+    "semester": ("skill", "level", "semesters", "weekly_hours", "focus", "include_capstone"),
+    "personal": ("study_domain", "career_path", "experience", "pace", "weekly_hours", "duration"),
+}
+
+
+def _normalize(value):
+    if isinstance(value, str):
+        value = " ".join(value.split())
+        return int(value) if value.isdigit() else value.casefold()
+    return value
+
+
+def planner_input(item: dict) -> dict:
+    """The planner-relevant part of an input, as the shared planner call sees it."""
+    planner_type = item.get("planner_type", "semester")
+    fields = PLANNER_FIELDS.get(planner_type, PLANNER_FIELDS["semester"])
+    shared = {field: item[field] for field in fields if item.get(field) not in (None, "")}
+    return {"planner_type": planner_type, **shared}
+
+
+def planner_key(item: dict) -> str:
+    return canonical_json({k: _normalize(v) for k, v in planner_input(item).items()})
+
+
+async def _run_planner(item: dict) -> dict:
+    data = planner_input(item)
+    if data["planner_type"] == "personal":
+        return await personal_planner_agent(data)
+    return await planner_agent(data)
+
+
+async def run_batch(items: list, concurrency: int = BATCH_CONCURRENCY):
+    """
+    Async generator of result lines:
+    {index, status: done|failed, result|error, latency_seconds, finished_after_seconds[, duplicate_of]}
+    for every input, then {"summary": {...}}.
+    """
+    started = time.perf_counter()
+    groups = OrderedDict()
+    for index, item in enumerate(items):
+        groups.setdefault(canonical_json(item), []).append(index)
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    finished = asyncio.Queue()
+    planners = {}
+    counters = {"planner_calls": 0, "planner_shared": 0, "provider_waits": 0}
+
+    async def shared_plan(item: dict) -> dict:
+        key = planner_key(item)
+        task = planners.get(key)
+        if task is None:
+            counters["planner_calls"] += 1
+            task = planners[key] = asyncio.ensure_future(_run_planner(item))
+        else:
+            counters["planner_shared"] += 1
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def run_one(indexes: list):
+        item = items[indexes[0]]
+        # batch work yields provider capacity to interactive and /generate requests
+        with use_priority(BACKGROUND):
+            async with semaphore:
+                # rate-limit awareness: don't start work no provider can take
+                while (wait := provider_backoff_seconds()) > 0:
+                    counters["provider_waits"] += 1
+                    await asyncio.sleep(min(wait, BATCH_BACKOFF_POLL_SECONDS))
+                item_started = time.perf_counter()
+                results = None
+                try:
+                    plan = await shared_plan(item)
+                    curriculum, validation = await generate_curriculum(item, planner_output=plan)
+                    # one run, but a stored plan of its own for every copy of the input
+                    results = [store_plan(copy.deepcopy(curriculum), validation) for _ in indexes]
+                    line = {"status": "done"}
+                except Exception as e:
+                    logger.warning("Batch item %d failed: %s", indexes[0], str(e))
+                    line = {"status": "failed", "error": str(e)}
+                now = time.perf_counter()
+                line["latency_seconds"] = round(now - item_started, 3)
+                line["finished_after_seconds"] = round(now - started, 3)
+        await finished.put((indexes, line, results))
+
+    tasks = [asyncio.create_task(run_one(indexes)) for indexes in groups.values()]
+    latencies, succeeded = [], 0
+    try:
+        for _ in range(len(tasks)):
+            indexes, line, results = await finished.get()
+            latencies.append(line["latency_seconds"])
+            if line["status"] == "done":
+                succeeded += len(indexes)
+            for position, index in enumerate(indexes):
+                extra = {"duplicate_of": indexes[0]} if index != indexes[0] else {}
+                if results is not None:
+                    extra["result"] = results[position]
+                yield {"index": index, **extra, **line}
+    finally:
+        # client went away — stop spending provider calls on it
+        for task in tasks:
+            task.cancel()
+        for task in planners.values():
+            task.cancel()
+
+    wall = time.perf_counter() - started
+    yield {"summary": {
+        "items": len(items),
+        "unique": len(groups),
+        "duplicates": len(items) - len(groups),
+        **counters,
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+        "concurrency": max(1, concurrency),
+        "wall_seconds": round(wall, 3),
+        "throughput_items_per_minute": round(len(items) / wall * 60, 1) if wall > 0 else None,
+        "latency_seconds": {p: _percentile(latencies, n) for p, n in (("p50", 50), ("p95", 95), ("max", 100))},
+    }}
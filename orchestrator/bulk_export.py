@@ -0,0 +1,143 @@
+"""
+Bulk export — many plans as one streamed ZIP of PDFs
+Items are stored plan references ({plan_id, version?}) or posted curricula.
+Stored plans, and curricula whose validation signature from the formatter
+still matches their content, are rendered as they are; anything else gets
+the structural checks and the formatter first (no LLM call). Renders go through the PDF export
+engine's worker pool `concurrency` at a time, and each PDF is written into
+the archive as soon as it is ready — the ZIP is streamed out chunk by chunk,
+never assembled in memory. A closing manifest.json lists every item's file,
+status and render time.
+"""
+
+import os
+import re
+import json
+import time
+import asyncio
+import zipfile
+
+from agents.formatter_agent import formatter_agent
+from services.structural_validator import structural_validate
+from services.plan_store import plan_store, strip_plan_ref
+from services.plan_signature import verify_plan
+from services.pdf_export import pdf_exporter, PDF_STREAM_CHUNK_BYTES
+from services.provider_health import _percentile
+from services.logger import get_logger
+
+logger = get_logger("bulk_export")
+
+# ================= CONFIG =================
+
+BULK_EXPORT_MAX_ITEMS = int(os.getenv("BULK_EXPORT_MAX_ITEMS", "100"))
+BULK_EXPORT_CONCURRENCY = int(os.getenv("BULK_EXPORT_CONCURRENCY", "4"))
+
+# ==========================================
+
+class _ZipStream:
+    """Write-only sink for zipfile: collects bytes until the response drains them."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _slug(title: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", str(title or "").lower()).strip("-")[:60] or "curriculum"
+
+
+async def _prepare(item: dict):
+    """(formatted curriculum, source) for one bulk item."""
+    if item.get("plan_id"):
+        version = int(item["version"]) if item.get("version") is not None else None
+        record = plan_store.get(item["plan_id"], version)
+        if record is None:
+            raise Exception(f"Plan '{item['plan_id']}' version {version or 'latest'} not found")
+        return record["plan"], "stored"
+    curriculum = item.get("curriculum")
+    if not isinstance(curriculum, dict):
+        raise Exception("item needs 'plan_id' or a 'curriculum' object")
+    curriculum = strip_plan_ref(curriculum)
+    if verify_plan(curriculum):
+        return curriculum, "signed"
+    validation = structural_validate(curriculum)
+    if validation.get("malformed"):
+        raise Exception("; ".join(validation["issues"]))
+    return await formatter_agent(curriculum, validation), "validated"
+
+
+async def run_bulk_export(items: list, concurrency: int = BULK_EXPORT_CONCURRENCY):
+    """Async generator of ZIP archive bytes: one PDF per item, then manifest.json."""
+    started = time.perf_counter()
+    sink = _ZipStream()
+    archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    finished = asyncio.Queue()
+
+    async def render_one(index: int, item: dict):
+        entry = {"index": index}
+        handle = None
+        async with semaphore:
+            try:
+                curriculum, entry["source"] = await _prepare(item)
+                render_started = time.perf_counter()
+                handle, entry["bytes"] = await pdf_exporter.open(curriculum)
+                entry["render_seconds"] = round(time.perf_counter() - render_started, 3)
+                entry["file"] = f"{index + 1:03d}-{_slug(curriculum.get('program_title'))}.pdf"
+                entry["status"] = "done"
+            except Exception as e:
+                logger.warning("Bulk export item %d failed: %s", index, str(e))
+                entry.update(status="failed", error=str(e))
+        await finished.put((entry, handle))
+
+    tasks = [asyncio.create_task(render_one(index, item)) for index, item in enumerate(items)]
+    manifest = []
+    try:
+        for _ in range(len(tasks)):
+            entry, handle = await finished.get()
+            entry["finished_after_seconds"] = round(time.perf_counter() - started, 3)
+            manifest.append(entry)
+            if handle is None:
+                continue
+            with handle, archive.open(entry["file"], "w") as member:
+                while chunk := handle.read(PDF_STREAM_CHUNK_BYTES):
+                    member.write(chunk)
+                    if data := sink.drain():
+                        yield data
+            if data := sink.drain():
+                yield data
+
+        renders = [e["render_seconds"] for e in manifest if e["status"] == "done"]
+        wall = time.perf_counter() - started
+        archive.writestr("manifest.json", json.dumps({
+            "items": sorted(manifest, key=lambda e: e["index"]),
+            "summary": {
+                "items": len(items),
+                "succeeded": len(renders),
+                "failed": len(items) - len(renders),
+                "concurrency": max(1, concurrency),
+                "wall_seconds": round(wall, 3),
+                "render_seconds": {p: _percentile(renders, n) for p, n in (("p50", 50), ("p95", 95), ("max", 100))},
+            },
+        }, indent=2))
+        archive.close()
+        yield sink.drain()
+    finally:
+        # client went away — stop rendering for it and release the spool files
+        for task in tasks:
+            task.cancel()
+        while not finished.empty():
+            _, handle = finished.get_nowait()
+            if handle is not None:
+                handle.close()
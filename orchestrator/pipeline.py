@@ -1,22 +1,151 @@
+import os
+from contextlib import nullcontext
+
 from agents.personal_planner_agent import personal_planner_agent
 from agents.planner_agent import planner_agent
 from agents.generator_agent import generator_agent
-from agents.validator_agent import validator_agent
+from agents.validator_agent import validator_agent, speculative_review
 from agents.formatter_agent import formatter_agent
 from services.logger import get_logger
+from services.llm_cache import canonical_json
+from services.single_flight import SingleFlight
+from services.job_queue import JobQueue
+from services.request_context import use_deadline, reserve_time, request_deadline, sharing_key, within_deadline
+from services.plan_store import plan_store, with_plan_ref
 
 logger = get_logger("pipeline")
 
+# Time budget of one /generate or /refine-plan request (0 = none), kept under
+# the serverless function timeout; generation leaves PIPELINE_FINALIZE_SECONDS
+# of it for validation, formatting and storing.
+PIPELINE_DEADLINE_SECONDS = float(os.getenv("PIPELINE_DEADLINE_SECONDS", "55"))
+PIPELINE_FINALIZE_SECONDS = float(os.getenv("PIPELINE_FINALIZE_SECONDS", "2"))
+# ... and validation leaves this much for formatting and storing
+PIPELINE_FORMAT_SECONDS = float(os.getenv("PIPELINE_FORMAT_SECONDS", "0.5"))
+
+# Identical concurrent requests (same canonical form input) share one run
+pipeline_flight = SingleFlight("pipeline")
+
+
+async def run_agent_pipeline(data: dict, on_event=None, planner_output: dict = None):
+    """
+    Run planner → generator → validator → formatter and return the final
+    curriculum, stored as a new plan of the caller's own.
+    With `on_event(event, payload)` (async) the caller also receives stage
+    progress and partial sections; such runs are not coalesced.
+    `planner_output` (the semester plan or personal learner profile) skips
+    the planner call, e.g. when a batch shares one plan between inputs.
+    """
+    curriculum, validation = await generate_curriculum(data, on_event, planner_output)
+    return store_plan(curriculum, validation)
+
+
+async def generate_curriculum(data: dict, on_event=None, planner_output: dict = None):
+    """
+    (formatted curriculum, validation) of one pipeline run, not yet stored.
+    Identical concurrent calls without `on_event` share one run; each gets
+    its own copy.
+    """
+    if on_event is not None:
+        return await _run_agent_pipeline(data, on_event, planner_output)
+    shared = pipeline_flight.do(
+        _flight_key(data, planner_output), lambda: _run_agent_pipeline(data, planner_output=planner_output),
+        request_deadline(),
+    )
+    # the shared run keeps the deadline of the caller that started it
+    return await within_deadline(shared, "Pipeline run")
+
+
+def _flight_key(data: dict, planner_output: dict = None) -> str:
+    """
+    Callers share a run only when it would run for each of them as it runs
+    for the first. The shared task inherits the first caller's context, so
+    without the priority class in the key a /generate joining a batch item's
+    run would run at background priority; deadlines are matched by
+    pipeline_flight itself, so a batch item (no deadline) never joins a
+    /generate's run or the reverse. A run started with a planner_output
+    also skips the planner call, unlike one without.
+    """
+    return canonical_json({
+        "data": data,
+        "context": sharing_key(),
+        "planner_output": planner_output is not None,
+    })
+
+
+def store_plan(curriculum: dict, validation: dict) -> dict:
+    """
+    Store a pipeline result as a new plan and return it with its plan_id.
+    Called once per caller, never inside a shared run: callers coalesced
+    onto one run must not share a plan, or one user's refinements would
+    show up as versions of another user's plan.
+    """
+    # refine / export can now reference the plan instead of re-sending it
+    plan_id, version = plan_store.create(curriculum, validation)
+    return with_plan_ref(curriculum, plan_id, version)
+
+
+def pipeline_deadline():
+    """Deadline for a run a client is waiting on (none when PIPELINE_DEADLINE_SECONDS=0)."""
+    return use_deadline(PIPELINE_DEADLINE_SECONDS) if PIPELINE_DEADLINE_SECONDS > 0 else nullcontext()
+
+
+async def _emit(on_event, event: str, payload: dict):
+    if on_event is not None:
+        await on_event(event, payload)
 
 
-async def run_agent_pipeline(data: dict):
+async def _run_agent_pipeline(data: dict, on_event=None, planner_output: dict = None):
+
+    # hybrid validation reviews each section as the generator emits it
+    speculative = speculative_review()
+    try:
+        with reserve_time(PIPELINE_FINALIZE_SECONDS):
+            generator_events = on_event if speculative is None else speculative.listen(on_event)
+            curriculum = await _plan_and_generate(data, generator_events, planner_output)
+
+        await _emit(on_event, "stage", {"stage": "generator", "status": "done"})
+
+        # ================= VALIDATION =================
+        # with little of the deadline left the LLM review is skipped, not awaited
+        with reserve_time(PIPELINE_FORMAT_SECONDS):
+            validation = await validator_agent(curriculum, data, speculative=speculative)
+    finally:
+        if speculative is not None:
+            speculative.close()
+    await _emit(on_event, "stage", {"stage": "validator", "status": "done", "validation_status": validation.get("status")})
+
+    # ✅ CORRECT CALL — TWO ARGUMENTS
+    final_output = await formatter_agent(curriculum, validation)
+    await _emit(on_event, "stage", {"stage": "formatter", "status": "done"})
+
+    # DEBUG: Log what's being returned to frontend
+    logger.info("PIPELINE FINAL OUTPUT")
+    if "semesters" in final_output:
+        logger.debug("Has semesters: %d", len(final_output["semesters"]))
+        if final_output["semesters"]:
+            first_sem = final_output["semesters"][0]
+            logger.debug("First semester has %d courses", len(first_sem.get('courses', [])))
+            if "courses" in first_sem and first_sem["courses"]:
+                first_course = first_sem["courses"][0]
+                logger.debug("First course keys: %s", list(first_course.keys()))
+                logger.debug("First course has skills: %s", 'skills' in first_course)
+                logger.debug("First course has topics: %s", 'topics' in first_course)
+                logger.debug("First course has outcome_project: %s", 'outcome_project' in first_course)
+                logger.debug("First course sample: %s", first_course)
+
+    return final_output, validation
+
+
+async def _plan_and_generate(data: dict, on_event=None, planner_output: dict = None):
 
     planner_type = data.get("planner_type", "semester")
 
     # ================= PERSONAL PLANNER =================
     if planner_type == "personal":
 
-        learner_profile = await personal_planner_agent(data)
+        learner_profile = planner_output if planner_output is not None else await personal_planner_agent(data)
+        await _emit(on_event, "stage", {"stage": "planner", "status": "done"})
 
         # Pass original data fields to generator along with planner_type
         generator_input = {
@@ -30,35 +159,19 @@ async def run_agent_pipeline(data: dict):
             "learner_profile": learner_profile
         }
         
-        curriculum = await generator_agent(generator_input)
+        curriculum = await generator_agent(generator_input, on_event)
 
     # ================= SEMESTER PLANNER =================
     else:
 
-        plan = await planner_agent(data)
+        plan = dict(planner_output) if planner_output is not None else await planner_agent(data)
         plan["planner_type"] = "semester"
+        await _emit(on_event, "stage", {"stage": "planner", "status": "done"})
 
-        curriculum = await generator_agent(plan)
+        curriculum = await generator_agent(plan, on_event)
 
-    # ================= VALIDATION =================
-    validation = await validator_agent(curriculum)
+    return curriculum
 
-    # ✅ CORRECT CALL — TWO ARGUMENTS
-    final_output = await formatter_agent(curriculum, validation)
-
-    # DEBUG: Log what's being returned to frontend
-    logger.info("PIPELINE FINAL OUTPUT")
-    if "semesters" in final_output:
-        logger.debug("Has semesters: %d", len(final_output["semesters"]))
-        if final_output["semesters"]:
-            first_sem = final_output["semesters"][0]
-            logger.debug("First semester has %d courses", len(first_sem.get('courses', [])))
-            if "courses" in first_sem and first_sem["courses"]:
-                first_course = first_sem["courses"][0]
-                logger.debug("First course keys: %s", list(first_course.keys()))
-                logger.debug("First course has skills: %s", 'skills' in first_course)
-                logger.debug("First course has topics: %s", 'topics' in first_course)
-                logger.debug("First course has outcome_project: %s", 'outcome_project' in first_course)
-                logger.debug("First course sample: %s", first_course)
 
-    return final_output
\ No newline at end of file
+# POST /jobs — pipeline runs detached from the request, JOB_WORKERS at a time
+pipeline_jobs = JobQueue(run_agent_pipeline)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Benchmark: POST /generate/batch vs looping over /generate one by one.
+The batch holds 6 programs, each sent 4 times: twice verbatim, once with
+different casing / spacing, once with an extra bookkeeping key. Verbatim
+copies run once; the variants share the planner call. The response cache is
+disabled so only the batch scheduling explains the savings.
+Usage: python scripts/bench_batch_generate.py [--concurrency 4] [--delay 0.2]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+import httpx
+
+from fake_llm_provider import FakeProvider
+from services import llm_client
+from api.main import app
+
+SKILLS = ["Data Science", "Cyber Security", "Robotics", "Cloud Computing", "Game Design", "Bioinformatics"]
+
+
+def batch_items() -> list:
+    items = []
+    for skill in SKILLS:
+        form = {"planner_type": "semester", "skill": skill, "level": "Bachelors", "semesters": 4,
+                "weekly_hours": 20, "focus": "Industry", "include_capstone": True}
+        items += [
+            form,
+            dict(form),
+            dict(form, skill=f"  {skill.upper()} ", semesters="4"),
+            dict(form, department="Engineering"),
+        ]
+    return items
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered), -(-pct * len(ordered) // 100)) - 1)]
+
+
+async def sequential(client, items, fake) -> dict:
+    fake.calls = 0
+    started = time.perf_counter()
+    latencies = []
+    for item in items:
+        response = await client.post("/generate", json=item)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    wall = time.perf_counter() - started
+    return {"wall": wall, "calls": fake.calls, "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95), "throughput": len(items) / wall * 60}
+
+
+async def batch(client, items, fake, concurrency) -> dict:
+    fake.calls = 0
+    started = time.perf_counter()
+    response = await client.post("/generate/batch", json={"items": items, "concurrency": concurrency})
+    wall = time.perf_counter() - started
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    summary = lines[-1]["summary"]
+    if summary["failed"]:
+        raise SystemExit(f"batch: {summary['failed']} items failed")
+    latencies = [line["finished_after_seconds"] for line in lines[:-1]]
+    return {"wall": wall, "calls": fake.calls, "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95), "throughput": len(items) / wall * 60, "summary": summary}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--concurrency", type=int, default=4)
+    ap.add_argument("--delay", type=float, default=0.2)
+    args = ap.parse_args()
+
+    items = batch_items()
+    fake = FakeProvider(delay=args.delay)
+    fake.start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+
+    async def both():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            loop = await sequential(client, items, fake)
+            batched = await batch(client, items, fake, args.concurrency)
+        await llm_client.close_llm_clients()
+        return loop, batched
+
+    try:
+        loop, batched = asyncio.run(both())
+    finally:
+        fake.stop()
+
+    s = batched["summary"]
+    print(f"{len(items)} inputs ({s['unique']} unique, {s['planner_calls']} planner calls), "
+          f"provider delay {args.delay}s, batch concurrency {args.concurrency}")
+    print(f"  {'mode':<10} {'provider calls':>14} {'wall':>8} {'items/min':>10} {'p50 done':>9} {'p95 done':>9}")
+    for name, r in (("loop", loop), ("batch", batched)):
+        print(f"  {name:<10} {r['calls']:>14} {r['wall']:>7.2f}s {r['throughput']:>10.1f} "
+              f"{r['p50']:>8.2f}s {r['p95']:>8.2f}s")
+    print(f"  {loop['calls'] / batched['calls']:.1f}x fewer provider calls, "
+          f"{batched['throughput'] / loop['throughput']:.1f}x throughput")
+
+
+if __name__ == "__main__":
+    main()
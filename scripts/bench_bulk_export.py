@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Benchmark: exporting 24 plans, one /export-pdf call at a time vs one
+/export-pdf/bulk ZIP.
+The plans are 8-semester curricula: a third stored in the plan store, a third
+posted as signed by the formatter, a third posted raw (these
+get the structural checks and formatter). One extra item names a missing
+plan and must show up as failed in the manifest. The bulk archive is
+checked (every PDF present and valid, manifest with render times); the time
+to its first bytes and its largest streamed chunk show it is not buffered.
+Usage: python scripts/bench_bulk_export.py [--plans 24] [--semesters 8] [--concurrency 4]
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["PLAN_STORE_BACKEND"] = "memory"
+
+import httpx
+
+from fake_llm_provider import build_curriculum
+from services.plan_store import plan_store
+from services.plan_signature import SIGNATURE_FIELD, sign_plan
+from services.pdf_export import pdf_exporter
+from orchestrator.bulk_export import run_bulk_export
+from api.main import app
+
+
+def make_items(count: int, semesters: int, tag: str) -> list:
+    items = []
+    for i in range(count):
+        curriculum = build_curriculum(semesters, courses=4)
+        curriculum["program_title"] = f"{tag} program {i}"
+        if i % 3 == 0:
+            raw = dict(curriculum, validation_status="approved", validation_issues=[], validation_suggestions=[])
+            plan_id, _ = plan_store.create(raw, {"status": "approved"})
+            items.append({"plan_id": plan_id})
+        elif i % 3 == 1:
+            signed = dict(curriculum, validation_status="approved", validation_issues=[], validation_suggestions=[])
+            signed[SIGNATURE_FIELD] = sign_plan(signed)
+            items.append({"curriculum": signed})
+        else:
+            items.append({"curriculum": curriculum})
+    return items
+
+
+async def one_by_one(client, items: list) -> float:
+    started = time.perf_counter()
+    for item in items:
+        response = await client.post("/export-pdf", json=item)
+        if response.status_code != 200 or not response.content.startswith(b"%PDF"):
+            raise SystemExit(f"/export-pdf failed: {response.status_code}")
+    return time.perf_counter() - started
+
+
+async def bulk(items: list, concurrency: int):
+    # drive the endpoint's generator directly: httpx's ASGI transport buffers
+    # whole responses, which would hide the streaming
+    started = time.perf_counter()
+    body, chunks, first = io.BytesIO(), [], None
+    async for chunk in run_bulk_export(items, concurrency):
+        first = first or time.perf_counter() - started
+        chunks.append(len(chunk))
+        body.write(chunk)
+    return time.perf_counter() - started, first, max(chunks), body.getvalue()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--plans", type=int, default=24)
+    ap.add_argument("--semesters", type=int, default=8)
+    ap.add_argument("--concurrency", type=int, default=4)
+    args = ap.parse_args()
+
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            # start the worker pool outside the measurement
+            await client.post("/export-pdf", json={"curriculum": build_curriculum(1, 1)})
+            sequential = await one_by_one(client, make_items(args.plans, args.semesters, "sequential"))
+            items = make_items(args.plans, args.semesters, "bulk") + [{"plan_id": "missing"}]
+            return sequential, await bulk(items, args.concurrency)
+
+    try:
+        sequential, (wall, first, largest, archive) = asyncio.run(run())
+    finally:
+        pdf_exporter.shutdown()
+
+    with zipfile.ZipFile(io.BytesIO(archive)) as zf:
+        manifest = json.loads(zf.read("manifest.json"))
+        pdfs = [name for name in zf.namelist() if name.endswith(".pdf")]
+        if len(pdfs) != args.plans or not all(zf.read(name).startswith(b"%PDF") for name in pdfs):
+            raise SystemExit(f"archive holds {len(pdfs)} valid PDFs, expected {args.plans}")
+    summary = manifest["summary"]
+    failed = [item for item in manifest["items"] if item["status"] == "failed"]
+    if summary["failed"] != 1 or "missing" not in failed[0]["error"]:
+        raise SystemExit(f"missing plan not reported as failed: {failed}")
+    sources = {}
+    for item in manifest["items"]:
+        sources[item.get("source")] = sources.get(item.get("source"), 0) + 1
+
+    print(f"{args.plans} plans of {args.semesters} semesters, {pdf_exporter.workers} render processes")
+    print(f"  one /export-pdf call at a time: {sequential:.2f}s")
+    print(f"  /export-pdf/bulk (concurrency {args.concurrency}): {wall:.2f}s, first bytes after {first:.2f}s, "
+          f"{len(archive) / 1024:.0f} KB archive, largest chunk {largest / 1024:.0f} KB")
+    print(f"  manifest: {summary['succeeded']} done, {summary['failed']} failed, sources {sources}, "
+          f"render p50 {summary['render_seconds']['p50']}s / max {summary['render_seconds']['max']}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Throughput benchmark: N concurrent /generate requests against a local fake provider.
+Runs the same load twice in one worker — once with the legacy blocking Groq call
+(requests.post inside the coroutine) and once with the pooled async client — and
+reports requests/second for each. The response cache and single-flight are off
+and every request carries its own skill, so each pass makes all of its own
+provider calls.
+Usage: python scripts/bench_concurrent_generate.py [-n 20] [--delay 0.5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)  # the app mounts static/ and templates/ relative to cwd
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["SINGLE_FLIGHT_ENABLED"] = "false"
+# the blocking pass runs far past a request's budget; measure it, don't cut it off
+os.environ["PIPELINE_DEADLINE_SECONDS"] = "0"
+
+import httpx
+import requests
+
+from fake_llm_provider import FakeProvider
+from services import llm_client
+from api.main import app
+
+SEMESTER_FORM = {
+    "planner_type": "semester",
+    "skill": "Artificial Intelligence",
+    "level": "Masters",
+    "semesters": 4,
+    "weekly_hours": 15,
+    "focus": "Industry",
+    "include_capstone": False,
+}
+
+
+async def legacy_groq_generate(prompt: str, json_mode: bool = False) -> str:
+    """The pre-async call shape: a blocking HTTP request inside a coroutine."""
+    response = requests.post(
+        llm_client.GROQ_URL,
+        headers={"Authorization": f"Bearer {llm_client.GROQ_API_KEY}"},
+        json=llm_client._groq_request(prompt, json_mode=json_mode),
+    )
+    return response.json()["choices"][0]["message"]["content"]
+
+
+async def run_load(n: int, tag: str) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[
+            client.post("/generate", json=dict(SEMESTER_FORM, skill=f"{tag} Skill {i}"))
+            for i in range(n)
+        ])
+        elapsed = time.perf_counter() - started
+    failed = [r for r in responses if r.status_code != 200]
+    if failed:
+        raise SystemExit(f"{len(failed)} requests failed: {failed[0].text[:200]}")
+    return elapsed
+
+
+async def main(n: int, delay: float):
+    fake = FakeProvider(delay=delay).start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None  # route everything to the fake Groq endpoint
+
+    async_groq_generate = llm_client._groq_generate
+    try:
+        llm_client._groq_generate = legacy_groq_generate
+        before = await run_load(n, "Blocking")
+        llm_client._groq_generate = async_groq_generate
+        after = await run_load(n, "Async")
+    finally:
+        llm_client._groq_generate = async_groq_generate
+        await llm_client.close_llm_clients()
+        fake.stop()
+
+    print(f"{n} concurrent /generate requests, provider delay {delay:.2f}s, {fake.calls} provider calls")
+    print(f"  blocking provider calls: {before:7.2f}s  {n / before:7.2f} req/s")
+    print(f"  async provider calls:    {after:7.2f}s  {n / after:7.2f} req/s")
+    print(f"  speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-n", type=int, default=20, help="concurrent requests")
+    parser.add_argument("--delay", type=float, default=0.5, help="fake provider latency (s)")
+    args = parser.parse_args()
+    asyncio.run(main(args.n, args.delay))
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Benchmark: Markdown, HTML and CSV exports against the PDF render, for an
+8- and 16-semester curriculum and a personal roadmap.
+For each format: time to the first streamed chunk, total time, peak Python
+memory (tracemalloc, above what was in use before) and output size. "pdf" is
+the ReportLab render itself, in this process, written to a temp file — the
+work the export engine's worker does.
+Also checks the CSV has one row per course/topic (or milestone/topic) and
+that /export answers every format.
+Usage: python scripts/bench_exporters.py [--sizes 8 16] [--courses 5] [--repeat 5]
+"""
+import argparse
+import asyncio
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["PLAN_STORE_BACKEND"] = "memory"
+os.environ["PDF_WORKERS"] = "0"
+
+import httpx
+
+from fake_llm_provider import build_curriculum, build_roadmap
+from services.exporters import EXPORTERS, export_stream
+from services.pdf_generator import write_pdf_file, pdf_styles
+from services.pdf_export import pdf_exporter
+from api.main import app
+
+
+def with_review(curriculum: dict) -> dict:
+    curriculum["validation_status"] = "approved"
+    curriculum["validation_issues"] = []
+    curriculum["validation_suggestions"] = ["Add a capstone"]
+    return curriculum
+
+
+def semester_plan(semesters: int, courses: int) -> dict:
+    curriculum = build_curriculum(semesters, courses)
+    for semester in curriculum["semesters"]:
+        for course in semester["courses"]:
+            course["description"] = "A hands-on course that builds on the previous semester. " * 6
+            for topic in course.get("topics", []):
+                if isinstance(topic, dict):
+                    topic["video_url"] = "https://www.youtube.com/results?search_query=" + topic.get("name", "")
+    return with_review(curriculum)
+
+
+def run_format(name: str, curriculum: dict, pdf_path: str):
+    """(seconds to first chunk, total seconds, bytes)."""
+    started = time.perf_counter()
+    if name == "pdf":
+        size = write_pdf_file(curriculum, pdf_path)
+        elapsed = time.perf_counter() - started
+        return elapsed, elapsed, size
+    first, size = None, 0
+    for chunk in export_stream(name, curriculum):
+        first = first or time.perf_counter() - started
+        size += len(chunk)
+    return first, time.perf_counter() - started, size
+
+
+def measure(name: str, curriculum: dict, repeat: int, pdf_path: str) -> dict:
+    runs = sorted(run_format(name, curriculum, pdf_path) for _ in range(repeat))
+    first, total, size = runs[len(runs) // 2]
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    run_format(name, curriculum, pdf_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"first": first, "total": total, "bytes": size, "peak": peak - before}
+
+
+def csv_rows(curriculum: dict) -> int:
+    body = b"".join(export_stream("csv", curriculum)).decode("utf-8")
+    return len(list(csv.reader(io.StringIO(body)))) - 1
+
+
+def expected_rows(curriculum: dict) -> int:
+    items = [c for s in curriculum.get("semesters", []) for c in s.get("courses", [])]
+    items += [m for p in curriculum.get("roadmap", []) for m in p.get("milestones", [])]
+    return sum(len(item.get("topics") or []) or 1 for item in items)
+
+
+async def check_endpoint(curriculum: dict) -> list:
+    failures = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        for name in [*EXPORTERS, "pdf"]:
+            response = await client.post(f"/export?format={name}", json={"curriculum": curriculum})
+            if response.status_code != 200 or not response.content:
+                failures.append(f"/export?format={name}: {response.status_code}")
+        response = await client.post("/export?format=docx", json={"curriculum": curriculum})
+        if response.status_code != 400:
+            failures.append(f"/export?format=docx: expected 400, got {response.status_code}")
+    return failures
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[8, 16])
+    ap.add_argument("--courses", type=int, default=5)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    plans = [(f"{n} semesters", semester_plan(n, args.courses)) for n in args.sizes]
+    plans.append(("roadmap", with_review(build_roadmap(phases=6, milestones=4))))
+
+    failures = []
+    for label, curriculum in plans:
+        if csv_rows(curriculum) != expected_rows(curriculum):
+            failures.append(f"{label}: {csv_rows(curriculum)} CSV rows, expected {expected_rows(curriculum)}")
+    try:
+        failures += asyncio.run(check_endpoint(plans[0][1]))
+    finally:
+        pdf_exporter.shutdown()
+
+    pdf_styles()
+    with tempfile.TemporaryDirectory() as tmp:
+        pdf_path = os.path.join(tmp, "bench.pdf")
+        # fill ReportLab's font caches outside the measurement
+        write_pdf_file(semester_plan(1, 1), pdf_path)
+        for label, curriculum in plans:
+            print(f"{label}:")
+            print(f"  {'format':<9} {'first chunk':>11} {'total':>9} {'peak mem':>9} {'size':>8}")
+            for name in [*EXPORTERS, "pdf"]:
+                r = measure(name, curriculum, args.repeat, pdf_path)
+                print(f"  {name:<9} {r['first'] * 1000:>9.1f}ms {r['total'] * 1000:>7.1f}ms "
+                      f"{r['peak'] / 1024:>6.0f} KB {r['bytes'] / 1024:>5.0f} KB")
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""Generator latency benchmark: one whole-program call vs skeleton + parallel sections.
+The fake provider charges time per KB of output (1 s/KB is roughly 250 tokens/s),
+so the single call pays for the whole program while fan-out pays for the skeleton
+plus the longest section. Also reports the largest single response, which is what runs
+into Groq's max_tokens limit and triggers truncation repair.
+Usage: python scripts/bench_generator_fanout.py [--semesters 8] [--seconds-per-kb 1.0]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from fake_llm_provider import FakeProvider, agent_responder
+from services import llm_client
+from agents import generator_agent as generator_module
+
+# ~4 characters per token; Groq calls are capped at max_tokens=8000
+GROQ_MAX_OUTPUT_KB = 8000 * 4 / 1024
+
+# size of every response body served during the current run
+sizes = []
+
+
+async def timed_generation(fake: FakeProvider, plan: dict, fanout: bool):
+    generator_module.GENERATOR_FANOUT = fanout
+    fake.calls = 0
+    sizes.clear()
+    started = time.perf_counter()
+    result = await generator_module.generator_agent(dict(plan))
+    elapsed = time.perf_counter() - started
+    return elapsed, fake.calls, max(sizes), len(result.get("semesters", []))
+
+
+def sized_responder(prompt: str) -> dict:
+    body = agent_responder(prompt)
+    sizes.append(len(str(body)) / 1024)
+    return body
+
+
+async def main(semesters: int, seconds_per_kb: float):
+    fake = FakeProvider(delay=0.2, seconds_per_kb=seconds_per_kb, responder=sized_responder).start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+
+    plan = {
+        "planner_type": "semester",
+        "program_title": "Benchmark Program",
+        "difficulty_progression": "Beginner to Advanced",
+        "courses_per_semester": 3,
+        "focus_tags": ["benchmark"],
+        "include_capstone": True,
+        "semesters": semesters,
+    }
+
+    try:
+        single = await timed_generation(fake, plan, fanout=False)
+        fanout = await timed_generation(fake, plan, fanout=True)
+    finally:
+        await llm_client.close_llm_clients()
+        fake.stop()
+
+    print(f"{semesters}-semester program, provider cost 0.2s + {seconds_per_kb}s/KB of output")
+    print(f"  {'mode':<10}{'wall time':>11}{'calls':>7}{'largest response':>19}{'semesters':>11}")
+    for name, (elapsed, calls, largest, count) in (("single", single), ("fan-out", fanout)):
+        print(f"  {name:<10}{elapsed:>10.2f}s{calls:>7}{largest:>16.1f} KB{count:>11}")
+    print(f"  speedup: {single[0] / fanout[0]:.1f}x; "
+          f"largest response vs ~{GROQ_MAX_OUTPUT_KB:.0f} KB Groq output cap: "
+          f"{single[2] / GROQ_MAX_OUTPUT_KB:.0%} -> {fanout[2] / GROQ_MAX_OUTPUT_KB:.0%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--semesters", type=int, default=8)
+    parser.add_argument("--seconds-per-kb", type=float, default=1.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.semesters, args.seconds_per_kb))
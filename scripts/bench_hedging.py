@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Tail-latency benchmark for hedged requests.
+Gemini is a scripted coroutine with a heavy tail (most replies fast, a few
+very slow but successful); Groq is the local fake provider at a steady
+latency. The same call_llm() load runs with hedging off and on, reporting
+p50 / p90 / p99 latency, hedges fired / won and the extra Groq calls paid.
+Usage: python scripts/bench_hedging.py [-n 300] [--concurrency 10]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["SINGLE_FLIGHT_ENABLED"] = "false"
+os.environ["LLM_ROUTING"] = "ordered"
+
+from fake_llm_provider import FakeProvider
+from services import llm_client
+from services.hedging import HedgePolicy, LLM_HEDGE_BUDGET, LLM_HEDGE_PERCENTILE
+from services.provider_health import provider_health, _percentile
+
+
+class TailGemini:
+    """Mostly 0.15-0.3s, but `slow_share` of calls take `slow_seconds`."""
+
+    def __init__(self, seed: int, slow_share: float, slow_seconds: float):
+        self.rng = random.Random(seed)
+        self.slow_share = slow_share
+        self.slow_seconds = slow_seconds
+        self.calls = 0
+
+    async def __call__(self, prompt: str, json_mode: bool = False) -> str:
+        self.calls += 1
+        slow = self.rng.random() < self.slow_share
+        await asyncio.sleep(self.slow_seconds if slow else self.rng.uniform(0.15, 0.3))
+        return json.dumps({"provider": "gemini"})
+
+
+async def run(n: int, concurrency: int, hedging: bool, fake: FakeProvider, args) -> dict:
+    provider_health.reset()
+    llm_client.llm_hedging = HedgePolicy(enabled=hedging)
+    gemini = TailGemini(seed=7, slow_share=args.slow_share, slow_seconds=args.slow_seconds)
+    llm_client._gemini_generate = gemini
+    groq_before = fake.calls
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            started = time.perf_counter()
+            await llm_client.call_llm("You are a test agent.", {"call": i})
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[one(i) for i in range(n)])
+    stats = llm_client.llm_hedging.stats()
+    return {
+        "wall": time.perf_counter() - started,
+        "p50": _percentile(latencies, 50),
+        "p90": _percentile(latencies, 90),
+        "p99": _percentile(latencies, 99),
+        "max": max(latencies),
+        "gemini_calls": gemini.calls,
+        "groq_calls": fake.calls - groq_before,
+        "fired": stats["hedges_fired"],
+        "won": stats["hedges_won"],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-n", type=int, default=300)
+    ap.add_argument("--concurrency", type=int, default=10)
+    ap.add_argument("--slow-share", type=float, default=0.04)
+    ap.add_argument("--slow-seconds", type=float, default=4.0)
+    ap.add_argument("--groq-delay", type=float, default=0.4)
+    args = ap.parse_args()
+
+    fake = FakeProvider(delay=args.groq_delay, responder=lambda prompt: {"provider": "groq"})
+    fake.start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = object()
+
+    async def both():
+        off = await run(args.n, args.concurrency, False, fake, args)
+        on = await run(args.n, args.concurrency, True, fake, args)
+        await llm_client.close_llm_clients()
+        return [("off", off), ("on", on)]
+
+    try:
+        results = asyncio.run(both())
+    finally:
+        fake.stop()
+
+    print(f"{args.n} calls, concurrency {args.concurrency}; Gemini {args.slow_share:.0%} of calls take "
+          f"{args.slow_seconds:.1f}s, Groq {args.groq_delay:.1f}s")
+    print(f"  {'hedging':<8} {'p50':>7} {'p90':>7} {'p99':>7} {'max':>7}  {'gemini':>6} {'groq':>5}  fired  won")
+    for name, r in results:
+        print(f"  {name:<8} {r['p50']:>6.2f}s {r['p90']:>6.2f}s {r['p99']:>6.2f}s {r['max']:>6.2f}s  "
+              f"{r['gemini_calls']:>6} {r['groq_calls']:>5}  {r['fired']:>5} {r['won']:>4}")
+    on = results[1][1]
+    print(f"  extra provider calls from hedging: {on['fired'] / args.n:.1%} (budget {LLM_HEDGE_BUDGET:.0%}, "
+          f"hedge after p{LLM_HEDGE_PERCENTILE:g})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Benchmark: a 10-refinement session on an 8-semester plan, full vs incremental
+re-validation and re-formatting.
+Runs the /refine-plan handler against a stored plan with VALIDATOR_MODE=hybrid.
+"full" reviews the whole plan with the LLM and re-formats every semester after
+each refinement; "incremental" reviews and formats only the semesters whose
+content hash changed. The fake provider charges per KB of prompt and of output,
+so validator latency follows token counts.
+Usage: python scripts/bench_incremental_refine.py [--semesters 8] [--seconds-per-input-kb 0.05]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["VALIDATOR_MODE"] = "hybrid"
+os.environ["PLAN_STORE_BACKEND"] = "memory"
+
+from fake_llm_provider import FakeProvider, agent_responder, build_curriculum
+from services import llm_client
+from services.plan_store import plan_store
+from agents import validator_agent as validator_module
+from agents import formatter_agent as formatter_module
+from api import main as api
+
+EDITS = [
+    "Make semester 3 more practical",
+    "Semester 5 should focus more on cloud deployment",
+    "Add a capstone project to semester 8",
+    "Make semester 1 more hands-on",
+    "Semester 6 needs more practical security work",
+    "Rework semester 2 around a team project",
+    "Semester 7 should focus more on system design",
+    "Make semester 4 more practical",
+    "Semester 5 needs a hands-on project",
+    "Make semester 8 more practical for industry",
+]
+
+
+async def session(mode: str, plan: dict, validator_bytes: list) -> dict:
+    incremental = mode == "incremental"
+    validator_module.VALIDATOR_INCREMENTAL = incremental
+    validation = await validator_module.validator_agent(plan)
+    formatted = await formatter_module.formatter_agent(plan, validation)
+    plan_id, _ = plan_store.create(formatted, validation)
+
+    validator_bytes.clear()
+    validate_time = 0.0
+    validate = api.validator_agent
+    format_ = api.formatter_agent
+
+    async def timed_validator(*args, **kwargs):
+        nonlocal validate_time
+        started = time.perf_counter()
+        try:
+            return await validate(*args, **kwargs)
+        finally:
+            validate_time += time.perf_counter() - started
+
+    async def formatter(curriculum, validation, formatted_sections=None):
+        return await format_(curriculum, validation, formatted_sections if incremental else None)
+
+    api.validator_agent, api.formatter_agent = timed_validator, formatter
+    for stats in (validator_module.validator_stats, formatter_module.formatter_stats):
+        for key in stats:
+            stats[key] = 0
+    started = time.perf_counter()
+    try:
+        for instruction in EDITS:
+            result = await api.refine_plan({"plan_id": plan_id, "instruction": instruction})
+            if result.get("validation_status") in (None, "skipped"):
+                raise SystemExit(f"{mode}: validation was skipped")
+    finally:
+        api.validator_agent, api.formatter_agent = validate, format_
+
+    return {
+        "wall": time.perf_counter() - started,
+        "validate": validate_time,
+        "bytes": sum(validator_bytes),
+        "calls": len(validator_bytes),
+        "reused": validator_module.validator_stats["sections_reused"],
+        "formatted": formatter_module.formatter_stats["sections_formatted"],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--semesters", type=int, default=8)
+    ap.add_argument("--delay", type=float, default=0.2)
+    ap.add_argument("--seconds-per-kb", type=float, default=0.5)
+    ap.add_argument("--seconds-per-input-kb", type=float, default=0.05)
+    args = ap.parse_args()
+
+    plan = build_curriculum(args.semesters, 4)
+    validator_bytes = []
+
+    def responder(prompt: str) -> dict:
+        body = agent_responder(prompt)
+        if "curriculum validator" in prompt:
+            validator_bytes.append(len(prompt) + len(json.dumps(body)))
+        return body
+
+    fake = FakeProvider(delay=args.delay, seconds_per_kb=args.seconds_per_kb, responder=responder,
+                        seconds_per_input_kb=args.seconds_per_input_kb)
+    fake.start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+
+    async def both():
+        full = await session("full", plan, validator_bytes)
+        incremental = await session("incremental", plan, validator_bytes)
+        await llm_client.close_llm_clients()
+        return full, incremental
+
+    try:
+        full, incremental = asyncio.run(both())
+    finally:
+        fake.stop()
+
+    print(f"{len(EDITS)} refinements of a {args.semesters}-semester plan, VALIDATOR_MODE=hybrid "
+          f"(provider: {args.delay}s + {args.seconds_per_input_kb}s/KB in + {args.seconds_per_kb}s/KB out)")
+    print(f"  {'mode':<12} {'calls':>5} {'validator':>10} {'~tokens':>8} {'validate':>9} {'wall':>8} "
+          f"{'reused':>7} {'formatted':>9}")
+    for name, r in (("full", full), ("incremental", incremental)):
+        print(f"  {name:<12} {r['calls']:>5} {r['bytes'] / 1024:>8.1f}KB {r['bytes'] // 4:>8} "
+              f"{r['validate']:>8.2f}s {r['wall']:>7.2f}s {r['reused']:>7} {r['formatted']:>9}")
+    print(f"  validator tokens {full['bytes'] / incremental['bytes']:.1f}x fewer, "
+          f"validation {full['validate'] / incremental['validate']:.1f}x faster, "
+          f"session {full['wall'] / incremental['wall']:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
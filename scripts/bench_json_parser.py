@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: legacy two-pass extract_json/detect_truncation vs IncrementalJSONParser.
+Model outputs of roughly 50-200 KB (fenced, pretty-printed curricula) are parsed
+complete and truncated at 70%. The legacy functions are copied verbatim from the
+pre-parser llm_client so the comparison stays honest as the code evolves.
+Usage: python scripts/bench_json_parser.py [--repeat 20]
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+from fake_llm_provider import build_curriculum
+from services.json_stream import IncrementalJSONParser
+
+
+# ================= LEGACY (two-pass, per character) =================
+
+def legacy_extract_json(text: str):
+    if not text:
+        raise Exception("Empty model response")
+    text = text.strip()
+    if text.startswith("```"):
+        parts = text.split("```")
+        if len(parts) > 1:
+            text = parts[1].strip()
+    start = text.find("{")
+    if start == -1:
+        raise Exception("No JSON detected in model response")
+    depth = 0
+    end = -1
+    in_string = False
+    escape_next = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if escape_next:
+            escape_next = False
+            continue
+        if ch == '\\':
+            escape_next = True
+            continue
+        if ch == '"':
+            in_string = not in_string
+            continue
+        if not in_string:
+            if ch == '{':
+                depth += 1
+            elif ch == '}':
+                depth -= 1
+                if depth == 0:
+                    end = i
+                    break
+    if end == -1:
+        candidate = text[start:]
+        unclosed_braces = 0
+        unclosed_brackets = 0
+        in_string = False
+        escape_next = False
+        for ch in candidate:
+            if escape_next:
+                escape_next = False
+                continue
+            if ch == '\\':
+                escape_next = True
+                continue
+            if ch == '"':
+                in_string = not in_string
+                continue
+            if not in_string:
+                if ch == '{':
+                    unclosed_braces += 1
+                elif ch == '}':
+                    unclosed_braces -= 1
+                elif ch == '[':
+                    unclosed_brackets += 1
+                elif ch == ']':
+                    unclosed_brackets -= 1
+        repair = candidate
+        if unclosed_brackets > 0:
+            repair += ']' * unclosed_brackets
+        if unclosed_braces > 0:
+            repair += '}' * unclosed_braces
+        return repair
+    return text[start:end + 1]
+
+
+def legacy_detect_truncation(json_str: str) -> bool:
+    if not json_str:
+        return True
+    json_str = json_str.strip()
+    unclosed_braces = 0
+    unclosed_brackets = 0
+    in_string = False
+    escape_next = False
+    for ch in json_str:
+        if escape_next:
+            escape_next = False
+            continue
+        if ch == '\\':
+            escape_next = True
+            continue
+        if ch == '"':
+            in_string = not in_string
+            continue
+        if not in_string:
+            if ch == '{':
+                unclosed_braces += 1
+            elif ch == '}':
+                unclosed_braces -= 1
+            elif ch == '[':
+                unclosed_brackets += 1
+            elif ch == ']':
+                unclosed_brackets -= 1
+    return unclosed_braces > 0 or unclosed_brackets > 0
+
+
+# ================= RUNNERS =================
+
+def run_legacy(text: str):
+    cleaned = legacy_extract_json(text)
+    truncated = legacy_detect_truncation(cleaned)
+    try:
+        return json.loads(cleaned), truncated
+    except json.JSONDecodeError:
+        return None, truncated
+
+
+def run_incremental(text: str, chunk: int = 0):
+    parser = IncrementalJSONParser()
+    if chunk:
+        for start in range(0, len(text), chunk):
+            parser.feed(text[start:start + chunk])
+    else:
+        parser.feed(text)
+    try:
+        return parser.result(), parser.truncated
+    except json.JSONDecodeError:
+        return None, parser.truncated
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def model_output(semesters: int) -> str:
+    doc = build_curriculum(semesters, courses=6)
+    for sem in doc["semesters"]:
+        for course in sem["courses"]:
+            course["outcome_project"] = 'Build a "production-ready" service {with tests} [and docs]. ' * 4
+    return "```json\n" + json.dumps(doc, indent=2) + "\n```"
+
+
+def main(repeat: int):
+    print(f"{'output':>9} {'case':<10}{'legacy':>10}{'single':>10}{'streamed':>10}  parsed(legacy/new)  truncated(legacy/new)")
+    for semesters in (8, 16, 24, 32):
+        full = model_output(semesters)
+        for case, text in (("complete", full), ("truncated", full[: int(len(full) * 0.7)])):
+            legacy_ms = best_of(lambda: run_legacy(text), repeat)
+            single_ms = best_of(lambda: run_incremental(text), repeat)
+            # provider streams arrive in small deltas
+            streamed_ms = best_of(lambda: run_incremental(text, chunk=256), repeat)
+            legacy_doc, legacy_trunc = run_legacy(text)
+            new_doc, new_trunc = run_incremental(text, chunk=256)
+            print(
+                f"{len(text) / 1024:>7.0f}KB {case:<10}{legacy_ms:>8.2f}ms{single_ms:>8.2f}ms{streamed_ms:>8.2f}ms"
+                f"  {str(legacy_doc is not None):>6}/{str(new_doc is not None):<6}"
+                f"       {str(legacy_trunc):>6}/{str(new_trunc):<6}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.repeat)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark: peak Python memory of one PDF export (tracemalloc) for 4, 8 and
+16-semester curricula.
+"bytes"          the previous path: render into a BytesIO, getvalue(), wrap
+                 the copy in another BytesIO for the response;
+"spool/thread"   the export engine rendering in a thread (PDF_WORKERS=0):
+                 ReportLab writes to a spool file, the response streams it
+                 in PDF_STREAM_CHUNK_BYTES chunks;
+"spool/process"  the same with a worker process doing the render — what the
+                 API process itself holds.
+Each mode's peak is measured above the memory in use before the export.
+Usage: python scripts/bench_pdf_memory.py [--sizes 4 8 16] [--courses 5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+from fake_llm_provider import build_curriculum
+from services.pdf_generator import generate_pdf_from_curriculum, pdf_styles
+from services.pdf_export import PdfExporter, iter_file
+
+
+def plan(semesters: int, courses: int) -> dict:
+    curriculum = build_curriculum(semesters, courses)
+    for semester in curriculum["semesters"]:
+        for course in semester["courses"]:
+            course["description"] = "A hands-on course that builds on the previous semester. " * 6
+    curriculum["validation_status"] = "approved"
+    return curriculum
+
+
+def drain(chunks) -> int:
+    """Consume a response body the way the server would, chunk by chunk."""
+    return sum(len(chunk) for chunk in chunks)
+
+
+async def measure(mode: str, curriculum: dict, exporters: dict):
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    if mode == "bytes":
+        pdf = generate_pdf_from_curriculum(curriculum)
+        size = drain(BytesIO(pdf))
+        del pdf
+    else:
+        handle, size = await exporters[mode].open(curriculum)
+        drain(iter_file(handle))
+    _, peak = tracemalloc.get_traced_memory()
+    return size, peak - before
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[4, 8, 16])
+    ap.add_argument("--courses", type=int, default=5)
+    args = ap.parse_args()
+
+    pdf_styles()
+    exporters = {"spool/thread": PdfExporter(workers=0), "spool/process": PdfExporter(workers=1)}
+
+    async def run():
+        # start the worker and fill ReportLab's font caches outside the measurement
+        await exporters["spool/process"].open(plan(1, 1))
+        generate_pdf_from_curriculum(plan(1, 1))
+        tracemalloc.start()
+        rows = []
+        for semesters in args.sizes:
+            curriculum = plan(semesters, args.courses)
+            row = {}
+            for mode in ("bytes", "spool/thread", "spool/process"):
+                curriculum["program_title"] = f"{mode} {semesters}"   # a fresh render each time
+                row[mode] = await measure(mode, curriculum, exporters)
+            rows.append((semesters, row))
+        tracemalloc.stop()
+        return rows
+
+    try:
+        rows = asyncio.run(run())
+    finally:
+        for exporter in exporters.values():
+            exporter.shutdown()
+
+    print(f"Peak traced memory of one export ({args.courses} courses per semester)")
+    print(f"  {'semesters':>9} {'PDF size':>9} {'bytes':>10} {'spool/thread':>13} {'spool/process':>14}")
+    for semesters, row in rows:
+        size = row["bytes"][0]
+        print(f"  {semesters:>9} {size / 1024:>7.0f}KB " + " ".join(
+            f"{row[mode][1] / 1024:>{w}.0f}KB" for mode, w in (("bytes", 8), ("spool/thread", 11), ("spool/process", 12))
+        ))
+
+
+if __name__ == "__main__":
+    main()
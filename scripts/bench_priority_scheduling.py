@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Benchmark: interactive latency on a saturated provider, FIFO vs priority classes.
+A batch of background generations and a few /generate-sized calls keep a
+provider with 8 concurrent slots busy for ~10s; meanwhile 5 small
+interactive refine calls arrive one second apart.
+"fifo" runs everything in one class with no reserved slots (one shared
+queue); "wfq" tags the calls interactive / generate / background and uses
+the default weights and reserved interactive slots.
+Usage: python scripts/bench_priority_scheduling.py [--delay 1.0] [--background 64]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["LLM_GROQ_MAX_CONCURRENCY"] = "8"
+
+from fake_llm_provider import FakeProvider
+from services import llm_client, llm_scheduler as scheduler_module
+from services.llm_scheduler import llm_scheduler
+from services.request_context import use_priority, INTERACTIVE, GENERATE, BACKGROUND
+
+BIG = "x" * 12000     # a generation-sized payload
+SMALL = "y" * 800     # a patch-refine-sized payload
+
+
+async def timed_call(priority, payload: dict, latencies: list, prioritised: bool):
+    started = time.perf_counter()
+    if prioritised:
+        with use_priority(priority):
+            await llm_client.call_llm("You are a test agent.", payload)
+    else:
+        await llm_client.call_llm("You are a test agent.", payload)
+    latencies.append(time.perf_counter() - started)
+
+
+async def run(mode: str, args) -> dict:
+    prioritised = mode == "wfq"
+    scheduler_module.LLM_INTERACTIVE_RESERVED_SLOTS = 2 if prioritised else 0
+    llm_scheduler._providers.clear()
+
+    interactive, generate, background = [], [], []
+    load = [
+        asyncio.create_task(timed_call(BACKGROUND, {"bg": i, "text": BIG}, background, prioritised))
+        for i in range(args.background)
+    ] + [
+        asyncio.create_task(timed_call(GENERATE, {"gen": i, "text": BIG}, generate, prioritised))
+        for i in range(args.generate)
+    ]
+    started = time.perf_counter()
+    edits = []
+    for i in range(5):
+        await asyncio.sleep(1.0)
+        edits.append(asyncio.create_task(
+            timed_call(INTERACTIVE, {"edit": i, "mode": mode, "text": SMALL}, interactive, prioritised)
+        ))
+    await asyncio.gather(*edits, *load)
+    return {
+        "interactive": interactive,
+        "generate": generate,
+        "background": background,
+        "wall": time.perf_counter() - started,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--delay", type=float, default=1.0)
+    ap.add_argument("--background", type=int, default=64)
+    ap.add_argument("--generate", type=int, default=16)
+    args = ap.parse_args()
+
+    fake = FakeProvider(delay=args.delay)
+    fake.start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+
+    async def both():
+        fifo = await run("fifo", args)
+        wfq = await run("wfq", args)
+        await llm_client.close_llm_clients()
+        return fifo, wfq
+
+    try:
+        fifo, wfq = asyncio.run(both())
+    finally:
+        fake.stop()
+
+    print(f"{args.background} background + {args.generate} generate calls on 8 provider slots "
+          f"({args.delay}s per call), 5 interactive edits 1s apart")
+    print(f"  {'mode':<5} {'interactive p50':>16} {'max':>7} {'generate p50':>13} {'background p50':>15} {'wall':>7}")
+    for name, r in (("fifo", fifo), ("wfq", wfq)):
+        p50 = {k: sorted(v)[len(v) // 2] for k, v in r.items() if k != "wall"}
+        print(f"  {name:<5} {p50['interactive']:>15.2f}s {max(r['interactive']):>6.2f}s "
+              f"{p50['generate']:>12.2f}s {p50['background']:>14.2f}s {r['wall']:>6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Benchmark: patch-based vs full-rewrite refinement of an 8-semester plan.
+The fake provider charges a fixed delay plus generation time per KB of output,
+so latency follows output size the way token-by-token generation does.
+Each small edit runs once with REFINE_MODE=full and once with REFINE_MODE=patch;
+reports model output size (~tokens) and wall time.
+Usage: python scripts/bench_refine_patch.py [--semesters 8] [--seconds-per-kb 1.0]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from fake_llm_provider import FakeProvider, agent_responder, build_curriculum
+from services import llm_client
+from agents import refine_agent
+
+EDITS = [
+    "Make semester 3 more practical",
+    "Add a capstone project to the last semester",
+    "Semester 5 should focus more on cloud deployment",
+    "Swap the outcome project of Course 2.1 for a team project",
+    "Make semesters 6 and 7 more hands-on",
+]
+
+
+async def run(mode: str, plan: dict, output_sizes: list) -> dict:
+    refine_agent.REFINE_MODE = mode
+    output_sizes.clear()
+    started = time.perf_counter()
+    for instruction in EDITS:
+        refined = await refine_agent.refine_agent(plan, instruction)
+        if len(refined["semesters"]) != len(plan["semesters"]):
+            raise SystemExit(f"{mode}: refinement lost semesters")
+    return {"wall": time.perf_counter() - started, "output": sum(output_sizes), "calls": len(output_sizes)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--semesters", type=int, default=8)
+    ap.add_argument("--delay", type=float, default=0.2)
+    ap.add_argument("--seconds-per-kb", type=float, default=1.0)
+    args = ap.parse_args()
+
+    plan = build_curriculum(args.semesters, 4)
+    output_sizes = []
+
+    def responder(prompt: str) -> dict:
+        body = agent_responder(prompt)
+        output_sizes.append(len(json.dumps(body)))
+        return body
+
+    fake = FakeProvider(delay=args.delay, seconds_per_kb=args.seconds_per_kb, responder=responder)
+    fake.start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+
+    async def both():
+        full = await run("full", plan, output_sizes)
+        patch = await run("patch", plan, output_sizes)
+        await llm_client.close_llm_clients()
+        return full, patch
+
+    try:
+        full, patch = asyncio.run(both())
+    finally:
+        fake.stop()
+
+    n = len(EDITS)
+    print(f"{n} small edits on a {args.semesters}-semester plan "
+          f"(provider: {args.delay}s + {args.seconds_per_kb}s/KB of output)")
+    print(f"  {'mode':<6} {'output':>9} {'~tokens':>8} {'wall':>8} {'per edit':>9}")
+    for name, r in (("full", full), ("patch", patch)):
+        print(f"  {name:<6} {r['output'] / 1024:>7.1f}KB {r['output'] // 4:>8} {r['wall']:>7.2f}s {r['wall'] / n:>8.2f}s")
+    print(f"  output {full['output'] / patch['output']:.1f}x smaller, wall time {full['wall'] / patch['wall']:.1f}x faster "
+          f"(patch fallbacks: {refine_agent.refine_stats['fallbacks']})")
+
+
+if __name__ == "__main__":
+    main()
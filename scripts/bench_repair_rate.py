@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Repair-call rate before and after schema-constrained output.
+Replays recorded provider replies through both reply policies:
+
+  legacy  parse locally; any JSONDecodeError costs a second full-size
+          "repair" request (prompt + broken text resent); replies that parse
+          are passed on unchecked, whatever their shape
+  schema  parse + validate against the agent's pydantic model; malformed or
+          off-schema replies go to the next provider, never to a repair call
+
+Replies come from scripts/fixtures/sample_llm_outputs.jsonl (synthetic samples
+of the failure modes seen in production logs) or from a file recorded with
+LLM_RECORD_PATH=/path/replies.jsonl while the app serves real traffic.
+Note: replaying the same text cannot show JSON mode making providers produce
+fewer malformed replies in the first place; it only compares the policies.
+Usage: python scripts/bench_repair_rate.py [--file replies.jsonl] [-v]
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from models import schemas  # noqa: E402
+from services import llm_client  # noqa: E402
+from services.json_stream import IncrementalJSONParser  # noqa: E402
+
+DEFAULT_FILE = os.path.join(os.path.dirname(__file__), "fixtures", "sample_llm_outputs.jsonl")
+
+
+def legacy_policy(text: str) -> str:
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    try:
+        parser.result()
+        return "accepted"
+    except json.JSONDecodeError:
+        return "repair call"
+    except Exception:
+        return "next provider"
+
+
+def schema_policy(text: str, schema) -> str:
+    parser = IncrementalJSONParser()
+    parser.feed(text)
+    try:
+        parsed = parser.result()
+    except Exception:
+        return "next provider"
+    try:
+        llm_client._validate_output(schema, parsed, "replay")
+        return "accepted"
+    except Exception:
+        return "rejected (off-schema)"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--file", default=DEFAULT_FILE)
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args()
+
+    with open(args.file, encoding="utf-8") as f:
+        replies = [json.loads(line) for line in f if line.strip()]
+    # repair replies only exist because of the legacy policy
+    replies = [r for r in replies if not r.get("repair") and r.get("schema")]
+
+    legacy, constrained = {}, {}
+    repair_bytes = 0
+    for r in replies:
+        schema = getattr(schemas, r["schema"])
+        a = legacy_policy(r["text"])
+        b = schema_policy(r["text"], schema)
+        legacy[a] = legacy.get(a, 0) + 1
+        constrained[b] = constrained.get(b, 0) + 1
+        if a == "repair call":
+            repair_bytes += len(r["text"])
+        if args.verbose:
+            print(f"  {r['schema']:<20} {r.get('note', ''):<32} legacy: {a:<14} schema: {b}")
+
+    total = len(replies)
+    passed_unchecked = sum(
+        1 for r in replies
+        if legacy_policy(r["text"]) == "accepted"
+        and schema_policy(r["text"], getattr(schemas, r["schema"])) != "accepted"
+    )
+
+    print(f"{total} recorded replies from {os.path.relpath(args.file)}")
+    print(f"  {'policy':<8} {'repair calls':>13} {'rate':>7}  outcomes")
+    for name, counts in (("legacy", legacy), ("schema", constrained)):
+        repairs = counts.get("repair call", 0)
+        outcomes = ", ".join(f"{k}: {v}" for k, v in sorted(counts.items()))
+        print(f"  {name:<8} {repairs:>13} {repairs / total:>7.0%}  {outcomes}")
+    print(f"  legacy repair calls resent {repair_bytes / 1024:.1f} KB of broken output (plus the full prompt each time)")
+    print(f"  legacy passed {passed_unchecked} off-schema replies downstream unchecked")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Benchmark: pipeline latency with the hybrid LLM review after generation vs
+overlapped with it.
+Runs the pipeline for a few distinct semester plans with VALIDATOR_MODE=hybrid.
+"serial" reviews the sections once the whole curriculum is generated;
+"speculative" starts each section's review as soon as the fan-out generator
+emits it. The fake provider charges per KB of prompt and of output (a semester
+is ~1 KB, a review under 100 bytes) and makes each call up to --jitter longer,
+so sections finish at different times as they do with a real model.
+Usage: python scripts/bench_speculative_validation.py [--semesters 8] [--delay 0.3] [--seconds-per-kb 4]
+       [--seconds-per-input-kb 0.05] [--jitter 1.0] [--runs 5]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["VALIDATOR_MODE"] = "hybrid"
+os.environ["PLAN_STORE_BACKEND"] = "memory"
+os.environ["PIPELINE_DEADLINE_SECONDS"] = "0"
+
+from fake_llm_provider import FakeProvider
+from services import llm_client
+from orchestrator.pipeline import run_agent_pipeline
+from agents import validator_agent as validator_module
+
+
+async def one_run(data: dict) -> dict:
+    started = time.perf_counter()
+    marks = {}
+
+    async def on_event(event: str, payload: dict):
+        if event == "stage" and payload.get("status") == "done":
+            marks[payload["stage"]] = time.perf_counter() - started
+
+    result = await run_agent_pipeline(data, on_event=on_event)
+    if result.get("validation_status") in (None, "skipped"):
+        raise SystemExit(f"validation did not run: {result.get('validation_status')}")
+    return {"generated": marks["generator"], "total": time.perf_counter() - started}
+
+
+async def run(mode: str, args, fake: FakeProvider) -> dict:
+    validator_module.VALIDATOR_SPECULATIVE = mode == "speculative"
+    for key in validator_module.validator_stats:
+        validator_module.validator_stats[key] = 0
+    calls_before = fake.calls
+    runs = []
+    for i in range(args.runs):
+        data = {"planner_type": "semester", "skill": f"{mode} track {i}", "level": "Bachelors",
+                "semesters": args.semesters}
+        runs.append(await one_run(data))
+    return {
+        "runs": runs,
+        "calls": fake.calls - calls_before,
+        "stats": dict(validator_module.validator_stats),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--semesters", type=int, default=8)
+    ap.add_argument("--delay", type=float, default=0.3)
+    ap.add_argument("--seconds-per-kb", type=float, default=4.0)
+    ap.add_argument("--seconds-per-input-kb", type=float, default=0.05)
+    ap.add_argument("--jitter", type=float, default=1.0)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args()
+
+    fake = FakeProvider(delay=args.delay, seconds_per_kb=args.seconds_per_kb,
+                        seconds_per_input_kb=args.seconds_per_input_kb, jitter=args.jitter)
+    fake.start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+
+    async def both():
+        serial = await run("serial", args, fake)
+        speculative = await run("speculative", args, fake)
+        await llm_client.close_llm_clients()
+        return serial, speculative
+
+    try:
+        serial, speculative = asyncio.run(both())
+    finally:
+        fake.stop()
+
+    print(f"{args.runs} runs of a {args.semesters}-semester plan, hybrid validation "
+          f"({args.delay}s + {args.seconds_per_input_kb}s/KB in + {args.seconds_per_kb}s/KB out, "
+          f"up to {args.jitter:.0%} jitter per call)")
+    print(f"  {'mode':<12} {'generation':>11} {'total':>8} {'after generation':>17} {'calls':>6} {'speculated':>11}")
+    for name, r in (("serial", serial), ("speculative", speculative)):
+        generated = sum(x["generated"] for x in r["runs"]) / len(r["runs"])
+        total = sum(x["total"] for x in r["runs"]) / len(r["runs"])
+        print(f"  {name:<12} {generated:>10.2f}s {total:>7.2f}s {total - generated:>16.2f}s "
+              f"{r['calls']:>6} {r['stats']['sections_speculated']:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Builds the versioned learner-profile table consulted by personal_planner_agent.
+Every profile field depends on a subset of the six personal-planner inputs (see
+PERSONAL_PLANNER_PROMPT), so the table stores one small map per field keyed by
+just those inputs instead of all 2,304 combinations.
+Usage: python scripts/build_learner_profiles.py  (writes data/learner_profiles.json)
+"""
+import itertools
+import json
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+OUT_FILE = ROOT / "data" / "learner_profiles.json"
+
+# Bump when any mapping below changes so cached profiles can be told apart
+TABLE_VERSION = 1
+
+INPUTS = {
+    "study_domain": ["AI", "Data Science", "Cybersecurity", "Software Engineering"],
+    "career_path": ["Job Ready", "Research", "Startup", "Freelance"],
+    "experience": ["Beginner", "Intermediate", "Advanced"],
+    "pace": ["Fast", "Moderate", "Slow"],
+    "weekly_hours": ["10", "15", "20", "25"],
+    "duration": ["3 Months", "6 Months", "9 Months", "12 Months"],
+}
+
+# Spellings seen from API clients that mean the same enumerated value
+ALIASES = {
+    "study_domain": {"artificial intelligence": "ai", "ai/ml": "ai", "cyber security": "cybersecurity"},
+    "career_path": {"job-ready": "job ready", "jobready": "job ready", "researcher": "research"},
+    "experience": {"novice": "beginner", "expert": "advanced"},
+    "pace": {"medium": "moderate", "normal": "moderate"},
+    "weekly_hours": {},
+    "duration": {},
+}
+
+PERSONA = {
+    "Job Ready": "Industry-Ready {d} Practitioner",
+    "Research": "{d} Researcher",
+    "Startup": "{d} Startup Builder",
+    "Freelance": "Freelance {d} Specialist",
+}
+
+CONTENT_BIAS = {
+    "AI": "Balanced: theory-backed, practical model building",
+    "Data Science": "Practical: data-driven analysis and experimentation",
+    "Cybersecurity": "Practical: hands-on labs and attack/defense scenarios",
+    "Software Engineering": "Practical: project-based building and shipping",
+}
+
+PACE_PROGRESSION = {
+    "Fast": "Accelerated progression",
+    "Moderate": "Steady progression",
+    "Slow": "Gradual, reinforcement-heavy progression",
+}
+
+HOURS_LOAD = {"10": "Light", "15": "Standard", "20": "Intensive", "25": "Very intensive"}
+
+INNOVATION = {"Job Ready": "Medium", "Research": "High", "Startup": "Very High", "Freelance": "Medium"}
+
+LEARNING_STYLE = {
+    "Fast": "Project-first: learn by building, theory on demand",
+    "Moderate": "Balanced theory and hands-on practice",
+    "Slow": "Concept-first with guided practice and review",
+}
+
+RISK = {"Job Ready": "Low", "Research": "Medium", "Startup": "High", "Freelance": "Medium"}
+
+ASSESSMENT = {
+    "Job Ready": "Portfolio projects and industry certifications",
+    "Research": "Paper reviews, experiments and write-ups",
+    "Startup": "Product milestones and MVP demos",
+    "Freelance": "Client-style deliverables and case studies",
+}
+
+COLLABORATION = {
+    "Job Ready": "Team-based, following industry workflows",
+    "Research": "Lab collaboration and peer review",
+    "Startup": "Cross-functional founding team",
+    "Freelance": "Independent, with client communication",
+}
+
+ALIGNMENT = {
+    "Job Ready": "Entry-to-mid level {d} industry roles",
+    "Research": "{d} research labs and graduate study",
+    "Startup": "Building and launching {d} products",
+    "Freelance": "Independent {d} consulting and contract work",
+}
+
+DIFFICULTY = {
+    "Beginner": "Foundational to Intermediate",
+    "Intermediate": "Intermediate to Advanced",
+    "Advanced": "Advanced to Expert",
+}
+
+RESEARCH_INTENSITY = {"Job Ready": "Low", "Research": "High", "Startup": "Medium", "Freelance": "Low"}
+
+INDUSTRY = {
+    "AI": "AI/ML product and platform teams",
+    "Data Science": "Analytics and data platform teams",
+    "Cybersecurity": "Security operations, governance and compliance",
+    "Software Engineering": "Software product engineering",
+}
+
+
+def field(depends_on, value_fn):
+    values = {}
+    for combo in itertools.product(*(INPUTS[name] for name in depends_on)):
+        key = "|".join(v.lower() for v in combo)
+        values[key] = value_fn(*combo)
+    return {"depends_on": depends_on, "values": values}
+
+
+def build_table() -> dict:
+    return {
+        "version": TABLE_VERSION,
+        "inputs": {name: [v.lower() for v in values] for name, values in INPUTS.items()},
+        "aliases": ALIASES,
+        "fields": {
+            "persona_type": field(["career_path", "study_domain"], lambda c, d: PERSONA[c].format(d=d)),
+            "content_bias": field(["study_domain"], lambda d: CONTENT_BIAS[d]),
+            "pacing_strategy": field(
+                ["pace", "weekly_hours"],
+                lambda p, h: f"{PACE_PROGRESSION[p]} with {HOURS_LOAD[h].lower()} weekly load ({h} h/week)",
+            ),
+            "innovation_index": field(["career_path"], lambda c: INNOVATION[c]),
+            "learning_style": field(["pace"], lambda p: LEARNING_STYLE[p]),
+            "risk_tolerance": field(["career_path"], lambda c: RISK[c]),
+            "assessment_preference": field(["career_path"], lambda c: ASSESSMENT[c]),
+            "collaboration_level": field(["career_path"], lambda c: COLLABORATION[c]),
+            "career_alignment": field(["career_path", "study_domain"], lambda c, d: ALIGNMENT[c].format(d=d)),
+            "difficulty_preference": field(["experience"], lambda e: DIFFICULTY[e]),
+            "research_intensity": field(["career_path"], lambda c: RESEARCH_INTENSITY[c]),
+            "industry_orientation": field(["study_domain"], lambda d: INDUSTRY[d]),
+        },
+    }
+
+
+if __name__ == "__main__":
+    table = build_table()
+    OUT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    OUT_FILE.write_text(json.dumps(table, indent=1) + "\n", encoding="utf-8")
+    combos = 1
+    for values in INPUTS.values():
+        combos *= len(values)
+    print(f"Wrote {OUT_FILE.relative_to(ROOT)} (v{TABLE_VERSION}, {combos} input combinations covered)")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Checks that /export-pdf trusts the formatter's signature, and only it.
+1) A /generate response posted back unchanged renders without the
+   structural checks or the formatter.
+2) The same plan with a course title edited is validated and formatted again.
+3) The same plan with validation_status edited is rejected the same way and
+   its status recomputed.
+Prints the export latency of the signed plan next to an unsigned one.
+Usage: python scripts/check_export_signature.py
+"""
+import asyncio
+import copy
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["PLAN_STORE_BACKEND"] = "memory"
+os.environ["PDF_WORKERS"] = "0"
+
+import httpx
+
+from fake_llm_provider import FakeProvider
+from services import llm_client
+from services.plan_signature import verify_plan, SIGNATURE_FIELD
+from services.pdf_export import pdf_exporter
+import api.main as main_module
+from api.main import app
+
+formatted = []
+
+
+async def counting_formatter(curriculum, validation, *args, **kwargs):
+    result = await formatter_agent(curriculum, validation, *args, **kwargs)
+    formatted.append(result)
+    return result
+
+formatter_agent = main_module.formatter_agent
+main_module.formatter_agent = counting_formatter
+
+
+async def export(client, curriculum: dict):
+    # a fresh cache each time: latency is the whole export, render included
+    pdf_exporter.clear()
+    before = len(formatted)
+    started = time.perf_counter()
+    response = await client.post("/export-pdf", json={"curriculum": curriculum})
+    elapsed = time.perf_counter() - started
+    ok = response.status_code == 200 and response.content.startswith(b"%PDF")
+    return ok, len(formatted) - before, elapsed
+
+
+async def check() -> list:
+    failures = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=None) as client:
+        response = await client.post("/generate", json={
+            "planner_type": "semester", "skill": "Signed Exports", "level": "Bachelors", "semesters": 4,
+        })
+        if response.status_code != 200:
+            return [f"/generate failed: {response.status_code}"]
+        plan = response.json()
+        if not verify_plan({k: v for k, v in plan.items() if k not in ("plan_id", "plan_version")}):
+            return [f"/generate response carries no valid {SIGNATURE_FIELD}"]
+
+        # 1) unchanged round trip, plan_id / plan_version included as the UI sends it
+        ok, formatter_runs, signed_seconds = await export(client, plan)
+        if not ok or formatter_runs:
+            failures.append(f"signed plan: ok={ok}, formatter ran {formatter_runs}x")
+        print(f"  signed plan: formatter ran {formatter_runs}x, export {signed_seconds * 1000:.0f}ms")
+
+        # 2) edited content
+        edited = copy.deepcopy(plan)
+        edited["semesters"][0]["courses"][0]["title"] = "Edited Course"
+        ok, formatter_runs, _ = await export(client, edited)
+        if not ok or formatter_runs != 1:
+            failures.append(f"edited course: ok={ok}, formatter ran {formatter_runs}x, expected once")
+        print(f"  edited course title: formatter ran {formatter_runs}x")
+
+        # 3) edited validation result
+        forged = copy.deepcopy(plan)
+        forged["validation_status"] = "forged"
+        ok, formatter_runs, _ = await export(client, forged)
+        status = formatted[-1].get("validation_status") if formatter_runs else None
+        if not ok or formatter_runs != 1 or status == "forged":
+            failures.append(f"forged status: ok={ok}, formatter ran {formatter_runs}x, status {status!r}")
+        print(f"  edited validation_status: formatter ran {formatter_runs}x, status recomputed as {status!r}")
+
+        unsigned = {k: v for k, v in plan.items() if k != SIGNATURE_FIELD}
+        _, _, unsigned_seconds = await export(client, unsigned)
+        print(f"  unsigned plan: export {unsigned_seconds * 1000:.0f}ms")
+    return failures
+
+
+def main():
+    fake = FakeProvider(delay=0.05)
+    fake.start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+
+    async def run():
+        try:
+            return await check()
+        finally:
+            await llm_client.close_llm_clients()
+
+    try:
+        failures = asyncio.run(run())
+    finally:
+        fake.stop()
+        pdf_exporter.shutdown()
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        raise SystemExit(1)
+    print("OK: signed plans export as is, edited content or validation is validated again")
+
+
+if __name__ == "__main__":
+    main()
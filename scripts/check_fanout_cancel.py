@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Checks that a failed fan-out section stops the other section calls.
+One semester's provider call fails at once while the others are still waiting
+on the (slow) fake provider. The failure must cancel those provider calls —
+none of them may run to completion — and the generator must fall back to one
+whole-program call that still returns every semester.
+Usage: python scripts/check_fanout_cancel.py
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from fake_llm_provider import FakeProvider, _payload_of
+from services import llm_client
+from agents import generator_agent as generator_module
+
+SEMESTERS = 6
+FAILING_SEMESTER = 2
+
+# section provider calls by outcome
+sections = {"started": 0, "finished": 0, "cancelled": 0}
+groq_generate = llm_client._groq_generate
+
+
+async def tracked_groq_generate(prompt: str, json_mode: bool = False) -> str:
+    if "Write ONLY that semester" not in prompt:
+        return await groq_generate(prompt, json_mode)
+    if _payload_of(prompt).get("semester") == FAILING_SEMESTER:
+        raise Exception("Section provider error")
+    sections["started"] += 1
+    try:
+        result = await groq_generate(prompt, json_mode)
+    except asyncio.CancelledError:
+        sections["cancelled"] += 1
+        raise
+    sections["finished"] += 1
+    return result
+
+
+async def check() -> list:
+    plan = {
+        "planner_type": "semester",
+        "program_title": "Cancellation Program",
+        "difficulty_progression": "Beginner to Advanced",
+        "courses_per_semester": 3,
+        "focus_tags": ["check"],
+        "include_capstone": False,
+        "semesters": SEMESTERS,
+    }
+    result = await generator_module.generator_agent(plan)
+    # let cancelled provider calls unwind before counting
+    await asyncio.sleep(0.5)
+
+    failures = []
+    if sections["started"] != SEMESTERS - 1:
+        failures.append(f"expected {SEMESTERS - 1} other section calls, {sections['started']} started")
+    if sections["finished"] or sections["cancelled"] != sections["started"]:
+        failures.append(f"section calls after the failure: {sections}, expected all cancelled")
+    if len(result.get("semesters", [])) != SEMESTERS:
+        failures.append(f"fallback returned {len(result.get('semesters', []))} semesters, expected {SEMESTERS}")
+    return failures
+
+
+async def main() -> int:
+    fake = FakeProvider(delay=1.0).start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+    llm_client._groq_generate = tracked_groq_generate
+    generator_module.GENERATOR_FANOUT = True
+    try:
+        failures = await check()
+    finally:
+        llm_client._groq_generate = groq_generate
+        await llm_client.close_llm_clients()
+        fake.stop()
+
+    if failures:
+        for f in failures:
+            print(f"FAIL: {f}")
+        return 1
+    print(f"OK: a failed section cancelled the other {sections['cancelled']} section provider calls")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Checks the /jobs subsystem against the fake provider.
+1) 6 jobs on a 2-worker pool: POST /jobs answers at once, never more than 2
+   run together, every job finishes with a stored plan and waits are measured.
+2) A client that goes away mid-run does not stop the job.
+3) A full queue refuses new jobs with 503 + Retry-After.
+Usage: python scripts/check_job_queue.py
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+import httpx
+
+from fake_llm_provider import FakeProvider
+from services import llm_client
+from orchestrator.pipeline import pipeline_jobs
+from api.main import app
+
+WORKERS = 2
+JOBS = 6
+
+
+def form(i: int) -> dict:
+    return {"planner_type": "semester", "skill": f"Skill {i}", "level": "Bachelors", "semesters": 2}
+
+
+async def wait_for(client, job_id: str, timeout: float = 60) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        body = (await client.get(f"/jobs/{job_id}")).json()
+        if body["status"] in ("done", "failed"):
+            return body
+        await asyncio.sleep(0.05)
+    raise SystemExit(f"job {job_id} did not finish")
+
+
+async def check(fake: FakeProvider) -> list:
+    failures = []
+    pipeline_jobs.workers = WORKERS
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=None) as client:
+        started = time.perf_counter()
+        ids = [(await client.post("/jobs", json=form(i))).json()["job_id"] for i in range(JOBS)]
+        if time.perf_counter() - started > 1.0:
+            failures.append("POST /jobs did not return immediately")
+
+        peak = 0
+        while pipeline_jobs.completed + pipeline_jobs.failed < JOBS:
+            peak = max(peak, pipeline_jobs.running)
+            await asyncio.sleep(0.01)
+        if peak > WORKERS:
+            failures.append(f"{peak} jobs ran at once with {WORKERS} workers")
+
+        for job_id in ids:
+            body = await wait_for(client, job_id)
+            if body["status"] != "done" or not body["result"].get("plan_id"):
+                failures.append(f"job {job_id} ended {body['status']}: {body.get('error')}")
+            elif body["stage"] != "formatter":
+                failures.append(f"job {job_id} finished at stage {body['stage']}")
+
+        stats = (await client.get("/jobs/stats")).json()
+        if not stats["wait_seconds"]["max"] or stats["completed"] != JOBS:
+            failures.append(f"unexpected stats: {stats}")
+
+        # the submitting client disconnects right away; the job must still complete
+        async with httpx.AsyncClient(transport=transport, base_url="http://check") as gone:
+            job_id = (await gone.post("/jobs", json=form(99))).json()["job_id"]
+        if (await wait_for(client, job_id))["status"] != "done":
+            failures.append("job did not survive its client going away")
+
+        pipeline_jobs.max_depth = 1
+        responses = [await client.post("/jobs", json=form(100 + i)) for i in range(WORKERS + 3)]
+        refused = [r for r in responses if r.status_code == 503]
+        if not refused or "retry-after" not in refused[0].headers:
+            failures.append("full queue did not refuse with 503 + Retry-After")
+        pipeline_jobs.max_depth = 100
+        for r in responses:
+            if r.status_code == 202:
+                await wait_for(client, r.json()["job_id"])
+
+        print(f"  stats: {stats}")
+    await pipeline_jobs.shutdown()
+    return failures
+
+
+def main():
+    fake = FakeProvider(delay=0.1)
+    fake.start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+
+    async def run():
+        try:
+            return await check(fake)
+        finally:
+            await llm_client.close_llm_clients()
+
+    try:
+        failures = asyncio.run(run())
+    finally:
+        fake.stop()
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        raise SystemExit(1)
+    print(f"OK: {JOBS} jobs on {WORKERS} workers, client disconnect survived, full queue refused")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Checks the per-provider LLM scheduler against the fake provider.
+1) Concurrency cap: 12 distinct calls with LLM_GROQ_MAX_CONCURRENCY=3 never
+   have more than 3 requests at the provider at once.
+2) Requests/minute bucket: with the bucket drained, the next request waits
+   for one token to refill instead of being sent.
+3) Retry-After: two 429s are retried after the advertised delay and the call
+   succeeds without opening the provider's circuit.
+4) Retry-After values and provider error texts are parsed.
+5) Background requests may use the interactive reserved slots while no
+   interactive request is queued; a queued interactive request gets the next
+   free slot.
+Usage: python scripts/check_llm_scheduler.py
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["LLM_GROQ_MAX_CONCURRENCY"] = "3"
+
+from fake_llm_provider import FakeProvider
+from services import llm_client
+from services.llm_scheduler import llm_scheduler, ProviderScheduler, parse_retry_after, rate_limit_of
+from services.provider_health import provider_health, CLOSED
+from services.request_context import use_priority, INTERACTIVE, BACKGROUND
+
+
+async def check_concurrency(fake: FakeProvider) -> list:
+    fake.peak_in_flight = 0
+    await asyncio.gather(*[llm_client.call_llm("You are a test agent.", {"n": i}) for i in range(12)])
+    if fake.peak_in_flight > 3:
+        return [f"concurrency cap 3 exceeded: {fake.peak_in_flight} requests in flight"]
+    return []
+
+
+async def check_rpm() -> list:
+    scheduler = ProviderScheduler("paced", rpm=60)   # one request per second once drained
+    scheduler.requests.tokens = 0
+    started = time.perf_counter()
+    await scheduler.acquire(10)
+    waited = time.perf_counter() - started
+    scheduler.release(10, 10)
+    if not 0.8 <= waited <= 1.5:
+        return [f"drained 60 rpm bucket admitted after {waited:.2f}s, expected ~1s"]
+    return []
+
+
+async def check_retry_after(fake: FakeProvider) -> list:
+    fake.rate_limit_next, fake.retry_after = 2, "0.3"
+    started = time.perf_counter()
+    result = await llm_client.call_llm("You are a test agent.", {"retry": True})
+    elapsed = time.perf_counter() - started
+    failures = []
+    stats = llm_scheduler.stats()["providers"]["groq"]
+    if not result or stats["retries"] != 2:
+        failures.append(f"expected 2 retries, got {stats['retries']}")
+    if elapsed < 0.6:
+        failures.append(f"retries did not honour Retry-After (finished in {elapsed:.2f}s)")
+    if provider_health.get("groq").state != CLOSED:
+        failures.append("a retried 429 opened the circuit")
+    return failures
+
+
+async def check_reserved_slots() -> list:
+    scheduler = ProviderScheduler("reserved", max_concurrency=4)
+    failures = []
+    with use_priority(BACKGROUND):
+        try:
+            for _ in range(4):
+                await asyncio.wait_for(scheduler.acquire(10), 0.1)
+        except asyncio.TimeoutError:
+            failures.append(f"idle reserved slots not lent out: {scheduler.in_flight} of 4 background admitted")
+            return failures
+        background = asyncio.create_task(scheduler.acquire(10))
+    with use_priority(INTERACTIVE):
+        interactive = asyncio.create_task(scheduler.acquire(10))
+    await asyncio.sleep(0.05)
+    scheduler.release(10, 10)
+    await asyncio.sleep(0.05)
+    if not interactive.done() or background.done():
+        failures.append("a freed slot did not go to the queued interactive request first")
+    scheduler.release(10, 10)
+    await asyncio.wait_for(asyncio.gather(background, interactive), 1)
+    return failures
+
+
+def check_parsing() -> list:
+    failures = []
+    for value, expected in (("7", 7.0), ("7.5s", 7.5), ("1m30s", 90.0), ("250ms", 0.25), ("soon", None)):
+        if parse_retry_after(value) != expected:
+            failures.append(f"parse_retry_after({value!r}) = {parse_retry_after(value)}, expected {expected}")
+    gemini = Exception("429 RESOURCE_EXHAUSTED. {'error': {'details': [{'retryDelay': '23s'}]}}")
+    limited = rate_limit_of(gemini)
+    if limited is None or limited.retry_after != 23.0:
+        failures.append("Gemini RESOURCE_EXHAUSTED retryDelay not recognised")
+    if rate_limit_of(Exception("Groq HTTP Error: 500")) is not None:
+        failures.append("a 500 was treated as a rate limit")
+    return failures
+
+
+def main():
+    fake = FakeProvider(delay=0.2)
+    fake.start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+
+    async def run():
+        try:
+            return (
+                await check_concurrency(fake)
+                + await check_rpm()
+                + await check_retry_after(fake)
+                + await check_reserved_slots()
+                + check_parsing()
+            )
+        finally:
+            await llm_client.close_llm_clients()
+
+    try:
+        failures = asyncio.run(run())
+    finally:
+        fake.stop()
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        raise SystemExit(1)
+    print("OK: concurrency cap, RPM pacing, Retry-After retries without opening the circuit, header parsing, "
+          "reserved slots lent out while idle")
+    print(f"  groq: {llm_scheduler.stats()['providers']['groq']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Checks the per-provider circuit breaker end to end through call_llm().
+Gemini is replaced by a scripted coroutine, Groq is the local fake provider.
+0) While Groq has no measurements, Gemini (the configured primary) stays first.
+1) A RESOURCE_EXHAUSTED from Gemini opens its circuit: later calls go to Groq.
+2) After the cooldown, 20 concurrent calls send exactly one probe to Gemini.
+3) A successful probe closes the circuit and Gemini serves traffic again.
+4) With LLM_ROUTING=fastest, a consistently slower Gemini loses first place to Groq
+   (measured while Gemini's circuit was open).
+Usage: python scripts/check_provider_health.py
+"""
+import asyncio
+import json
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["SINGLE_FLIGHT_ENABLED"] = "false"
+os.environ["PROVIDER_QUOTA_COOLDOWN_SECONDS"] = "0.5"
+os.environ["LLM_ROUTING"] = "fastest"
+
+from fake_llm_provider import FakeProvider
+from services import llm_client
+from services.provider_health import provider_health
+
+COOLDOWN = 0.5
+
+
+class ScriptedGemini:
+    """Answers like Gemini would, failing with a quota error while `exhausted`."""
+
+    def __init__(self):
+        self.calls = 0
+        self.exhausted = False
+        self.delay = 0.02
+
+    async def __call__(self, prompt: str, json_mode: bool = False) -> str:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.exhausted:
+            raise Exception("429 RESOURCE_EXHAUSTED. Quota exceeded for gemini-2.5-flash-lite")
+        return json.dumps({"provider": "gemini"})
+
+
+async def call(n: int = 1):
+    return await asyncio.gather(*[
+        llm_client.call_llm("You are a test agent.", {"call": i}) for i in range(n)
+    ])
+
+
+async def run(fake: FakeProvider) -> list:
+    failures = []
+    gemini = ScriptedGemini()
+    llm_client.gemini_client = object()
+    llm_client._gemini_generate = gemini
+    llm_client.GROQ_URL = fake.url
+
+    # warm-up: an unmeasured Groq does not jump ahead of the primary once Gemini has samples
+    for _ in range(3):
+        await call(1)
+    if gemini.calls != 3 or fake.calls != 0:
+        failures.append(f"warm-up: expected gemini=3 groq=0 calls, got gemini={gemini.calls} groq={fake.calls}")
+
+    # 1) quota error opens the circuit
+    gemini.exhausted = True
+    await call(1)
+    before = gemini.calls
+    await call(5)
+    state = provider_health.get("gemini").state
+    if gemini.calls != before or state != "open":
+        failures.append(f"open: Gemini still called ({gemini.calls - before}x) or state={state}")
+
+    # 2) half-open admits a single probe among concurrent callers
+    await asyncio.sleep(COOLDOWN + 0.1)
+    gemini.exhausted = False
+    before = gemini.calls
+    await call(20)
+    if gemini.calls - before != 1:
+        failures.append(f"half-open: expected 1 probe, Gemini got {gemini.calls - before} calls")
+    state = provider_health.get("gemini").state
+    if state != "closed":
+        failures.append(f"recovery: successful probe should close the circuit, state={state}")
+
+    # 3) recovered Gemini serves traffic again
+    before = gemini.calls
+    await call(5)
+    if gemini.calls - before != 5:
+        failures.append(f"recovery: expected Gemini to serve 5 calls, got {gemini.calls - before}")
+
+    # 4) latency-aware routing
+    gemini.delay = 0.4
+    await call(40)
+    before_gemini, before_groq = gemini.calls, fake.calls
+    await call(5)
+    if fake.calls - before_groq != 5:
+        failures.append(
+            f"routing: slow Gemini should lose to Groq, got gemini={gemini.calls - before_gemini} "
+            f"groq={fake.calls - before_groq}"
+        )
+    return failures
+
+
+def main():
+    fake = FakeProvider(delay=0.05, responder=lambda prompt: {"provider": "groq"})
+    fake.start()
+    try:
+        failures = asyncio.run(run(fake))
+    finally:
+        fake.stop()
+
+    print(json.dumps(provider_health.snapshot(), indent=2))
+    if failures:
+        for failure in failures:
+            print("FAIL:", failure)
+        sys.exit(1)
+    print("OK: quota error opens the circuit, one probe after cooldown, recovery, latency routing")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Checks end-to-end request deadlines against the fake provider.
+1) Provider calls slower than the whole budget: /generate answers 504 when
+   the deadline passes instead of waiting for the provider.
+2) Generation leaves less than VALIDATOR_MIN_SECONDS: the LLM review is
+   skipped, the structural checks still run and /generate succeeds in time.
+3) Without a deadline the same run waits for the LLM review.
+Usage: python scripts/check_request_deadline.py
+"""
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+os.environ["VALIDATOR_MODE"] = "hybrid"
+
+import httpx
+
+from fake_llm_provider import FakeProvider
+from services import llm_client
+from orchestrator import pipeline
+from agents.validator_agent import validator_stats
+from api.main import app
+
+
+def form(skill: str) -> dict:
+    return {"planner_type": "semester", "skill": skill, "level": "Bachelors", "semesters": 2}
+
+
+async def timed_post(client, body: dict):
+    started = time.perf_counter()
+    response = await client.post("/generate", json=body)
+    return response, time.perf_counter() - started
+
+
+async def check(fake: FakeProvider) -> list:
+    failures = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=None) as client:
+        # 1) every provider call takes 6s, the request has 3s
+        fake.delay, pipeline.PIPELINE_DEADLINE_SECONDS = 6.0, 3.0
+        response, elapsed = await timed_post(client, form("Slow Provider"))
+        if response.status_code != 504:
+            failures.append(f"slow provider: expected 504, got {response.status_code}")
+        if not 0.5 < elapsed < 3.5:
+            failures.append(f"slow provider: 504 came after {elapsed:.2f}s, deadline was 3s")
+        print(f"  slow provider: {response.status_code} after {elapsed:.2f}s")
+
+        # 2) planner + generator take ~1s of a 4s budget: under the 5s the review needs
+        fake.delay, pipeline.PIPELINE_DEADLINE_SECONDS = 0.3, 4.0
+        skipped_before = validator_stats["skipped_for_deadline"]
+        response, elapsed = await timed_post(client, form("Tight Deadline"))
+        body = response.json() if response.status_code == 200 else {}
+        warnings = body.get("validation_metadata_warnings") or []
+        if response.status_code != 200:
+            failures.append(f"tight deadline: expected 200, got {response.status_code}")
+        elif validator_stats["skipped_for_deadline"] != skipped_before + 1:
+            failures.append("tight deadline: the LLM review was not skipped")
+        elif not any("deadline" in w for w in warnings):
+            failures.append(f"tight deadline: no skip warning in {warnings}")
+        if elapsed > 4.0:
+            failures.append(f"tight deadline: answered after {elapsed:.2f}s of a 4s budget")
+        print(f"  tight deadline: {response.status_code} after {elapsed:.2f}s, "
+              f"validation_status {body.get('validation_status')!r}, warnings {warnings}")
+
+        # 3) no deadline: the review runs
+        pipeline.PIPELINE_DEADLINE_SECONDS = 0
+        calls_before = fake.calls
+        response, elapsed = await timed_post(client, form("No Deadline"))
+        if response.status_code != 200 or validator_stats["skipped_for_deadline"] != skipped_before + 1:
+            failures.append("no deadline: the LLM review was skipped")
+        print(f"  no deadline: {response.status_code} after {elapsed:.2f}s, {fake.calls - calls_before} provider calls")
+    return failures
+
+
+def main():
+    fake = FakeProvider(delay=0.3)
+    fake.start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+
+    async def run():
+        try:
+            return await check(fake)
+        finally:
+            await llm_client.close_llm_clients()
+
+    try:
+        failures = asyncio.run(run())
+    finally:
+        fake.stop()
+
+    if failures:
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        raise SystemExit(1)
+    print("OK: deadline answers 504 on time, LLM review skipped under a tight budget, full run without one")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,7 +8,7 @@ from pathlib import Path
 ROOT = Path(__file__).resolve().parents[1]
 REQ_FILE = ROOT / "requirements.txt"
 
-REQUIRED = ["fastapi", "uvicorn", "reportlab"]
+REQUIRED = ["fastapi", "uvicorn", "reportlab", "httpx"]
 
 if not REQ_FILE.exists():
     print(f"ERROR: requirements.txt not found at {REQ_FILE}")
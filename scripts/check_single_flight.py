@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Checks that identical concurrent requests are coalesced into one execution.
+1) 50 concurrent identical call_llm() calls must reach the provider exactly once.
+2) 50 concurrent identical /generate requests must run the pipeline exactly once
+   (as many provider calls as one solo request) and all return the same curriculum,
+   each stored under a plan_id of its own — a refinement of one must not show
+   up in another caller's plan history.
+3) An execution keeps running while any awaiter remains, and is cancelled
+   once the last one is.
+4) Callers join an execution only when their deadlines are at most
+   DEADLINE_BUCKET_SECONDS apart, however they fall relative to the clock.
+The response cache is disabled so only single-flight can explain the savings.
+Usage: python scripts/check_single_flight.py
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+os.chdir(ROOT)
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+import httpx
+
+from fake_llm_provider import FakeProvider
+from services import llm_client
+from orchestrator.pipeline import pipeline_flight
+from services.single_flight import SingleFlight
+from services.request_context import DEADLINE_BUCKET_SECONDS
+from services.plan_store import strip_plan_ref
+from api.main import app
+
+CONCURRENCY = 50
+
+SEMESTER_FORM = {
+    "planner_type": "semester",
+    "skill": "Data Science",
+    "level": "Bachelors",
+    "semesters": 4,
+    "weekly_hours": 20,
+    "focus": "Industry",
+    "include_capstone": True,
+}
+
+
+async def check_call_llm(fake: FakeProvider) -> list:
+    fake.calls = 0
+    results = await asyncio.gather(*[
+        llm_client.call_llm("You are a test agent.", {"topic": "single-flight"})
+        for _ in range(CONCURRENCY)
+    ])
+    failures = []
+    if fake.calls != 1:
+        failures.append(f"call_llm: expected 1 provider call, got {fake.calls}")
+    if any(r != results[0] for r in results) or len({id(r) for r in results}) != CONCURRENCY:
+        failures.append("call_llm: awaiters did not each receive an equal, independent result")
+    return failures
+
+
+async def check_generate(fake: FakeProvider) -> list:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://check", timeout=None) as client:
+        # provider calls made by one uncontended pipeline run
+        fake.calls = 0
+        await client.post("/generate", json=dict(SEMESTER_FORM, focus="Research"))
+        calls_per_run = fake.calls
+
+        fake.calls = 0
+        executions_before = pipeline_flight.executions
+        responses = await asyncio.gather(*[
+            client.post("/generate", json=SEMESTER_FORM) for _ in range(CONCURRENCY)
+        ])
+    failures = []
+    executions = pipeline_flight.executions - executions_before
+    if executions != 1:
+        failures.append(f"/generate: expected 1 pipeline execution, got {executions}")
+    if fake.calls != calls_per_run:
+        failures.append(f"/generate: expected {calls_per_run} provider calls (one pipeline run), got {fake.calls}")
+    bodies = [r.json() for r in responses if r.status_code == 200]
+    curricula = [strip_plan_ref(b) for b in bodies]
+    if len(bodies) != CONCURRENCY or any(c != curricula[0] for c in curricula):
+        failures.append("/generate: not every request received the shared curriculum")
+    plan_ids = {b.get("plan_id") for b in bodies}
+    if len(plan_ids) != len(bodies) or None in plan_ids:
+        failures.append(f"/generate: {len(bodies)} callers share {len(plan_ids)} plan_ids, expected one each")
+    return failures
+
+
+async def check_abandon() -> list:
+    flight = SingleFlight("check")
+    outcome = []
+
+    async def work():
+        try:
+            await asyncio.sleep(0.3)
+            outcome.append("finished")
+            return "done"
+        except asyncio.CancelledError:
+            outcome.append("cancelled")
+            raise
+
+    failures = []
+    # two of three awaiters leave: the third still gets the result
+    callers = [asyncio.create_task(flight.do("kept", work)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    callers[0].cancel()
+    callers[1].cancel()
+    if await callers[2] != "done" or outcome != ["finished"]:
+        failures.append(f"abandon: execution did not finish for the remaining awaiter ({outcome})")
+
+    # every awaiter leaves: the execution is cancelled and the key is free again
+    outcome.clear()
+    callers = [asyncio.create_task(flight.do("dropped", work)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    for caller in callers:
+        caller.cancel()
+    await asyncio.gather(*callers, return_exceptions=True)
+    await asyncio.sleep(0.05)
+    if outcome != ["cancelled"] or flight.stats()["in_flight"]:
+        failures.append(f"abandon: execution not cancelled with its last awaiter ({outcome}, {flight.stats()})")
+    return failures
+
+
+async def check_deadlines() -> list:
+    flight = SingleFlight("check")
+
+    async def work():
+        await asyncio.sleep(0.1)
+        return "done"
+
+    failures = []
+    # (deadlines of concurrent callers, executions expected)
+    for deadlines, expected in (
+        ([104.9, 105.1], 1),                                  # close, across a 5s boundary
+        ([100.0, 100.0 + DEADLINE_BUCKET_SECONDS + 1], 2),    # too far apart
+        ([None, None], 1),
+        ([None, 100.0], 2),
+    ):
+        before = flight.executions
+        await asyncio.gather(*[flight.do("key", work, deadline) for deadline in deadlines])
+        if flight.executions - before != expected:
+            failures.append(f"deadlines {deadlines}: {flight.executions - before} executions, expected {expected}")
+    return failures
+
+
+async def main() -> int:
+    fake = FakeProvider(delay=0.3).start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+    try:
+        failures = await check_call_llm(fake) + await check_generate(fake) + await check_abandon() + await check_deadlines()
+    finally:
+        await llm_client.close_llm_clients()
+        fake.stop()
+
+    if failures:
+        for f in failures:
+            print(f"FAIL: {f}")
+        return 1
+    print(f"OK: {CONCURRENCY} identical call_llm() calls -> 1 provider call")
+    print(f"OK: {CONCURRENCY} identical /generate requests -> 1 pipeline run")
+    print("OK: a shared execution is cancelled only with its last awaiter")
+    print(f"OK: callers share an execution only with deadlines <= {DEADLINE_BUCKET_SECONDS:.0f}s apart")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
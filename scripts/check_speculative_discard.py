@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Checks that discarded speculative section reviews make no provider call.
+Feeds a SpeculativeReview a skeleton and a few sections, so it starts one
+review per section against a slow fake provider, then discards them the way
+a generator `reset` does. None of those provider calls may run to completion,
+and speculative_discarded must count exactly the reviews that were cut short.
+Usage: python scripts/check_speculative_discard.py
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "scripts"))
+
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+from fake_llm_provider import FakeProvider, build_curriculum
+from services import llm_client
+from agents.validator_agent import SpeculativeReview, validator_stats
+
+SECTIONS = 4
+
+# review provider calls by outcome
+reviews = {"started": 0, "finished": 0, "cancelled": 0}
+groq_generate = llm_client._groq_generate
+
+
+async def tracked_groq_generate(prompt: str, json_mode: bool = False) -> str:
+    reviews["started"] += 1
+    try:
+        result = await groq_generate(prompt, json_mode)
+    except asyncio.CancelledError:
+        reviews["cancelled"] += 1
+        raise
+    reviews["finished"] += 1
+    return result
+
+
+async def check() -> list:
+    curriculum = build_curriculum(SECTIONS)
+    speculative = SpeculativeReview()
+    speculative.observe("skeleton", {
+        "kind": "semester",
+        "program_title": curriculum["program_title"],
+        "summary": curriculum["summary"],
+        "total": SECTIONS,
+    })
+    for idx, semester in enumerate(curriculum["semesters"]):
+        speculative.observe("section", {"kind": "semester", "index": idx, "total": SECTIONS, "section": semester})
+
+    # the reviews are waiting on the provider when the generator starts over
+    await asyncio.sleep(0.2)
+    discarded_before = validator_stats["speculative_discarded"]
+    speculative.observe("reset", {"reason": "check"})
+    # let cancelled provider calls unwind, and give a leaked one time to finish
+    await asyncio.sleep(1.5)
+
+    failures = []
+    if reviews["started"] != SECTIONS:
+        failures.append(f"expected {SECTIONS} speculative reviews, {reviews['started']} provider calls started")
+    if reviews["finished"] or reviews["cancelled"] != reviews["started"]:
+        failures.append(f"review calls after the reset: {reviews}, expected all cancelled")
+    discarded = validator_stats["speculative_discarded"] - discarded_before
+    if discarded != SECTIONS:
+        failures.append(f"speculative_discarded grew by {discarded}, expected {SECTIONS}")
+    return failures
+
+
+async def main() -> int:
+    fake = FakeProvider(delay=1.0).start()
+    llm_client.GROQ_URL = fake.url
+    llm_client.gemini_client = None
+    llm_client._groq_generate = tracked_groq_generate
+    try:
+        failures = await check()
+    finally:
+        llm_client._groq_generate = groq_generate
+        await llm_client.close_llm_clients()
+        fake.stop()
+
+    if failures:
+        for f in failures:
+            print(f"FAIL: {f}")
+        return 1
+    print(f"OK: {reviews['cancelled']} discarded speculative reviews made no provider call")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Groq chat-completions API, used by the benchmarks.
+Each request is answered with JSON shaped for the agent whose prompt it carries
+(planner, skeleton, section, whole-program generator, validator), after a fixed
+delay plus optional per-KB "prompt reading" and "generation" times and random
+jitter, so the full pipeline runs offline.
+Usage: python scripts/fake_llm_provider.py [--port 8765] [--delay 0.5]
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def build_curriculum(semesters: int = 4, courses: int = 3) -> dict:
+    """A plausible semester curriculum of the requested size."""
+    levels = ["Beginner", "Intermediate", "Advanced"]
+    return {
+        "program_title": "Benchmark Program",
+        "summary": "Synthetic curriculum served by the local fake provider.",
+        "semesters": [
+            {
+                "semester": s,
+                "courses": [
+                    {
+                        "title": f"Course {s}.{c}",
+                        "difficulty": levels[min(2, (s - 1) * 3 // semesters)],
+                        "skills": [f"Skill {s}.{c}.a", f"Skill {s}.{c}.b"],
+                        "topics": [{"name": f"Topic {s}.{c}.{t}", "video_url": ""} for t in range(1, 5)],
+                        "outcome_project": f"Project {s}.{c}",
+                    }
+                    for c in range(1, courses + 1)
+                ],
+            }
+            for s in range(1, semesters + 1)
+        ],
+    }
+
+
+def build_roadmap(phases: int = 3, milestones: int = 2) -> dict:
+    """A plausible personal roadmap with sequential week ranges."""
+    roadmap = []
+    week = 1
+    for p in range(1, phases + 1):
+        duration = 8
+        items = []
+        for m in range(1, milestones + 1):
+            start = week + (m - 1) * (duration // milestones)
+            end = start + duration // milestones - 1
+            items.append({
+                "title": f"Milestone {p}.{m}",
+                "timeline_weeks": f"Week {start}-{end}",
+                "estimated_total_hours": 40,
+                "skills": [f"Skill {p}.{m}.a", f"Skill {p}.{m}.b"],
+                "topics": [
+                    {"name": f"Topic {p}.{m}.{t}", "estimated_hours": 10, "weeks": f"Week {start}-{end}"}
+                    for t in range(1, 4)
+                ],
+            })
+        roadmap.append({
+            "phase": f"Phase {p}",
+            "duration_weeks": duration,
+            "weeks": f"Week {week}-{week + duration - 1}",
+            "milestones": items,
+        })
+        week += duration
+    return {
+        "program_title": "Benchmark Roadmap",
+        "summary": "Synthetic roadmap served by the local fake provider.",
+        "total_weeks": week - 1,
+        "weekly_hours": 15,
+        "roadmap": roadmap,
+    }
+
+
+def _payload_of(prompt: str) -> dict:
+    marker = "Input Data:\n"
+    start = prompt.find(marker)
+    if start == -1:
+        return {}
+    line = prompt[start + len(marker):].split("\n", 1)[0]
+    try:
+        return json.loads(line)
+    except ValueError:
+        return {}
+
+
+def _count(value, default: int) -> int:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def agent_responder(prompt: str) -> dict:
+    """Pick a response body by recognising which agent prompt was sent."""
+    payload = _payload_of(prompt)
+
+    if "curriculum planning agent" in prompt:
+        return {
+            "program_title": f"{payload.get('skill', 'Benchmark')} Program",
+            "difficulty_progression": "Beginner to Advanced",
+            "courses_per_semester": 3,
+            "focus_tags": ["benchmark"],
+            "include_capstone": bool(payload.get("include_capstone")),
+            "semesters": _count(payload.get("semesters"), 4),
+        }
+    if "Learner Persona" in prompt:
+        return {"persona_type": "Benchmark Learner", "learning_style": "Balanced"}
+    if "curriculum validator" in prompt:
+        return {"status": "approved", "issues": [], "suggestions": [], "metadata_warnings": []}
+
+    if "SKELETON of a semester-wise" in prompt:
+        n = _count(payload.get("semesters"), 4)
+        full = build_curriculum(n)
+        return {
+            "program_title": full["program_title"],
+            "summary": full["summary"],
+            "semesters": [
+                {
+                    "semester": sem["semester"],
+                    "theme": f"Theme {sem['semester']}",
+                    "difficulty": sem["courses"][0]["difficulty"],
+                    "course_titles": [c["title"] for c in sem["courses"]],
+                }
+                for sem in full["semesters"]
+            ],
+        }
+    if "Write ONLY that semester" in prompt:
+        n = _count((payload.get("plan") or {}).get("semesters"), 4)
+        index = _count(payload.get("semester"), 1)
+        return build_curriculum(n)["semesters"][index - 1]
+    if "SKELETON of a learning roadmap" in prompt:
+        full = build_roadmap()
+        skeleton = {k: v for k, v in full.items() if k != "roadmap"}
+        skeleton["roadmap"] = [
+            {
+                "phase": p["phase"],
+                "duration_weeks": p["duration_weeks"],
+                "weeks": p["weeks"],
+                "milestone_titles": [m["title"] for m in p["milestones"]],
+            }
+            for p in full["roadmap"]
+        ]
+        return skeleton
+    if "Write ONLY that phase" in prompt:
+        return build_roadmap()["roadmap"][_count(payload.get("phase_number"), 1) - 1]
+
+    if "as JSON Patch operations" in prompt:
+        # project-level edits touch single fields; anything else rewrites the sections it was sent
+        instruction = payload.get("refinement_instruction", "").lower()
+        field_edit = any(word in instruction for word in ("project", "practical", "hands-on"))
+        ops = []
+        for section in payload.get("sections") or []:
+            value = json.loads(json.dumps(section["value"]))
+            child_key = "courses" if "courses" in value else "milestones"
+            for i, child in enumerate(value.get(child_key) or []):
+                child["outcome_project"] = f"Hands-on: {child.get('title', '')} ({instruction})"
+                if field_edit:
+                    ops.append({
+                        "op": "replace" if "outcome_project" in section["value"][child_key][i] else "add",
+                        "path": f"{section['path']}/{child_key}/{i}/outcome_project",
+                        "value": child["outcome_project"],
+                    })
+            if not field_edit:
+                ops.append({"op": "replace", "path": section["path"], "value": value})
+        return {"ops": ops}
+
+    if "refinement_instruction" in payload:
+        # full rewrite: the whole plan comes back
+        return {k: v for k, v in payload.items() if k != "refinement_instruction"}
+
+    if "time-bounded curriculum design" in prompt or "roadmap" in payload:
+        return build_roadmap()
+    return build_curriculum(_count(payload.get("semesters"), 4))
+
+
+class FakeProvider:
+    """Threaded HTTP server speaking the OpenAI chat-completions format."""
+
+    def __init__(self, port: int = 0, delay: float = 0.5, seconds_per_kb: float = 0.0, responder=None,
+                 seconds_per_input_kb: float = 0.0, jitter: float = 0.0, seed: int = 0):
+        self.delay = delay
+        # each call takes up to `jitter` (a fraction) longer, so parallel calls
+        # finish at different times — more spread for longer outputs
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self.seconds_per_kb = seconds_per_kb
+        self.seconds_per_input_kb = seconds_per_input_kb
+        self.responder = responder or agent_responder
+        self.calls = 0
+        self.prompts = []
+        # answer the next N requests with 429 + Retry-After, like a rate-limited provider
+        self.rate_limit_next = 0
+        self.retry_after = "1"
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                prompt = request.get("messages", [{}])[-1].get("content", "")
+                with provider._lock:
+                    provider.calls += 1
+                    provider.prompts.append(prompt)
+                    limited = provider.rate_limit_next > 0
+                    if limited:
+                        provider.rate_limit_next -= 1
+                if limited:
+                    body = b'{"error": {"message": "Rate limit reached", "type": "tokens"}}'
+                    self.send_response(429)
+                    self.send_header("Retry-After", provider.retry_after)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                    return
+                with provider._lock:
+                    provider.in_flight += 1
+                    provider.peak_in_flight = max(provider.peak_in_flight, provider.in_flight)
+                try:
+                    self._answer(request, prompt)
+                finally:
+                    with provider._lock:
+                        provider.in_flight -= 1
+
+            def _answer(self, request: dict, prompt: str):
+                content = json.dumps(provider.responder(prompt))
+                time.sleep(provider.seconds_per_input_kb * len(prompt) / 1024)
+                if request.get("stream"):
+                    self._stream(content)
+                    return
+                # output-size-dependent latency, like token-by-token generation
+                with provider._lock:
+                    spread = 1 + provider._random.uniform(0, provider.jitter) if provider.jitter else 1.0
+                time.sleep((provider.delay + provider.seconds_per_kb * len(content) / 1024) * spread)
+                body = json.dumps({
+                    "choices": [{"message": {"role": "assistant", "content": content}}]
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _stream(self, content: str):
+                """OpenAI-style SSE: one delta per 256 characters, paced by size."""
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                time.sleep(provider.delay)
+                for start in range(0, len(content), 256):
+                    piece = content[start:start + 256]
+                    time.sleep(provider.seconds_per_kb * len(piece) / 1024)
+                    event = {"choices": [{"delta": {"content": piece}}]}
+                    self.wfile.write(f"data: {json.dumps(event)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+                self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+            def handle(self):
+                try:
+                    super().handle()
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client cancelled the call (e.g. a hedge that lost)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/openai/v1/chat/completions"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--seconds-per-kb", type=float, default=0.0)
+    args = parser.parse_args()
+
+    fake = FakeProvider(port=args.port, delay=args.delay, seconds_per_kb=args.seconds_per_kb)
+    print(f"Fake provider listening on {fake.url} (delay {args.delay}s)")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
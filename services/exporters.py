@@ -0,0 +1,297 @@
+"""
+Exporters — Markdown, HTML and CSV views of a formatted curriculum
+Each exporter is a generator that walks the semesters (or the roadmap's
+phases and milestones) once and yields text as it goes, so a response can
+start streaming before the last course is written and never holds the whole
+document. No ReportLab, no worker process: these are string building only.
+PDF stays in services/pdf_generator.py / services/pdf_export.py.
+New formats register with @exporter(name, media_type, extension).
+"""
+
+import os
+import csv
+import html
+from datetime import datetime
+from urllib.parse import urlsplit
+
+# ================= CONFIG =================
+
+# text is batched into chunks of about this size before it is sent
+EXPORT_STREAM_CHUNK_BYTES = int(os.getenv("EXPORT_STREAM_CHUNK_BYTES", str(16 * 1024)))
+
+# ==========================================
+
+# name -> {"media_type", "extension", "render": generator(curriculum) of str}
+EXPORTERS = {}
+
+
+def exporter(name: str, media_type: str, extension: str):
+    def register(render):
+        EXPORTERS[name] = {"media_type": media_type, "extension": extension, "render": render}
+        return render
+    return register
+
+
+def export_stream(name: str, curriculum: dict, chunk_bytes: int = EXPORT_STREAM_CHUNK_BYTES):
+    """UTF-8 bytes of `curriculum` in format `name`, in chunks of about `chunk_bytes`."""
+    if name not in EXPORTERS:
+        raise Exception(f"Unknown export format '{name}'")
+    pending, size = [], 0
+    for text in EXPORTERS[name]["render"](curriculum):
+        data = text.encode("utf-8")
+        pending.append(data)
+        size += len(data)
+        if size >= chunk_bytes:
+            yield b"".join(pending)
+            pending, size = [], 0
+    if pending:
+        yield b"".join(pending)
+
+
+# ---------------- shared walk ----------------
+
+def _meta(curriculum: dict) -> list:
+    """(label, value) pairs shown under the title — the same as the PDF's."""
+    items = []
+    if curriculum.get("total_weeks"):
+        items.append(("Duration", f"{curriculum['total_weeks']} weeks"))
+    if curriculum.get("weekly_hours"):
+        items.append(("Weekly Hours", curriculum["weekly_hours"]))
+    if curriculum.get("difficulty"):
+        items.append(("Difficulty", curriculum["difficulty"]))
+    if curriculum.get("focus"):
+        items.append(("Focus", curriculum["focus"]))
+    elif curriculum.get("level"):
+        items.append(("Level", curriculum["level"]))
+    return items
+
+
+def _topics(item: dict):
+    """Topics of a course or milestone as dicts — plain string topics become {name}."""
+    for topic in item.get("topics") or []:
+        yield topic if isinstance(topic, dict) else {"name": str(topic)}
+
+
+def _video(topic: dict) -> str:
+    """The topic's video link — http(s) only: a posted, unsigned curriculum
+    could otherwise put a javascript: URL into the exported document."""
+    url = topic.get("video_url")
+    if not isinstance(url, str):
+        return ""
+    try:
+        scheme = urlsplit(url.strip()).scheme.lower()
+    except ValueError:
+        return ""
+    return url.strip() if scheme in ("http", "https") else ""
+
+
+def _topic_line(topic: dict, weeks: bool = True) -> str:
+    line = str(topic.get("name", ""))
+    if topic.get("estimated_hours"):
+        line += f" ({topic['estimated_hours']} hrs)"
+    if weeks and topic.get("weeks"):
+        line += f" — {topic['weeks']}"
+    return line
+
+
+def _footer() -> str:
+    return f"Generated by CurricuForge AI • {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
+
+
+# ---------------- Markdown ----------------
+
+@exporter("markdown", "text/markdown; charset=utf-8", "md")
+def render_markdown(curriculum: dict):
+    yield f"# {curriculum.get('program_title', 'Curriculum Plan')}\n\n"
+    if curriculum.get("summary"):
+        yield f"{curriculum['summary']}\n\n"
+    meta = _meta(curriculum)
+    if meta:
+        yield "".join(f"- **{label}:** {value}\n" for label, value in meta) + "\n"
+
+    if curriculum.get("semesters"):
+        for sem_idx, semester in enumerate(curriculum["semesters"]):
+            yield f"## Semester {semester.get('semester', sem_idx + 1)}\n\n"
+            for course_idx, course in enumerate(semester.get("courses", []), 1):
+                parts = [f"### {course_idx}. {course.get('title', 'Untitled Course')}\n\n"]
+                if course.get("difficulty"):
+                    parts.append(f"*{str(course['difficulty']).upper()}*\n\n")
+                if course.get("description"):
+                    parts.append(f"{course['description']}\n\n")
+                if course.get("skills"):
+                    parts.append(f"**Skills:** {', '.join(str(s) for s in course['skills'])}\n\n")
+                parts.extend(_markdown_topics(course, weeks=True))
+                if course.get("outcome_project"):
+                    parts.append(f"**Deliverable:** {course['outcome_project']}\n\n")
+                yield "".join(parts)
+
+    elif curriculum.get("roadmap"):
+        for phase_idx, phase in enumerate(curriculum["roadmap"]):
+            yield f"## {phase.get('phase', f'Phase {phase_idx + 1}')}\n\n"
+            for milestone in phase.get("milestones", []):
+                parts = [f"### {milestone.get('title', 'Milestone')}\n\n"]
+                if milestone.get("estimated_total_hours"):
+                    parts.append(f"**Time:** {milestone['estimated_total_hours']} hrs\n\n")
+                if milestone.get("skills"):
+                    parts.append(f"**Skills:** {', '.join(str(s) for s in milestone['skills'])}\n\n")
+                parts.extend(_markdown_topics(milestone, weeks=False))
+                yield "".join(parts)
+
+    if curriculum.get("validation_status"):
+        parts = ["## Curriculum Quality Review\n\n", f"**Status:** {curriculum['validation_status']}\n\n"]
+        parts.extend(f"- {issue}\n" for issue in curriculum.get("validation_issues", []))
+        parts.extend(f"- {sugg}\n" for sugg in curriculum.get("validation_suggestions", []))
+        yield "".join(parts) + "\n"
+
+    yield f"---\n\n*{_footer()}*\n"
+
+
+def _markdown_topics(item: dict, weeks: bool) -> list:
+    lines = []
+    for topic in _topics(item):
+        line = f"- {_topic_line(topic, weeks)}"
+        if _video(topic):
+            line += f" — [▶ Watch Video]({_video(topic)})"
+        lines.append(line + "\n")
+    return ["**Topics:**\n\n", *lines, "\n"] if lines else []
+
+
+# ---------------- HTML ----------------
+
+_HTML_STYLE = """
+body { font-family: Helvetica, Arial, sans-serif; color: #505050; max-width: 820px; margin: 2rem auto; padding: 0 1rem; font-size: 14px; }
+h1 { color: #0F1724; text-align: center; }
+h2 { color: #0F1724; background: #F0F8FF; padding: 4px 8px; }
+h3 { color: #333333; margin-bottom: 4px; }
+.meta { font-size: 12px; color: #606060; }
+.difficulty { color: #1932A8; font-size: 12px; }
+.approved { color: #008000; }
+.flagged { color: #FF6B6B; }
+footer { font-size: 11px; color: #999999; margin-top: 2rem; }
+"""
+
+
+@exporter("html", "text/html; charset=utf-8", "html")
+def render_html(curriculum: dict):
+    e = lambda value: html.escape(str(value))
+    title = e(curriculum.get("program_title", "Curriculum Plan"))
+    yield (f"<!DOCTYPE html>\n<html lang=\"en\">\n<head>\n<meta charset=\"utf-8\">\n"
+           f"<title>{title}</title>\n<style>{_HTML_STYLE}</style>\n</head>\n<body>\n<h1>{title}</h1>\n")
+    if curriculum.get("summary"):
+        yield f"<p>{e(curriculum['summary'])}</p>\n"
+    meta = _meta(curriculum)
+    if meta:
+        yield "".join(f"<div class=\"meta\"><b>{label}:</b> {e(value)}</div>\n" for label, value in meta)
+
+    if curriculum.get("semesters"):
+        for sem_idx, semester in enumerate(curriculum["semesters"]):
+            yield f"<h2>Semester {e(semester.get('semester', sem_idx + 1))}</h2>\n"
+            for course_idx, course in enumerate(semester.get("courses", []), 1):
+                parts = [f"<h3>{course_idx}. {e(course.get('title', 'Untitled Course'))}</h3>\n"]
+                if course.get("difficulty"):
+                    parts.append(f"<div class=\"difficulty\">[{e(str(course['difficulty']).upper())}]</div>\n")
+                if course.get("description"):
+                    parts.append(f"<p>{e(course['description'])}</p>\n")
+                if course.get("skills"):
+                    parts.append(f"<div class=\"meta\"><b>Skills:</b> {e(', '.join(str(s) for s in course['skills']))}</div>\n")
+                parts.extend(_html_topics(course, weeks=True))
+                if course.get("outcome_project"):
+                    parts.append(f"<div class=\"meta\"><b>Deliverable:</b> {e(course['outcome_project'])}</div>\n")
+                yield "".join(parts)
+
+    elif curriculum.get("roadmap"):
+        for phase_idx, phase in enumerate(curriculum["roadmap"]):
+            yield f"<h2>{e(phase.get('phase', f'Phase {phase_idx + 1}'))}</h2>\n"
+            for milestone in phase.get("milestones", []):
+                parts = [f"<h3>{e(milestone.get('title', 'Milestone'))}</h3>\n"]
+                if milestone.get("estimated_total_hours"):
+                    parts.append(f"<div class=\"meta\"><b>Time:</b> {e(milestone['estimated_total_hours'])} hrs</div>\n")
+                if milestone.get("skills"):
+                    parts.append(f"<div class=\"meta\"><b>Skills:</b> {e(', '.join(str(s) for s in milestone['skills']))}</div>\n")
+                parts.extend(_html_topics(milestone, weeks=False))
+                yield "".join(parts)
+
+    if curriculum.get("validation_status"):
+        status = str(curriculum["validation_status"])
+        parts = ["<h2>Curriculum Quality Review</h2>\n",
+                 f"<div class=\"meta {'approved' if status.lower() == 'approved' else 'flagged'}\"><b>Status:</b> {e(status)}</div>\n<ul>\n"]
+        parts.extend(f"<li>{e(issue)}</li>\n" for issue in curriculum.get("validation_issues", []))
+        parts.extend(f"<li>{e(sugg)}</li>\n" for sugg in curriculum.get("validation_suggestions", []))
+        yield "".join(parts) + "</ul>\n"
+
+    yield f"<footer>{e(_footer())}</footer>\n</body>\n</html>\n"
+
+
+def _html_topics(item: dict, weeks: bool) -> list:
+    items = []
+    for topic in _topics(item):
+        line = html.escape(_topic_line(topic, weeks))
+        if _video(topic):
+            line += f" — <a href=\"{html.escape(_video(topic))}\">▶ Watch Video</a>"
+        items.append(f"<li>{line}</li>\n")
+    return ["<div class=\"meta\"><b>Topics:</b></div>\n<ul>\n", *items, "</ul>\n"] if items else []
+
+
+# ---------------- CSV ----------------
+
+class _Row:
+    """File-like object for csv.writer: writerow returns the formatted line."""
+
+    def write(self, line: str) -> str:
+        return line
+
+
+# spreadsheets evaluate a cell starting with one of these as a formula
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _cell(value):
+    """A text cell that cannot start a formula: prefixed with ' where it would."""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_row(writer, cells: list) -> str:
+    return writer.writerow([_cell(value) for value in cells])
+
+
+SEMESTER_CSV_COLUMNS = ["semester", "course", "difficulty", "skills", "topic", "estimated_hours",
+                        "weeks", "video_url", "outcome_project"]
+ROADMAP_CSV_COLUMNS = ["phase", "milestone", "milestone_hours", "skills", "topic", "estimated_hours", "video_url"]
+
+
+@exporter("csv", "text/csv; charset=utf-8", "csv")
+def render_csv(curriculum: dict):
+    """One row per course/topic (semester plans) or milestone/topic (roadmaps);
+    a course or milestone without topics still gets one row."""
+    writer = csv.writer(_Row())
+
+    if curriculum.get("semesters"):
+        yield writer.writerow(SEMESTER_CSV_COLUMNS)
+        for sem_idx, semester in enumerate(curriculum["semesters"]):
+            sem_num = semester.get("semester", sem_idx + 1)
+            for course in semester.get("courses", []):
+                course_cells = [sem_num, course.get("title", "Untitled Course"), course.get("difficulty", ""),
+                                "; ".join(str(s) for s in course.get("skills") or [])]
+                topics = list(_topics(course)) or [{}]
+                yield "".join(_csv_row(writer, course_cells + [
+                    topic.get("name", ""), topic.get("estimated_hours", ""), topic.get("weeks", ""),
+                    _video(topic), course.get("outcome_project", ""),
+                ]) for topic in topics)
+
+    elif curriculum.get("roadmap"):
+        yield writer.writerow(ROADMAP_CSV_COLUMNS)
+        for phase_idx, phase in enumerate(curriculum["roadmap"]):
+            phase_name = phase.get("phase", f"Phase {phase_idx + 1}")
+            for milestone in phase.get("milestones", []):
+                milestone_cells = [phase_name, milestone.get("title", "Milestone"),
+                                   milestone.get("estimated_total_hours", ""),
+                                   "; ".join(str(s) for s in milestone.get("skills") or [])]
+                topics = list(_topics(milestone)) or [{}]
+                yield "".join(_csv_row(writer, milestone_cells + [
+                    topic.get("name", ""), topic.get("estimated_hours", ""), _video(topic),
+                ]) for topic in topics)
+
+    else:
+        yield writer.writerow(SEMESTER_CSV_COLUMNS)
@@ -53,7 +53,7 @@ async def call_gemini(system_prompt: str, payload: dict):
         raise Exception("Gemini client not available in this environment")
 
     try:
-        response = client.models.generate_content(
+        response = await client.aio.models.generate_content(
             model="gemini-2.5-flash-lite",
             contents=[
                 {
@@ -0,0 +1,89 @@
+"""
+Hedged requests — bound tail latency across providers
+If the primary provider has not answered within its own p-th percentile
+latency, the same request is sent to the next healthy provider and the first
+valid reply wins; the slower call is cancelled.
+
+Every hedge costs the secondary provider one extra request, so hedges are
+paid from a per-provider token bucket that refills by LLM_HEDGE_BUDGET tokens
+per call_llm request (0.1 = at most ~10% extra calls), capped at
+LLM_HEDGE_BURST. When the bucket is empty the caller simply keeps waiting.
+"""
+
+import os
+import threading
+
+LLM_HEDGING = os.getenv("LLM_HEDGING", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+# used until the primary has LLM_HEDGE_MIN_SAMPLES latency measurements
+LLM_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "10"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "10"))
+LLM_HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0.1"))
+LLM_HEDGE_BURST = float(os.getenv("LLM_HEDGE_BURST", "3"))
+
+
+class HedgePolicy:
+
+    def __init__(self, enabled: bool = LLM_HEDGING):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._tokens = {}
+        self.requests = 0
+        self.fired = 0
+        self.won = 0
+        self.lost = 0
+        self.budget_denied = 0
+        self.per_provider = {}
+
+    def delay(self, health) -> float:
+        """Seconds to wait for the primary before hedging."""
+        if health.latency_samples < LLM_HEDGE_MIN_SAMPLES:
+            return LLM_HEDGE_DELAY_SECONDS
+        return max(0.05, health.latency_percentile(LLM_HEDGE_PERCENTILE))
+
+    def note_request(self):
+        """One call_llm request reached the providers: refill every bucket."""
+        with self._lock:
+            self.requests += 1
+            for provider, tokens in self._tokens.items():
+                self._tokens[provider] = min(LLM_HEDGE_BURST, tokens + LLM_HEDGE_BUDGET)
+
+    def try_acquire(self, provider: str) -> bool:
+        """Take one hedge token for `provider`; False when its budget is spent."""
+        with self._lock:
+            tokens = self._tokens.setdefault(provider, min(1.0, LLM_HEDGE_BURST))
+            if tokens < 1.0:
+                self.budget_denied += 1
+                return False
+            self._tokens[provider] = tokens - 1.0
+            self.fired += 1
+            counters = self.per_provider.setdefault(provider, {"fired": 0, "won": 0})
+            counters["fired"] += 1
+            return True
+
+    def record_outcome(self, provider: str, hedge_won: bool):
+        with self._lock:
+            if hedge_won:
+                self.won += 1
+                self.per_provider[provider]["won"] += 1
+            else:
+                self.lost += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "percentile": LLM_HEDGE_PERCENTILE,
+                "budget": LLM_HEDGE_BUDGET,
+                "requests": self.requests,
+                "hedges_fired": self.fired,
+                "hedges_won": self.won,
+                "hedges_lost": self.lost,
+                "budget_denied": self.budget_denied,
+                "hedge_rate": round(self.fired / self.requests, 4) if self.requests else 0.0,
+                "tokens": {p: round(t, 2) for p, t in self._tokens.items()},
+                "per_provider": {p: dict(c) for p, c in self.per_provider.items()},
+            }
+
+
+llm_hedging = HedgePolicy()
@@ -0,0 +1,189 @@
+"""
+Job Queue — run pipelines detached from the HTTP request
+POST /jobs enqueues a run and returns at once; a bounded pool of asyncio
+workers executes it and GET /jobs/{id} reports status, stage and result.
+A client that disconnects or times out (e.g. a serverless function limit)
+no longer throws away the provider calls already made — the job finishes
+and its result waits to be collected.
+
+Jobs live in this worker process's memory; the finished plan is also in the
+plan store under the result's plan_id.
+"""
+
+import os
+import time
+import asyncio
+import secrets
+from collections import OrderedDict, deque
+
+from services.logger import get_logger
+from services.provider_health import _percentile
+
+logger = get_logger("job_queue")
+
+# ================= CONFIG =================
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))                 # concurrent runs per worker process
+JOB_QUEUE_MAX = int(os.getenv("JOB_QUEUE_MAX", "100"))           # queued jobs before POST /jobs is refused
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+JOB_MAX_JOBS = int(os.getenv("JOB_MAX_JOBS", "1000"))            # finished jobs kept for lookup
+JOB_METRICS_WINDOW = 500
+
+# ==========================================
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+
+    def __init__(self, payload: dict):
+        self.id = secrets.token_hex(8)
+        self.payload = payload
+        self.status = QUEUED
+        self.stage = None
+        self.sections_done = 0
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self) -> dict:
+        body = {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "sections_done": self.sections_done,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status == DONE:
+            body["result"] = self.result
+        elif self.status == FAILED:
+            body["error"] = self.error
+        return body
+
+
+class JobQueue:
+
+    def __init__(self, runner, workers: int = JOB_WORKERS, max_depth: int = JOB_QUEUE_MAX):
+        """`runner(payload, on_event)` is the async function each job executes."""
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_depth = max_depth
+        self._queue = None
+        self._tasks = []
+        self._jobs = OrderedDict()
+        self._waits = deque(maxlen=JOB_METRICS_WINDOW)
+        self._runs = deque(maxlen=JOB_METRICS_WINDOW)
+        self.running = 0
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _ensure_workers(self):
+        # started lazily: the queue and tasks belong to the serving event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._tasks = [t for t in self._tasks if not t.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    def submit(self, payload: dict) -> Job:
+        """Enqueue a run; raises QueueFull when max_depth jobs are already waiting."""
+        self._ensure_workers()
+        if self._queue.qsize() >= self.max_depth:
+            self.rejected += 1
+            raise QueueFull(f"Job queue is full ({self.max_depth} waiting)")
+        self._prune()
+        job = Job(payload)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._waits.append(job.started_at - job.created_at)
+        self.running += 1
+
+        async def on_event(event: str, payload: dict):
+            if event == "stage":
+                job.stage = payload.get("stage")
+            elif event == "section":
+                job.sections_done += 1
+            elif event == "reset":
+                job.sections_done = 0
+
+        try:
+            job.result = await self.runner(job.payload, on_event)
+            job.status = DONE
+            self.completed += 1
+        except Exception as e:
+            logger.exception("Job %s failed: %s", job.id, str(e))
+            job.error = str(e)
+            job.status = FAILED
+            self.failed += 1
+        finally:
+            self.running -= 1
+            job.finished_at = time.time()
+            self._runs.append(job.finished_at - job.started_at)
+            job.payload = None
+
+    def _prune(self):
+        """Forget finished jobs past retention, then the oldest beyond JOB_MAX_JOBS."""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+        excess = len(self._jobs) - JOB_MAX_JOBS
+        for job in finished:
+            if now - job.finished_at > JOB_RETENTION_SECONDS or excess > 0:
+                del self._jobs[job.id]
+                excess -= 1
+
+    async def shutdown(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def stats(self) -> dict:
+        waits, runs = list(self._waits), list(self._runs)
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_depth": self.max_depth,
+            "running": self.running,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "jobs_tracked": len(self._jobs),
+            "wait_seconds": {p: _round(_percentile(waits, n)) for p, n in (("p50", 50), ("p95", 95), ("max", 100))},
+            "run_seconds": {p: _round(_percentile(runs, n)) for p, n in (("p50", 50), ("p95", 95), ("max", 100))},
+        }
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
@@ -0,0 +1,84 @@
+"""
+JSON Patch — the add / replace / remove subset of RFC 6902
+Used by patch-based refinement: the model returns a few ops addressed by
+JSON Pointer paths ("/semesters/2/courses/0"), applied here to a copy of
+the stored plan. Any op that does not fit the document raises.
+"""
+
+import copy
+
+SUPPORTED_OPS = ("add", "replace", "remove")
+
+
+def _parse_pointer(path: str):
+    if not isinstance(path, str) or (path and not path.startswith("/")):
+        raise Exception(f"Invalid JSON Pointer: {path!r}")
+    return [part.replace("~1", "/").replace("~0", "~") for part in path.split("/")[1:]]
+
+
+def _index(container: list, token: str, allow_end: bool) -> int:
+    if token == "-" and allow_end:
+        return len(container)
+    if not token.isdigit():
+        raise Exception(f"Invalid list index: {token!r}")
+    index = int(token)
+    limit = len(container) if allow_end else len(container) - 1
+    if index > limit:
+        raise Exception(f"List index out of range: {index}")
+    return index
+
+
+def _resolve_parent(doc, tokens):
+    target = doc
+    for token in tokens[:-1]:
+        if isinstance(target, list):
+            target = target[_index(target, token, allow_end=False)]
+        elif isinstance(target, dict) and token in target:
+            target = target[token]
+        else:
+            raise Exception(f"Path segment not found: {token!r}")
+    return target
+
+
+def apply_op(doc, op: dict):
+    """Apply one op in place and return the (possibly replaced) document."""
+    kind = op.get("op")
+    if kind not in SUPPORTED_OPS:
+        raise Exception(f"Unsupported patch op: {kind!r}")
+    if kind != "remove" and "value" not in op:
+        raise Exception(f"'{kind}' op at {op.get('path')!r} has no value")
+
+    tokens = _parse_pointer(op.get("path"))
+    value = copy.deepcopy(op.get("value"))
+    if not tokens:
+        if kind == "remove":
+            raise Exception("Cannot remove the whole document")
+        return value
+
+    parent = _resolve_parent(doc, tokens)
+    key = tokens[-1]
+    if isinstance(parent, list):
+        if kind == "add":
+            parent.insert(_index(parent, key, allow_end=True), value)
+        elif kind == "replace":
+            parent[_index(parent, key, allow_end=False)] = value
+        else:
+            del parent[_index(parent, key, allow_end=False)]
+    elif isinstance(parent, dict):
+        if kind != "add" and key not in parent:
+            raise Exception(f"Cannot {kind} missing key {key!r}")
+        if kind == "remove":
+            del parent[key]
+        else:
+            parent[key] = value
+    else:
+        raise Exception(f"Cannot apply '{kind}' inside a scalar at {op.get('path')!r}")
+    return doc
+
+
+def apply_patch(doc, ops):
+    """Apply `ops` in order to a deep copy of `doc`; the original is untouched."""
+    result = copy.deepcopy(doc)
+    for op in ops:
+        result = apply_op(result, op)
+    return result
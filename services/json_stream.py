@@ -0,0 +1,256 @@
+"""
+Incremental JSON Parser — single pass over model output
+Consumes provider text chunk by chunk, tracks string / escape / nesting state
+once, emits completed sub-objects (semesters, courses, phases, milestones) as
+soon as they close, and knows exactly whether the document was truncated.
+Chunks are kept in a list and joined only when the whole text is needed; the
+scan buffer drops text it no longer needs, so feeding stays linear.
+"""
+
+import re
+import json
+
+# Lists whose object items are emitted as soon as each item closes
+DEFAULT_EMIT_KEYS = ("semesters", "roadmap", "courses", "milestones")
+
+# One regex step per token: either a whole string literal (group 1, with
+# group 2 set when its closing quote has arrived) or a structural character.
+# Numbers, literals and whitespace are skipped inside the C regex engine.
+_TOKEN = re.compile(r'("[^"\\]*(?:\\.[^"\\]*)*)(")?|[{}\[\],:]', re.S)
+# Continuation of a string literal that was split across chunks
+_STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*(")?', re.S)
+
+
+class _Frame:
+    __slots__ = ("kind", "start", "key", "expect", "pending_key", "children")
+
+    def __init__(self, kind: str, start: int, key):
+        self.kind = kind            # "{" or "["
+        self.start = start          # text index of the opening bracket
+        self.key = key              # key / index of this container in its parent
+        self.expect = "key"         # objects: key -> colon -> value
+        self.pending_key = None
+        self.children = 0           # arrays: containers opened so far
+
+
+class IncrementalJSONParser:
+
+    def __init__(self, emit_keys=DEFAULT_EMIT_KEYS):
+        self.emit_keys = set(emit_keys)
+        self._chunks = []
+        # the unscanned tail of the text plus what emitted items still need;
+        # positions are indexes into the whole text, _buf starts at _offset
+        self._buf = ""
+        self._offset = 0
+        self._pos = 0
+        self._root_start = -1
+        self._root_end = -1
+        self._stack = []
+        self._in_string = False
+        self._string_start = -1
+        self._string_is_key = False
+
+    # =================================================
+    # STATE
+    # =================================================
+    @property
+    def raw_text(self) -> str:
+        """All text fed so far."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    @property
+    def started(self) -> bool:
+        return self._root_start != -1
+
+    @property
+    def done(self) -> bool:
+        return self._root_end != -1
+
+    @property
+    def truncated(self) -> bool:
+        """True if a JSON object started but never closed."""
+        return self.started and not self.done
+
+    # =================================================
+    # FEED
+    # =================================================
+    def feed(self, chunk: str):
+        """
+        Append a chunk of model output.
+        Returns a list of (path, obj) for every watched item that closed in
+        this chunk, e.g. (("semesters", 2), {...}).
+        """
+        if not chunk or self.done:
+            if chunk:
+                self._chunks.append(chunk)
+            return []
+
+        self._chunks.append(chunk)
+        self._buf += chunk
+        buf = self._buf
+        base = self._offset
+        emitted = []
+
+        if not self.started:
+            start = buf.find("{", self._pos - base)
+            if start == -1:
+                self._pos = base + len(buf)
+                self._trim()
+                return emitted
+            self._root_start = base + start
+            self._stack.append(_Frame("{", base + start, None))
+            self._pos = base + start + 1
+
+        pos = self._pos - base
+        stack = self._stack
+
+        while stack:
+            if self._in_string:
+                m = _STRING_REST.match(buf, pos)
+                pos = m.end()
+                if m.group(1) is None:
+                    break
+                self._in_string = False
+                self._close_string(base + pos)
+                continue
+
+            m = _TOKEN.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            idx = m.start()
+            pos = m.end()
+            top = stack[-1]
+
+            if m.group(1) is not None:
+                self._string_start = base + idx
+                self._string_is_key = top.kind == "{" and top.expect == "key"
+                if m.group(2) is None:
+                    # string continues in the next chunk
+                    self._in_string = True
+                    break
+                self._close_string(base + pos)
+                continue
+
+            ch = buf[idx]
+            if ch == ":":
+                top.expect = "value"
+            elif ch == ",":
+                if top.kind == "{":
+                    top.expect = "key"
+            elif ch == "{" or ch == "[":
+                if top.kind == "{":
+                    key = self._decode_key(top.pending_key)
+                else:
+                    key = top.children
+                    top.children += 1
+                stack.append(_Frame(ch, base + idx, key))
+            else:
+                frame = stack.pop()
+                if not stack:
+                    self._root_end = base + idx
+                    break
+                parent = stack[-1]
+                if (
+                    frame.kind == "{"
+                    and parent.kind == "["
+                    and parent.key in self.emit_keys
+                ):
+                    path = tuple(f.key for f in stack[1:]) + (frame.key,)
+                    try:
+                        emitted.append((path, json.loads(buf[frame.start - base:idx + 1])))
+                    except json.JSONDecodeError:
+                        # malformed item: not emitted, result() reports the error
+                        pass
+
+        self._pos = base + pos
+        self._trim()
+        return emitted
+
+    def _trim(self):
+        """Drop buffered text before the earliest position still needed."""
+        keep = self._pos
+        stack = self._stack
+        # the outermost open item that will be emitted is sliced when it closes
+        for parent, frame in zip(stack, stack[1:]):
+            if frame.kind == "{" and parent.kind == "[" and parent.key in self.emit_keys:
+                keep = min(keep, frame.start)
+                break
+        if self._in_string:
+            keep = min(keep, self._string_start)
+        if stack and stack[-1].pending_key is not None and stack[-1].expect != "key":
+            keep = min(keep, stack[-1].pending_key[0])
+        drop = keep - self._offset
+        # only when at least half the buffer goes, so copying stays linear overall
+        if drop > 0 and drop * 2 >= len(self._buf):
+            self._buf = self._buf[drop:]
+            self._offset = keep
+
+    def _close_string(self, end: int):
+        if self._string_is_key:
+            top = self._stack[-1]
+            # keep only the span; most keys never need decoding
+            top.pending_key = (self._string_start, end)
+            top.expect = "colon"
+
+    def _decode_key(self, span):
+        if span is None:
+            return None
+        start, end = span[0] - self._offset, span[1] - self._offset
+        raw = self._buf[start + 1:end - 1]
+        return json.loads(self._buf[start:end]) if "\\" in raw else raw
+
+    # =================================================
+    # RESULT
+    # =================================================
+    def text(self) -> str:
+        """
+        The JSON document text. When the output was truncated, open strings
+        and containers are closed (innermost first) so it can still parse.
+        """
+        if not self.raw_text or not self.raw_text.strip():
+            raise Exception("Empty model response")
+        if not self.started:
+            raise Exception("No JSON detected in model response")
+        if self.done:
+            return self.raw_text[self._root_start:self._root_end + 1]
+
+        repair = self.raw_text[self._root_start:]
+        top = self._stack[-1]
+
+        if self._in_string:
+            if repair.endswith("\\") and not repair.endswith("\\\\"):
+                repair = repair[:-1]
+            repair += '"'
+            if self._string_is_key:
+                top.expect = "colon"
+
+        repair = repair.rstrip()
+        if top.kind == "{" and top.expect == "colon":
+            repair += ":null"
+        elif repair.endswith(":"):
+            repair += "null"
+        elif repair.endswith(","):
+            repair = repair[:-1]
+
+        closers = {"{": "}", "[": "]"}
+        return repair + "".join(closers[f.kind] for f in reversed(self._stack))
+
+    def result(self):
+        """Parse the (possibly repaired) document; raises json.JSONDecodeError."""
+        return json.loads(self.text())
+
+
+def parse_items(obj, emit_keys=DEFAULT_EMIT_KEYS, path=()):
+    """Yield (path, item) for watched items of an already-parsed document,
+    in the same order the incremental parser would have emitted them."""
+    if isinstance(obj, dict):
+        for key, value in obj.items():
+            if isinstance(value, list):
+                for idx, item in enumerate(value):
+                    if isinstance(item, dict):
+                        yield from parse_items(item, emit_keys, path + (key, idx))
+                        if key in emit_keys:
+                            yield path + (key, idx), item
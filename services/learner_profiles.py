@@ -0,0 +1,74 @@
+"""
+Learner Profile Table — deterministic personal-planner profiles
+Looks up the 12 learner_profile fields from the precomputed table in
+data/learner_profiles.json (built by scripts/build_learner_profiles.py).
+Returns None for free-text or unseen inputs so the caller can fall back to the LLM.
+"""
+
+import json
+from pathlib import Path
+
+from services.logger import get_logger
+
+logger = get_logger("learner_profiles")
+
+TABLE_PATH = Path(__file__).resolve().parents[1] / "data" / "learner_profiles.json"
+
+_table = None
+
+
+def _load_table():
+    global _table
+    if _table is None:
+        try:
+            _table = json.loads(TABLE_PATH.read_text(encoding="utf-8"))
+            logger.info("Loaded learner profile table v%s", _table.get("version"))
+        except Exception as e:
+            logger.warning("Learner profile table unavailable: %s", e)
+            _table = {}
+    return _table
+
+
+def _normalize(name: str, value, table: dict):
+    if value is None:
+        return None
+    text = " ".join(str(value).strip().lower().split())
+    if name == "weekly_hours":
+        try:
+            text = str(int(float(text)))
+        except ValueError:
+            return None
+    text = table.get("aliases", {}).get(name, {}).get(text, text)
+    if text not in table.get("inputs", {}).get(name, []):
+        return None
+    return text
+
+
+def table_version():
+    return _load_table().get("version")
+
+
+def lookup_learner_profile(data: dict):
+    """
+    Return the precomputed learner_profile for these inputs, or None if any
+    input is missing, free-text or outside the table's enumerated values.
+    """
+    table = _load_table()
+    if not table:
+        return None
+
+    normalized = {}
+    for name in table.get("inputs", {}):
+        value = _normalize(name, data.get(name), table)
+        if value is None:
+            return None
+        normalized[name] = value
+
+    profile = {}
+    for field_name, spec in table.get("fields", {}).items():
+        key = "|".join(normalized[dep] for dep in spec["depends_on"])
+        value = spec["values"].get(key)
+        if value is None:
+            return None
+        profile[field_name] = value
+    return profile
@@ -0,0 +1,221 @@
+"""
+LLM Response Cache — content-addressed, TTL + LRU bounded
+Keys are a SHA-256 of (provider, model, system prompt, canonical payload);
+values are the parsed JSON the provider returned. Memory backend by default,
+optional SQLite file under /tmp so entries survive warm restarts.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+from services.logger import get_logger
+
+logger = get_logger("llm_cache")
+
+# ================= CONFIG =================
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "memory").lower()  # memory | sqlite
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "/tmp/curricuforge_llm_cache.sqlite3")
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "512"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+# ==========================================
+
+
+def canonical_json(payload) -> str:
+    """Serialize a payload so equal dicts always produce identical text."""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def make_cache_key(provider: str, model: str, system_prompt: str, payload) -> str:
+    material = canonical_json([provider, model, system_prompt, payload])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """In-process LRU store: key -> (expires_at, value_text, latency)."""
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._bytes = 0
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def set(self, key: str, expires_at: float, value: str, latency: float):
+        self.delete(key)
+        self._entries[key] = (expires_at, value, latency)
+        self._bytes += len(value)
+
+    def delete(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def evict_lru(self) -> bool:
+        if not self._entries:
+            return False
+        key = next(iter(self._entries))
+        self.delete(key)
+        return True
+
+    def size(self):
+        return len(self._entries), self._bytes
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+
+class SQLiteCacheBackend:
+    """On-disk store with the same interface; LRU order tracked by last_access."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " latency REAL NOT NULL, expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_cache_lru ON llm_cache(last_access)")
+
+    def get(self, key: str):
+        row = self._conn.execute(
+            "SELECT expires_at, value, latency FROM llm_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+        return row
+
+    def set(self, key: str, expires_at: float, value: str, latency: float):
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, size, latency, expires_at, last_access)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (key, value, len(value), latency, expires_at, time.time()),
+        )
+
+    def delete(self, key: str):
+        self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def evict_lru(self) -> bool:
+        row = self._conn.execute("SELECT key FROM llm_cache ORDER BY last_access LIMIT 1").fetchone()
+        if row is None:
+            return False
+        self.delete(row[0])
+        return True
+
+    def size(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache").fetchone()
+        return count, total
+
+    def clear(self):
+        self._conn.execute("DELETE FROM llm_cache")
+
+
+class LLMCache:
+    """TTL + LRU cache of parsed provider responses with hit/miss counters."""
+
+    def __init__(self, backend, ttl_seconds: float, max_entries: int, max_bytes: int):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.saved_seconds = 0.0
+        self.saved_bytes = 0
+
+    def get_first(self, keys):
+        """Return the first live entry among `keys` (routing order), or None.
+
+        Counts exactly one hit or one miss per lookup. Values are decoded
+        fresh on every hit, so callers may mutate what they receive.
+        """
+        now = time.time()
+        with self._lock:
+            for key in keys:
+                entry = self.backend.get(key)
+                if entry is None:
+                    continue
+                expires_at, value, latency = entry
+                if expires_at < now:
+                    self.backend.delete(key)
+                    self.expirations += 1
+                    continue
+                self.hits += 1
+                self.saved_seconds += latency
+                self.saved_bytes += len(value)
+                return json.loads(value)
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value, latency: float = 0.0):
+        text = json.dumps(value, ensure_ascii=False)
+        if len(text) > self.max_bytes:
+            return
+        with self._lock:
+            self.backend.set(key, time.time() + self.ttl_seconds, text, latency)
+            self.stores += 1
+            count, total = self.backend.size()
+            while (count > self.max_entries or total > self.max_bytes) and self.backend.evict_lru():
+                self.evictions += 1
+                count, total = self.backend.size()
+
+    def clear(self):
+        with self._lock:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, total = self.backend.size()
+            lookups = self.hits + self.misses
+            return {
+                "enabled": LLM_CACHE_ENABLED,
+                "backend": type(self.backend).__name__,
+                "entries": count,
+                "bytes": total,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                # provider time and output volume we did not have to pay for
+                "saved_provider_seconds": round(self.saved_seconds, 3),
+                "saved_response_bytes": self.saved_bytes,
+            }
+
+
+def _build_backend():
+    if LLM_CACHE_BACKEND == "sqlite":
+        try:
+            return SQLiteCacheBackend(LLM_CACHE_PATH)
+        except Exception as e:
+            logger.warning("SQLite LLM cache unavailable (%s); using memory backend", e)
+    return MemoryCacheBackend()
+
+
+llm_cache = LLMCache(
+    _build_backend(),
+    ttl_seconds=LLM_CACHE_TTL_SECONDS,
+    max_entries=LLM_CACHE_MAX_ENTRIES,
+    max_bytes=LLM_CACHE_MAX_BYTES,
+)
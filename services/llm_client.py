@@ -1,7 +1,9 @@
 import os
 import json
-import requests
+import time
 import asyncio
+import inspect
+import httpx
 from dotenv import load_dotenv
 
 # Attempt to import the Google Generative AI client. If it's not
@@ -19,6 +21,16 @@ except Exception:
 load_dotenv()
 
 from services.logger import get_logger
+from services.llm_cache import llm_cache, make_cache_key, canonical_json, LLM_CACHE_ENABLED
+from services.single_flight import SingleFlight
+from services.provider_health import provider_health, CLOSED
+from services.hedging import llm_hedging
+from services.llm_scheduler import llm_scheduler, RateLimitError, SchedulerBusy, parse_retry_after
+from services.request_context import (
+    remaining_time, request_deadline, sharing_key, within_deadline, DeadlineExceeded,
+)
+from services.json_stream import IncrementalJSONParser, parse_items
+from pydantic import ValidationError
 logger = get_logger("llm_client")
 
 # ================= CONFIG =================
@@ -26,7 +38,17 @@ logger = get_logger("llm_client")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-GROQ_URL = "https://api.groq.com/openai/v1/chat/completions"
+GROQ_URL = os.getenv("GROQ_URL", "https://api.groq.com/openai/v1/chat/completions")
+
+GEMINI_MODEL = "gemini-2.5-flash-lite"
+GROQ_MODEL = "llama-3.3-70b-versatile"
+
+# Provider HTTP timeouts and connection pool size (per worker process)
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "120"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+
+# Append every raw provider reply to this JSONL file (for repair-rate reports)
+LLM_RECORD_PATH = os.getenv("LLM_RECORD_PATH")
 
 # Gemini client
 gemini_client = None
@@ -36,9 +58,47 @@ if genai is not None:
     except Exception:
         gemini_client = None
 
-# ================= CIRCUIT BREAKER (Quota Fallback) =================
-# Once Gemini quota fails, skip Gemini for all subsequent requests
-gemini_quota_exhausted = False
+# Identical concurrent call_llm invocations share one provider round-trip
+llm_flight = SingleFlight("call_llm")
+
+# Output-quality counters (served by GET /llm/stats)
+llm_stats = {
+    "provider_replies": 0,
+    "repair_calls": 0,
+    "truncated_replies": 0,
+    "json_failures": 0,
+    "schema_failures": 0,
+}
+
+# ================= ASYNC HTTP POOL =================
+# One keep-alive connection pool shared by every Groq request in this
+# process. Created lazily so importing the module never opens sockets.
+_groq_http = None
+
+
+def _get_groq_http() -> httpx.AsyncClient:
+    global _groq_http
+    if _groq_http is None or _groq_http.is_closed:
+        _groq_http = httpx.AsyncClient(
+            timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_CONNECTIONS,
+            ),
+            headers={
+                "Authorization": f"Bearer {GROQ_API_KEY}",
+                "Content-Type": "application/json",
+            },
+        )
+    return _groq_http
+
+
+async def close_llm_clients():
+    """Close pooled provider connections (called on app shutdown)."""
+    global _groq_http
+    if _groq_http is not None and not _groq_http.is_closed:
+        await _groq_http.aclose()
+    _groq_http = None
 
 # ==========================================
 
@@ -46,96 +106,12 @@ gemini_quota_exhausted = False
 def extract_json(text: str):
     """
     Cleans model output and extracts ONLY JSON body.
-    Handles markdown fences, truncation, and brace balancing.
+    Handles markdown fences, truncation, and brace balancing
+    (single pass, see services/json_stream.py).
     """
-    if not text:
-        raise Exception("Empty model response")
-
-    text = text.strip()
-
-    # remove markdown fences if present
-    if text.startswith("```"):
-        parts = text.split("```")
-        if len(parts) > 1:
-            # prefer the fenced block content
-            text = parts[1].strip()
-
-    # find first JSON object start
-    start = text.find("{")
-    if start == -1:
-        raise Exception("No JSON detected in model response")
-
-    # balance braces to find the matching closing brace
-    depth = 0
-    end = -1
-    in_string = False
-    escape_next = False
-    
-    for i in range(start, len(text)):
-        ch = text[i]
-        
-        # Track string boundaries to avoid counting braces inside strings
-        if escape_next:
-            escape_next = False
-            continue
-        if ch == '\\':
-            escape_next = True
-            continue
-        if ch == '"':
-            in_string = not in_string
-            continue
-        
-        # Count braces only outside strings
-        if not in_string:
-            if ch == '{':
-                depth += 1
-            elif ch == '}':
-                depth -= 1
-                if depth == 0:
-                    end = i
-                    break
-
-    if end == -1:
-        # JSON is truncated; try to repair by closing open braces/brackets
-        candidate = text[start:]
-        
-        # Count unclosed braces and brackets
-        unclosed_braces = 0
-        unclosed_brackets = 0
-        in_string = False
-        escape_next = False
-        
-        for ch in candidate:
-            if escape_next:
-                escape_next = False
-                continue
-            if ch == '\\':
-                escape_next = True
-                continue
-            if ch == '"':
-                in_string = not in_string
-                continue
-            if not in_string:
-                if ch == '{':
-                    unclosed_braces += 1
-                elif ch == '}':
-                    unclosed_braces -= 1
-                elif ch == '[':
-                    unclosed_brackets += 1
-                elif ch == ']':
-                    unclosed_brackets -= 1
-        
-        # Close unclosed structures
-        repair = candidate
-        if unclosed_brackets > 0:
-            repair += ']' * unclosed_brackets
-        if unclosed_braces > 0:
-            repair += '}' * unclosed_braces
-        
-        return repair
-    
-    candidate = text[start:end + 1]
-    return candidate
+    parser = IncrementalJSONParser()
+    parser.feed(text or "")
+    return parser.text()
 
 
 def detect_truncation(json_str: str) -> bool:
@@ -145,43 +121,344 @@ def detect_truncation(json_str: str) -> bool:
     """
     if not json_str:
         return True
-    
-    json_str = json_str.strip()
-    
-    # Count unclosed braces and brackets
-    unclosed_braces = 0
-    unclosed_brackets = 0
-    in_string = False
-    escape_next = False
-    
-    for ch in json_str:
-        if escape_next:
-            escape_next = False
-            continue
-        if ch == '\\':
-            escape_next = True
-            continue
-        if ch == '"':
-            in_string = not in_string
-            continue
-        if not in_string:
-            if ch == '{':
-                unclosed_braces += 1
-            elif ch == '}':
-                unclosed_braces -= 1
-            elif ch == '[':
-                unclosed_brackets += 1
-            elif ch == ']':
-                unclosed_brackets -= 1
-    
-    # If there are still unclosed structures after auto-repair, it's likely truncated
-    if unclosed_braces > 0 or unclosed_brackets > 0:
-        return True
-    
-    return False
+
+    parser = IncrementalJSONParser()
+    parser.feed(json_str)
+    return not parser.done
+
+
+# =====================================================
+# PROVIDER CALLS (non-blocking)
 # =====================================================
 
-async def call_llm(system_prompt: str, payload: dict):
+def _gemini_config(json_mode: bool):
+    # JSON mode: the model may only emit a JSON document
+    return {"response_mime_type": "application/json"} if json_mode else None
+
+
+async def _gemini_generate(prompt: str, json_mode: bool = False) -> str:
+    """Send one prompt to Gemini without blocking the event loop."""
+    contents = [{
+        "role": "user",
+        "parts": [{"text": prompt}]
+    }]
+
+    aio = getattr(gemini_client, "aio", None)
+    if aio is not None:
+        response = await aio.models.generate_content(
+            model=GEMINI_MODEL,
+            contents=contents,
+            config=_gemini_config(json_mode),
+        )
+    else:
+        # Older SDKs have no async surface; keep the blocking call off the loop
+        response = await asyncio.to_thread(
+            gemini_client.models.generate_content,
+            model=GEMINI_MODEL,
+            contents=contents,
+            config=_gemini_config(json_mode),
+        )
+
+    return response.text
+
+
+async def _gemini_stream(prompt: str, json_mode: bool = False):
+    """Yield Gemini output text chunk by chunk as it is generated."""
+    aio = getattr(gemini_client, "aio", None)
+    if aio is None:
+        yield await _gemini_generate(prompt, json_mode)
+        return
+
+    stream = aio.models.generate_content_stream(
+        model=GEMINI_MODEL,
+        contents=[{
+            "role": "user",
+            "parts": [{"text": prompt}]
+        }],
+        config=_gemini_config(json_mode),
+    )
+    # newer SDKs return an awaitable that resolves to the async iterator
+    if inspect.isawaitable(stream):
+        stream = await stream
+    async for chunk in stream:
+        if chunk.text:
+            yield chunk.text
+
+
+def _groq_request(prompt: str, stream: bool = False, json_mode: bool = False) -> dict:
+    groq_payload = {
+        "model": GROQ_MODEL,
+        "messages": [
+            {
+                "role": "user",
+                "content": prompt
+            }
+        ],
+        "temperature": 0.3,
+        "max_tokens": 8000
+    }
+    if stream:
+        groq_payload["stream"] = True
+    elif json_mode:
+        # Groq's JSON mode cannot be combined with streaming
+        groq_payload["response_format"] = {"type": "json_object"}
+    return groq_payload
+
+
+def _groq_check_status(response: httpx.Response, body: str):
+    llm_scheduler.get("groq").observe_headers(response.headers)
+    if response.status_code == 200:
+        return
+    logger.warning("Groq Raw Response: %s", body)
+    if response.status_code == 429:
+        raise RateLimitError("Groq HTTP Error: 429", parse_retry_after(response.headers.get("retry-after")))
+    raise Exception(f"Groq HTTP Error: {response.status_code}")
+
+
+async def _groq_stream(prompt: str, json_mode: bool = False):
+    """Yield Groq output text chunk by chunk (OpenAI-style SSE deltas)."""
+    async with _get_groq_http().stream("POST", GROQ_URL, json=_groq_request(prompt, stream=True)) as response:
+        body = (await response.aread()).decode("utf-8", "replace") if response.status_code != 200 else ""
+        _groq_check_status(response, body)
+
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[5:].strip()
+            if data == "[DONE]":
+                break
+            event = json.loads(data)
+            if "error" in event:
+                raise Exception(f"Groq Error: {event['error']}")
+            choices = event.get("choices") or [{}]
+            delta = choices[0].get("delta", {}).get("content")
+            if delta:
+                yield delta
+
+
+async def _groq_generate(prompt: str, json_mode: bool = False) -> str:
+    """Send one prompt to Groq over the pooled async HTTP client."""
+    response = await _get_groq_http().post(GROQ_URL, json=_groq_request(prompt, json_mode=json_mode))
+    _groq_check_status(response, response.text if response.status_code != 200 else "")
+
+    result = response.json()
+
+    # ===== SAFE PARSING =====
+    if isinstance(result, dict):
+        # Groq returns standard OpenAI format
+        if "error" in result:
+            raise Exception(f"Groq Error: {result['error']}")
+        elif "choices" in result and len(result["choices"]) > 0:
+            return result["choices"][0].get("message", {}).get("content", "")
+        else:
+            raise Exception(f"Unexpected Groq response: {result}")
+
+    raise Exception("Invalid Groq response format")
+
+
+PROVIDER_MODELS = {
+    "gemini": GEMINI_MODEL,
+    "groq": GROQ_MODEL,
+}
+
+PROVIDER_LABELS = {
+    "gemini": "Gemini",
+    "groq": "Groq",
+}
+
+
+async def _provider_generate(provider: str, prompt: str, json_mode: bool = False) -> str:
+    if provider == "gemini":
+        return await _gemini_generate(prompt, json_mode)
+    return await _groq_generate(prompt, json_mode)
+
+
+def _provider_stream(provider: str, prompt: str, json_mode: bool = False):
+    if provider == "gemini":
+        return _gemini_stream(prompt, json_mode)
+    return _groq_stream(prompt, json_mode)
+
+
+def _provider_order():
+    """
+    Providers to try, in order: healthy ones first (fastest first), providers
+    whose circuit is open last. See services/provider_health.py.
+    """
+    if gemini_client is None:
+        return ["groq"]
+    return provider_health.rank(["gemini", "groq"])
+
+
+def provider_backoff_seconds() -> float:
+    """
+    0 when some provider can take a request now; otherwise the seconds until
+    the first open circuit (e.g. a rate-limited provider) half-opens.
+    """
+    waits = [provider_health.get(p).snapshot()["retry_in_seconds"] for p in _provider_order()]
+    return min(waits) if waits else 0.0
+
+
+async def _read_json(provider: str, prompt: str, on_item=None, json_mode: bool = False, timing: dict = None):
+    """
+    Get one provider reply and feed it through a single-pass parser.
+    With `on_item`, the reply is streamed and every completed section
+    (semester, course, phase, milestone) is handed over as it closes.
+    `timing["seconds"]` (optional) is increased by the provider's own
+    response time — not the time the call waited in the scheduler.
+    """
+    provider_seconds = 0.0
+
+    async def call():
+        nonlocal provider_seconds
+        started = time.perf_counter()
+        parser = IncrementalJSONParser()
+        if on_item is None:
+            parser.feed(await _provider_generate(provider, prompt, json_mode))
+        else:
+            async for chunk in _provider_stream(provider, prompt, json_mode):
+                for path, item in parser.feed(chunk):
+                    await on_item(path, item)
+        provider_seconds = time.perf_counter() - started
+        return parser, parser.raw_text
+
+    # paced per provider: RPM / TPM buckets, concurrency cap, Retry-After
+    parser = await llm_scheduler.run(provider, prompt, call)
+    if timing is not None:
+        timing["seconds"] += provider_seconds
+
+    llm_stats["provider_replies"] += 1
+    if parser.truncated:
+        llm_stats["truncated_replies"] += 1
+    return parser
+
+
+def _record_reply(provider: str, schema, json_mode: bool, parser, repair: bool = False):
+    if not LLM_RECORD_PATH:
+        return
+    try:
+        with open(LLM_RECORD_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps({
+                "provider": provider,
+                "schema": schema.__name__ if schema is not None else None,
+                "json_mode": json_mode,
+                "repair": repair,
+                "text": parser.raw_text,
+            }) + "\n")
+    except OSError as e:
+        logger.warning("Could not record LLM reply: %s", e)
+
+
+def _validate_output(schema, parsed, label: str):
+    """
+    Check a parsed reply against the agent's schema and return it normalized.
+    A section wrapped in an outer object ({"semester": {...}} or the
+    whole-program {"semesters": [{...}]}) is unwrapped before giving up.
+    """
+    candidates = [parsed]
+    if isinstance(parsed, dict):
+        for inner in parsed.values():
+            if isinstance(inner, list) and len(inner) == 1:
+                inner = inner[0]
+            if isinstance(inner, dict):
+                candidates.append(inner)
+
+    error = None
+    for candidate in candidates:
+        try:
+            return schema.model_validate(candidate).model_dump(mode="json", exclude_unset=True)
+        except ValidationError as e:
+            error = error or e
+
+    llm_stats["schema_failures"] += 1
+    first = error.errors()[0] if error is not None and error.errors() else {}
+    where = ".".join(str(part) for part in first.get("loc", ()))
+    raise Exception(f"{label} reply does not match {schema.__name__}: {where} {first.get('msg', '')}".strip())
+
+
+async def _generate_json(provider: str, system_prompt: str, user_prompt: str, on_item=None, schema=None,
+                         timing: dict = None):
+    """
+    Ask one provider for JSON and parse it.
+    With a `schema`, JSON mode is requested and the reply is validated
+    locally; without one, a single repair request is made if the first
+    reply is malformed.
+    """
+    label = PROVIDER_LABELS[provider]
+    json_mode = schema is not None
+
+    parser = await _read_json(provider, system_prompt + "\n" + user_prompt, on_item, json_mode, timing)
+    _record_reply(provider, schema, json_mode, parser)
+    text = parser.raw_text
+    logger.debug("LLM raw preview (%s): %s", label, (text or '')[:2000])
+
+    # Check for truncation
+    if parser.truncated:
+        logger.warning("%s output appears truncated (may be incomplete)", label)
+
+    try:
+        parsed = parser.result()
+        if schema is not None:
+            parsed = _validate_output(schema, parsed, label)
+        logger.info("%s success", label)
+        return parsed
+    except json.JSONDecodeError as e:
+        llm_stats["json_failures"] += 1
+        logger.warning("%s returned malformed JSON: %s", label, e)
+        if schema is not None:
+            # no blind repair round-trip: let the next provider answer instead
+            raise Exception(f"{label} returned malformed JSON: {e}")
+
+    # One-time repair attempt: ask the model to correct its previous output
+    llm_stats["repair_calls"] += 1
+    repair_prompt = system_prompt + "\n" + user_prompt + "\n\nYour previous reply was not valid JSON. Here is the exact text you returned:\n" + (text or '') + "\n\nPlease return ONLY the corrected JSON object matching the expected format. No explanations."
+
+    parser2 = await _read_json(provider, repair_prompt, timing=timing)
+    _record_reply(provider, schema, json_mode, parser2, repair=True)
+    logger.debug("LLM raw preview (%s retry): %s", label, (parser2.raw_text or '')[:2000])
+
+    # Check for truncation in retry
+    if parser2.truncated:
+        logger.warning("%s retry output also appears truncated", label)
+
+    parsed2 = parser2.result()
+    logger.info("%s repair success", label)
+    return parsed2
+
+
+def llm_output_stats() -> dict:
+    stats = dict(llm_stats)
+    replies = stats["provider_replies"]
+    stats["repair_rate"] = round(stats["repair_calls"] / replies, 4) if replies else 0.0
+    return stats
+
+
+# =====================================================
+
+async def call_llm(system_prompt: str, payload: dict, on_item=None, schema=None):
+    """
+    Route one prompt + payload to the LLM providers and return parsed JSON.
+    Concurrent calls with the same prompt and payload are coalesced.
+
+    `schema` (a pydantic model from models/schemas.py) switches providers to
+    JSON mode and validates the reply locally; a reply that does not match
+    falls through to the next provider instead of a repair round-trip.
+
+    `on_item(path, obj)` (optional, async) streams the provider reply and
+    receives each semester / course / phase / milestone as soon as it is
+    complete, e.g. path ("semesters", 0). Such calls are not coalesced.
+    """
+    if on_item is not None:
+        return await _call_llm(system_prompt, payload, on_item, schema)
+    # the shared call runs at the first caller's priority and deadline: only
+    # coalesce callers of the same class whose deadlines are close
+    flight_key = canonical_json([system_prompt, payload, sharing_key()])
+    shared = llm_flight.do(
+        flight_key, lambda: _call_llm(system_prompt, payload, None, schema), request_deadline()
+    )
+    return await within_deadline(shared, "LLM call")
+
+
+async def _call_llm(system_prompt: str, payload: dict, on_item=None, schema=None):
 
     user_prompt = f"""
 Input Data:
@@ -192,162 +469,158 @@ No explanations.
 No markdown.
 """
 
-    full_prompt = system_prompt + "\n" + user_prompt
-
-    global gemini_quota_exhausted
+    providers = _provider_order()
+    remaining = remaining_time()
 
     # =================================================
-    # 1️⃣ TRY GEMINI FIRST — SKIP IF QUOTA EXHAUSTED
+    # 0️⃣ RESPONSE CACHE — same prompt + payload answered recently
     # =================================================
-    if not gemini_quota_exhausted and gemini_client is not None:
-        try:
-            logger.info("Using Gemini provider: Gemini")
-
-            response = gemini_client.models.generate_content(
-                model="gemini-2.5-flash-lite",
-                contents=[{
-                    "role": "user",
-                    "parts": [{"text": full_prompt}]
-                }],
-            )
-
-            text = response.text
-            logger.debug("LLM raw preview (Gemini): %s", (text or '')[:2000])
-            cleaned = extract_json(text)
-            logger.debug("Extracted JSON preview (Gemini): %s", (cleaned or '')[:2000])
-            
-            # Check for truncation
-            if detect_truncation(cleaned):
-                logger.warning("Gemini output appears truncated (may be incomplete)")
-
-                try:
-                    parsed = json.loads(cleaned)
-                    logger.info("Gemini success")
-                    return parsed
-                except json.JSONDecodeError as e:
-                    logger.warning("Gemini returned malformed JSON: %s", e)
-                # One-time repair attempt: ask the model to correct its previous output
-                repair_prompt = system_prompt + "\n" + user_prompt + "\n\nYour previous reply was not valid JSON. Here is the exact text you returned:\n" + (text or '') + "\n\nPlease return ONLY the corrected JSON object matching the expected format. No explanations."
-
-                try:
-                    repair_resp = gemini_client.models.generate_content(
-                        model="gemini-2.5-flash-lite",
-                        contents=[{
-                            "role": "user",
-                            "parts": [{"text": repair_prompt}]
-                        }],
-                    )
-                    text2 = repair_resp.text
-                    logger.debug("LLM raw preview (Gemini retry): %s", (text2 or '')[:2000])
-                    cleaned2 = extract_json(text2)
-                    logger.debug("Extracted JSON preview (Gemini retry): %s", (cleaned2 or '')[:2000])
-                    
-                    # Check for truncation in retry
-                    if detect_truncation(cleaned2):
-                        logger.warning("Gemini retry output also appears truncated")
-                    
-                    parsed2 = json.loads(cleaned2)
-                    logger.info("Gemini repair success")
-                    return parsed2
-                except Exception:
-                    logger.warning("Gemini repair failed; falling back to Groq")
-                    # fall through to Groq fallback
-                    pass
+    cache_keys = {}
+    if LLM_CACHE_ENABLED:
+        cache_keys = {
+            provider: make_cache_key(provider, PROVIDER_MODELS[provider], system_prompt, payload)
+            for provider in providers
+        }
+        cached = llm_cache.get_first([cache_keys[p] for p in providers])
+        if cached is not None:
+            logger.info("LLM cache hit")
+            if on_item is not None:
+                for path, item in parse_items(cached):
+                    await on_item(path, item)
+            return cached
+
+    if remaining is None:
+        return await _call_providers(providers, cache_keys, system_prompt, user_prompt, on_item, schema)
+
+    # the request deadline bounds every provider attempt: calls still
+    # running when it passes are cancelled rather than awaited
+    if remaining <= 0:
+        raise DeadlineExceeded("Request deadline passed before the LLM call")
+    try:
+        return await asyncio.wait_for(
+            _call_providers(providers, cache_keys, system_prompt, user_prompt, on_item, schema), remaining
+        )
+    except asyncio.TimeoutError:
+        logger.warning("LLM call cancelled at the request deadline (%.1fs budget)", remaining)
+        raise DeadlineExceeded(f"LLM call did not finish within the remaining {remaining:.1f}s")
 
-        except Exception as e:
-            error_text = str(e)
-            logger.error("Gemini failed: %s", error_text)
 
-            # If quota exhausted → mark circuit breaker and go to Groq
-            if "RESOURCE_EXHAUSTED" in error_text:
-                logger.warning("Gemini quota hit — switching to Groq-only mode...")
-                gemini_quota_exhausted = True
-    else:
-        logger.info("Gemini quota exhausted or unavailable — skipping to Groq")
+async def _call_providers(providers, cache_keys, system_prompt, user_prompt, on_item=None, schema=None):
 
     # =================================================
-    # 2️⃣ FALLBACK → GROQ PROVIDER
+    # 1️⃣ HEALTHIEST PROVIDER FIRST → 2️⃣ FALLBACK
     # =================================================
-    try:
-        logger.info("Using Groq provider")
+    llm_hedging.note_request()
+    # two streams cannot feed one on_item, so streamed calls are never hedged
+    hedge = llm_hedging.enabled and on_item is None
+    args = (system_prompt, user_prompt, on_item, schema)
+
+    last_error = None
+    tried = set()
+    for attempt, provider in enumerate(providers):
+        if provider in tried:
+            continue
+        label = PROVIDER_LABELS[provider]
+        health = provider_health.get(provider)
+        # with every circuit open, the last provider is still tried rather than failing outright
+        is_last_resort = attempt == len(providers) - 1 and not tried
+        if not health.allow_request() and not is_last_resort:
+            logger.info("%s circuit is %s — skipping", label, health.state)
+            last_error = last_error or Exception(f"{label} circuit is {health.state}")
+            continue
 
-        headers = {
-            "Authorization": f"Bearer {GROQ_API_KEY}",
-            "Content-Type": "application/json"
-        }
+        tried.add(provider)
+        try:
+            if hedge:
+                provider, parsed, latency = await _hedged_attempt(provider, providers[attempt + 1:], tried, *args)
+            else:
+                provider, parsed, latency = await _attempt(provider, *args)
+        except Exception as e:
+            last_error = e
+            continue
 
-        groq_payload = {
-            "model": "llama-3.3-70b-versatile",
-            "messages": [
-                {
-                    "role": "user",
-                    "content": full_prompt
-                }
-            ],
-            "temperature": 0.3,
-            "max_tokens": 8000
-        }
+        if cache_keys:
+            llm_cache.set(cache_keys[provider], parsed, latency=latency)
+        return parsed
 
-        response = requests.post(GROQ_URL, headers=headers, json=groq_payload)
+    logger.error("All LLM providers failed: %s", repr(last_error))
+    raise Exception(f"All LLM providers failed → {repr(last_error)}")
 
-        if response.status_code != 200:
-            logger.warning("Groq Raw Response: %s", response.text)
-            raise Exception(f"Groq HTTP Error: {response.status_code}")
 
-        result = response.json()
+async def _attempt(provider: str, system_prompt: str, user_prompt: str, on_item=None, schema=None):
+    """One provider call; its outcome is recorded in the provider's health."""
+    label = PROVIDER_LABELS[provider]
+    health = provider_health.get(provider)
+    # provider response time only: queueing in llm_scheduler is not the provider's latency
+    timing = {"seconds": 0.0}
+    try:
+        logger.info("Using %s provider", label)
+        parsed = await _generate_json(provider, system_prompt, user_prompt, on_item, schema, timing)
+    except (asyncio.CancelledError, SchedulerBusy):
+        # no answer from the provider: nothing to hold against its health
+        health.release()
+        raise
+    except Exception as e:
+        error_text = str(e)
+        logger.error("%s failed: %s", label, error_text)
 
-        # ===== SAFE PARSING =====
-        if isinstance(result, dict):
-            # Groq returns standard OpenAI format
-            if "error" in result:
-                raise Exception(f"Groq Error: {result['error']}")
-            elif "choices" in result and len(result["choices"]) > 0:
-                text = result["choices"][0].get("message", {}).get("content", "")
-            else:
-                raise Exception(f"Unexpected Groq response: {result}")
-        else:
-            raise Exception("Invalid Groq response format")
+        # Quota errors open the circuit straight away; a probe retries after the cooldown
+        quota = "RESOURCE_EXHAUSTED" in error_text or error_text.startswith("Groq HTTP Error: 429")
+        if quota:
+            logger.warning("%s quota hit — routing around it until the cooldown ends", label)
+        health.record_failure(e, quota=quota)
+        raise
 
-        logger.debug("LLM raw preview (Groq): %s", (text or '')[:2000])
-        cleaned = extract_json(text)
-        logger.debug("Extracted JSON preview (Groq): %s", (cleaned or '')[:2000])
-        
-        # Check for truncation
-        if detect_truncation(cleaned):
-            logger.warning("Groq output appears truncated (may be incomplete)")
+    latency = timing["seconds"]
+    health.record_success(latency)
+    return provider, parsed, latency
 
-        try:
-            parsed = json.loads(cleaned)
-            logger.info("Groq success")
-            return parsed
-        except json.JSONDecodeError as e:
-            logger.warning("Groq returned malformed JSON: %s", e)
-            # One-time repair attempt via Groq
-            repair_payload = groq_payload.copy()
-            repair_payload["messages"] = [
-                {"role": "user", "content": system_prompt + "\n" + user_prompt + "\n\nPrevious output:\n" + (text or '') + "\n\nReturn ONLY corrected JSON."}
-            ]
-
-            try:
-                repair_resp = requests.post(GROQ_URL, headers=headers, json=repair_payload)
-                if repair_resp.status_code == 200:
-                    repair_result = repair_resp.json()
-                    text2 = repair_result.get("choices", [])[0].get("message", {}).get("content", "")
-                    logger.debug("LLM raw preview (Groq retry): %s", (text2 or '')[:2000])
-                    cleaned2 = extract_json(text2)
-                    logger.debug("Extracted JSON preview (Groq retry): %s", (cleaned2 or '')[:2000])
-                    
-                    # Check for truncation in retry
-                    if detect_truncation(cleaned2):
-                        logger.warning("Groq retry output also appears truncated")
-                    
-                    parsed2 = json.loads(cleaned2)
-                    logger.info("Groq repair success")
-                    return parsed2
-            except Exception:
-                logger.error("Groq repair failed")
-                raise
 
-    except Exception as e:
-        logger.exception("All LLM providers failed: %s", repr(e))
-        raise Exception(f"All LLM providers failed → {repr(e)}")
+async def _hedged_attempt(primary: str, backups, tried: set, *args):
+    """
+    Call `primary`; if it is still running after its hedge delay, also call
+    the first healthy backup that has hedge budget left. The first valid
+    reply wins and the other call is cancelled.
+    """
+    primary_task = asyncio.ensure_future(_attempt(primary, *args))
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=llm_hedging.delay(provider_health.get(primary)))
+    except asyncio.CancelledError:
+        primary_task.cancel()
+        raise
+    if done:
+        return primary_task.result()
+
+    secondary = None
+    for provider in backups:
+        health = provider_health.get(provider)
+        # hedges go to fully healthy providers only; half-open probes stay with real fallbacks
+        if provider not in tried and health.state == CLOSED and llm_hedging.try_acquire(provider):
+            health.allow_request()
+            secondary = provider
+            break
+    if secondary is None:
+        return await primary_task
+
+    logger.info("%s slow — hedging with %s", PROVIDER_LABELS[primary], PROVIDER_LABELS[secondary])
+    tried.add(secondary)
+    secondary_task = asyncio.ensure_future(_attempt(secondary, *args))
+    pending = {primary_task, secondary_task}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winner = None
+            for task in done:
+                if task.exception() is None:
+                    winner = winner or task
+                else:
+                    error = task.exception()
+            if winner is not None:
+                llm_hedging.record_outcome(secondary, hedge_won=winner is secondary_task)
+                return winner.result()
+        llm_hedging.record_outcome(secondary, hedge_won=False)
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,446 @@
+"""
+LLM Scheduler — per-provider pacing in front of every provider request
+Each provider gets token buckets for requests/minute and tokens/minute and
+a cap on concurrent requests. A request that does not fit right now waits in
+the provider's queue (up to LLM_SCHEDULER_MAX_WAIT_SECONDS) instead of being
+sent and answered with a 429.
+
+When a provider still rate-limits us, its Retry-After (header or the delay
+in the error text) blocks the whole provider for that long; without one the
+wait is exponential backoff with full jitter. The request then retries, up
+to LLM_RATE_LIMIT_RETRIES times, before the error reaches call_llm (which
+opens the provider's circuit and falls back).
+
+Limits of 0 mean "no limit". Groq's x-ratelimit-remaining-* headers also
+pause a provider whose remaining allowance hits zero until its reset.
+
+Queued requests are ordered by weighted fair queueing over the priority
+classes of services/request_context.py: each class gets provider capacity
+in proportion to its weight, measured in reserved tokens, so small
+interactive edits overtake long generations instead of queueing behind
+them. A few concurrency slots are held back for the interactive class while
+interactive requests are queued; otherwise every class may use them.
+Within a class the earliest request deadline goes first, and a request whose
+deadline passes while queued gives up instead of being sent too late.
+"""
+
+import os
+import re
+import time
+import random
+import asyncio
+from collections import deque
+
+from services.logger import get_logger
+from services.request_context import (
+    request_priority, request_deadline, PRIORITY_CLASSES, INTERACTIVE,
+)
+
+logger = get_logger("llm_scheduler")
+
+# ================= CONFIG =================
+
+
+def _limit(provider: str, name: str, default: str) -> float:
+    """LLM_<PROVIDER>_<NAME>, falling back to LLM_<NAME>."""
+    return float(os.getenv(f"LLM_{provider.upper()}_{name}", os.getenv(f"LLM_{name}", default)))
+
+
+LLM_SCHEDULER_ENABLED = os.getenv("LLM_SCHEDULER_ENABLED", "true").lower() in ("1", "true", "yes")
+LLM_SCHEDULER_MAX_WAIT_SECONDS = float(os.getenv("LLM_SCHEDULER_MAX_WAIT_SECONDS", "30"))
+LLM_RATE_LIMIT_RETRIES = int(os.getenv("LLM_RATE_LIMIT_RETRIES", "2"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "1"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "20"))
+# reply size assumed when reserving tokens/minute, settled with the real size afterwards
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1500"))
+SCHEDULER_METRICS_WINDOW = 500
+
+
+def _weights(spec: str) -> dict:
+    weights = {name: 1.0 for name in PRIORITY_CLASSES}
+    for part in spec.split(","):
+        name, _, value = part.partition("=")
+        if name.strip() in weights and value.strip():
+            weights[name.strip()] = max(0.01, float(value))
+    return weights
+
+
+# share of provider capacity each class gets while several are queued
+LLM_PRIORITY_WEIGHTS = _weights(os.getenv(
+    "LLM_PRIORITY_WEIGHTS", "interactive=8,generate=4,validation=2,background=1"
+))
+# concurrency slots other classes may not take while interactive requests are queued
+LLM_INTERACTIVE_RESERVED_SLOTS = int(os.getenv("LLM_INTERACTIVE_RESERVED_SLOTS", "2"))
+
+# ==========================================
+
+_RETRY_IN_TEXT = re.compile(r"retry(?:[ _-]?(?:delay|after|in))?['\"]?\s*[:=]?\s*['\"]?(\d+(?:\.\d+)?)\s*s", re.I)
+
+
+class RateLimitError(Exception):
+    """A provider answered 429 / RESOURCE_EXHAUSTED; `retry_after` in seconds if it said."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SchedulerBusy(Exception):
+    """The request could not be admitted within LLM_SCHEDULER_MAX_WAIT_SECONDS."""
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After / x-ratelimit-reset value ('7', '7.5s', '1m30s', '250ms')."""
+    if value is None:
+        return None
+    text = str(value).strip().lower()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    total, matched = 0.0, False
+    for amount, unit in re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", text):
+        matched = True
+        total += float(amount) * {"ms": 0.001, "s": 1, "m": 60, "h": 3600}[unit]
+    return total if matched else None
+
+
+def rate_limit_of(error: Exception):
+    """A RateLimitError for provider errors that mean 'slow down', else None."""
+    if isinstance(error, RateLimitError):
+        return error
+    text = str(error)
+    if "RESOURCE_EXHAUSTED" in text or getattr(error, "code", None) == 429:
+        match = _RETRY_IN_TEXT.search(text)
+        return RateLimitError(text, float(match.group(1)) if match else None)
+    return None
+
+
+class TokenBucket:
+    """`capacity` tokens refilled continuously over one minute; capacity 0 = unlimited."""
+
+    def __init__(self, per_minute: float, clock=time.monotonic):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self._clock = clock
+        self.tokens = per_minute
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (requests larger than
+        the bucket only wait for it to be full)."""
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float):
+        if self.capacity:
+            self._refill()
+            self.tokens -= amount
+
+    def refund(self, amount: float):
+        """Return (or, when negative, charge) tokens after the real cost is known."""
+        if self.capacity:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def utilisation(self) -> float:
+        if not self.capacity:
+            return 0.0
+        self._refill()
+        return round(max(0.0, 1 - self.tokens / self.capacity), 3)
+
+
+class _Waiter:
+
+    def __init__(self, tokens: int, future, priority: str, deadline):
+        self.tokens = tokens
+        self.future = future
+        self.priority = priority
+        self.deadline = deadline
+        self.enqueued_at = time.monotonic()
+
+    def order(self):
+        # earliest deadline first within a class, then arrival order
+        return (self.deadline if self.deadline is not None else float("inf"), self.enqueued_at)
+
+
+class ProviderScheduler:
+
+    def __init__(self, name: str, rpm: float = 0, tpm: float = 0, max_concurrency: int = 0,
+                 clock=time.monotonic):
+        self.name = name
+        self._clock = clock
+        self.requests = TokenBucket(rpm, clock)
+        self.tokens = TokenBucket(tpm, clock)
+        self.max_concurrency = int(max_concurrency)
+        self.in_flight = 0
+        self._queues = {name: [] for name in PRIORITY_CLASSES}
+        # weighted fair queueing: per-class finish tags and the system virtual time
+        self._finish = {name: 0.0 for name in PRIORITY_CLASSES}
+        self._virtual = 0.0
+        self._timer = None
+        self._blocked_until = 0.0
+        self._waits = {name: deque(maxlen=SCHEDULER_METRICS_WINDOW) for name in PRIORITY_CLASSES}
+        self.admitted = 0
+        self.queued = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.busy_rejections = 0
+        self.deadline_expired = 0
+
+    # =================================================
+    # ADMISSION
+    # =================================================
+    def _slot_limit(self, priority: str) -> int:
+        if priority == INTERACTIVE or not self._interactive_waiting():
+            # nothing interactive is queued: the reserved slots are lent out
+            return self.max_concurrency
+        return max(1, self.max_concurrency - LLM_INTERACTIVE_RESERVED_SLOTS)
+
+    def _interactive_waiting(self) -> bool:
+        return any(not waiter.future.done() for waiter in self._queues[INTERACTIVE])
+
+    def _admit_wait(self, tokens: int, priority: str):
+        """None while the class's concurrency limit is reached, else seconds until admissible."""
+        if self.max_concurrency and self.in_flight >= self._slot_limit(priority):
+            return None
+        return max(
+            self._blocked_until - self._clock(),
+            self.requests.wait_time(1),
+            self.tokens.wait_time(tokens),
+            0.0,
+        )
+
+    def _admit(self, tokens: int, priority: str, waited: float = 0.0):
+        self.in_flight += 1
+        self.admitted += 1
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self._waits[priority].append(waited)
+
+    def _has_waiters(self) -> bool:
+        return any(self._queues.values())
+
+    async def acquire(self, tokens: int):
+        """
+        Wait until one request of ~`tokens` tokens may be sent, in weighted
+        fair order across priority classes (taken from the request context).
+        """
+        priority = request_priority()
+        deadline = request_deadline()
+        if not self._has_waiters() and self._admit_wait(tokens, priority) == 0.0:
+            self._admit(tokens, priority)
+            return
+
+        timeout = LLM_SCHEDULER_MAX_WAIT_SECONDS
+        if deadline is not None:
+            timeout = min(timeout, max(0.0, deadline - time.monotonic()))
+        waiter = _Waiter(tokens, asyncio.get_running_loop().create_future(), priority, deadline)
+        self._queues[priority].append(waiter)
+        self._queues[priority].sort(key=_Waiter.order)
+        self.queued += 1
+        self._dispatch()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # admitted just as we gave up: hand the slot back
+                self.release(tokens)
+            else:
+                waiter.future.cancel()
+                self._remove(waiter)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            if timeout < LLM_SCHEDULER_MAX_WAIT_SECONDS:
+                self.deadline_expired += 1
+                raise SchedulerBusy(f"{self.name} scheduler: request deadline passed while queued")
+            self.busy_rejections += 1
+            raise SchedulerBusy(
+                f"{self.name} scheduler: not admitted within {LLM_SCHEDULER_MAX_WAIT_SECONDS:.0f}s"
+            )
+
+    def _remove(self, waiter: _Waiter):
+        try:
+            self._queues[waiter.priority].remove(waiter)
+        except ValueError:
+            pass
+        self._dispatch()
+
+    def _candidates(self):
+        """(finish tag, class, head waiter) per non-empty class, best first."""
+        candidates = []
+        for priority, queue in self._queues.items():
+            while queue and queue[0].future.done():
+                queue.pop(0)
+            if queue:
+                head = queue[0]
+                start = max(self._virtual, self._finish[priority])
+                tag = start + head.tokens / LLM_PRIORITY_WEIGHTS[priority]
+                candidates.append((tag, priority, head))
+        candidates.sort(key=lambda c: c[0])
+        return candidates
+
+    def _dispatch(self):
+        """Admit queued requests in fair order while they fit; otherwise set a wake-up timer."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while True:
+            admitted = False
+            for tag, priority, waiter in self._candidates():
+                wait = self._admit_wait(waiter.tokens, priority)
+                if wait is None:
+                    continue  # this class is at its slot limit; a reserved slot may still fit another
+                if wait > 0:
+                    self._timer = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                    return
+                self._queues[priority].pop(0)
+                self._finish[priority] = tag
+                self._virtual = tag
+                self._admit(waiter.tokens, priority, time.monotonic() - waiter.enqueued_at)
+                waiter.future.set_result(None)
+                admitted = True
+                break
+            if not admitted:
+                return  # empty, or every class at its limit: release() dispatches again
+
+    def release(self, reserved: int, used: int = None):
+        """One admitted request finished; settle its token reservation with the real usage."""
+        self.in_flight = max(0, self.in_flight - 1)
+        if used is not None:
+            self.tokens.refund(reserved - used)
+        self._dispatch()
+
+    # =================================================
+    # PROVIDER FEEDBACK
+    # =================================================
+    def note_rate_limited(self, retry_after, attempt: int) -> float:
+        """Block the provider after a 429; returns the delay chosen."""
+        self.rate_limited += 1
+        if retry_after is not None:
+            # a little jitter so queued callers don't all return on the same tick
+            delay = retry_after * random.uniform(1.0, 1.1)
+        else:
+            delay = random.uniform(0, min(LLM_BACKOFF_MAX_SECONDS, LLM_BACKOFF_BASE_SECONDS * 2 ** attempt))
+        self.block_for(delay)
+        return delay
+
+    def block_for(self, seconds: float):
+        self._blocked_until = max(self._blocked_until, self._clock() + seconds)
+
+    def observe_headers(self, headers):
+        """Pause until reset when the provider says a per-minute allowance is used up."""
+        for kind in ("requests", "tokens"):
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            reset = parse_retry_after(headers.get(f"x-ratelimit-reset-{kind}"))
+            try:
+                if remaining is not None and reset and float(remaining) <= 0:
+                    self.block_for(reset)
+            except ValueError:
+                pass
+
+    # =================================================
+    # INSPECTION
+    # =================================================
+    def stats(self) -> dict:
+        classes = {}
+        for priority in PRIORITY_CLASSES:
+            waits = sorted(self._waits[priority])
+            classes[priority] = {
+                "weight": LLM_PRIORITY_WEIGHTS[priority],
+                "queued": len(self._queues[priority]),
+                "admitted": len(waits),
+                "wait_p50": round(waits[len(waits) // 2], 3) if waits else None,
+                "wait_p95": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else None,
+            }
+        return {
+            "max_concurrency": self.max_concurrency or None,
+            "in_flight": self.in_flight,
+            "queued": sum(len(q) for q in self._queues.values()),
+            "rpm_limit": self.requests.capacity or None,
+            "tpm_limit": self.tokens.capacity or None,
+            "utilisation": {
+                "concurrency": round(self.in_flight / self.max_concurrency, 3) if self.max_concurrency else None,
+                "rpm": self.requests.utilisation(),
+                "tpm": self.tokens.utilisation(),
+            },
+            "blocked_for_seconds": round(max(0.0, self._blocked_until - self._clock()), 2),
+            "admitted": self.admitted,
+            "queued_total": self.queued,
+            "rate_limited": self.rate_limited,
+            "retries": self.retries,
+            "busy_rejections": self.busy_rejections,
+            "deadline_expired": self.deadline_expired,
+            "classes": classes,
+        }
+
+
+class LLMScheduler:
+
+    def __init__(self, enabled: bool = LLM_SCHEDULER_ENABLED):
+        self.enabled = enabled
+        self._providers = {}
+
+    def get(self, provider: str) -> ProviderScheduler:
+        scheduler = self._providers.get(provider)
+        if scheduler is None:
+            scheduler = self._providers[provider] = ProviderScheduler(
+                provider,
+                rpm=_limit(provider, "RPM", "0"),
+                tpm=_limit(provider, "TPM", "0"),
+                max_concurrency=int(_limit(provider, "MAX_CONCURRENCY", "16")),
+            )
+        return scheduler
+
+    async def run(self, provider: str, prompt: str, call):
+        """
+        Send one provider request through the provider's queue. `call()` does
+        the request and returns (result, reply_text); rate-limit errors are
+        retried after the provider's Retry-After or a jittered backoff.
+        """
+        if not self.enabled:
+            return (await call())[0]
+
+        scheduler = self.get(provider)
+        reserved = estimate_tokens(prompt) + LLM_EXPECTED_OUTPUT_TOKENS
+        for attempt in range(LLM_RATE_LIMIT_RETRIES + 1):
+            await scheduler.acquire(reserved)
+            try:
+                result, reply = await call()
+            except BaseException as e:
+                # a rejected request still counted against the provider's allowance
+                scheduler.release(reserved)
+                limited = rate_limit_of(e) if isinstance(e, Exception) else None
+                if limited is None:
+                    raise
+                delay = scheduler.note_rate_limited(limited.retry_after, attempt)
+                if attempt == LLM_RATE_LIMIT_RETRIES or delay > LLM_SCHEDULER_MAX_WAIT_SECONDS:
+                    raise
+                scheduler.retries += 1
+                logger.warning("%s rate-limited — retrying in %.1fs", provider, delay)
+                continue
+            scheduler.release(reserved, estimate_tokens(prompt) + estimate_tokens(reply))
+            return result
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "max_wait_seconds": LLM_SCHEDULER_MAX_WAIT_SECONDS,
+            "interactive_reserved_slots": LLM_INTERACTIVE_RESERVED_SLOTS,
+            "providers": {name: s.stats() for name, s in self._providers.items()},
+        }
+
+
+llm_scheduler = LLMScheduler()
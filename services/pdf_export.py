@@ -0,0 +1,218 @@
+"""
+PDF Export Engine — renders off the event loop, streams from disk
+ReportLab builds are CPU-bound: they run in a small process pool (or a
+thread where processes are unavailable, e.g. on serverless runtimes) so an
+export no longer stalls every other request on the worker.
+The renderer writes straight to a spool file in a per-process temp
+directory; responses stream that file in PDF_STREAM_CHUNK_BYTES chunks, so
+the API process never holds a whole PDF in memory. The spool files double
+as the cache: keyed by a content hash of the formatted curriculum, bounded
+by count and bytes on disk, and concurrent exports of the same plan share
+one render. The footer timestamp is not part of the key: a cached PDF
+keeps the time of its first render.
+"""
+
+import os
+import time
+import uuid
+import shutil
+import asyncio
+import hashlib
+import tempfile
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from services.llm_cache import canonical_json
+from services.pdf_generator import write_pdf_file, pdf_styles
+from services.provider_health import _percentile
+from services.single_flight import SingleFlight
+from services.logger import get_logger
+
+logger = get_logger("pdf_export")
+
+# ================= CONFIG =================
+
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "2"))  # 0 = render in a thread
+PDF_POOL_MAX_FAILURES = 3  # broken pools before falling back to threads for good
+PDF_CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "256"))
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))  # on disk
+PDF_SPOOL_DIR = os.getenv("PDF_SPOOL_DIR", tempfile.gettempdir())
+# the most of one PDF a download holds in memory at a time
+PDF_STREAM_CHUNK_BYTES = int(os.getenv("PDF_STREAM_CHUNK_BYTES", str(64 * 1024)))
+
+# ==========================================
+
+
+def pdf_cache_key(curriculum: dict) -> str:
+    return hashlib.sha256(canonical_json(curriculum).encode("utf-8")).hexdigest()
+
+
+def _warm_worker():
+    # import ReportLab and build the styles before the first job arrives
+    pdf_styles()
+
+
+def iter_file(handle, chunk_size: int = PDF_STREAM_CHUNK_BYTES):
+    """Yield an open binary file in chunks, closing it at the end (or on disconnect)."""
+    try:
+        while chunk := handle.read(chunk_size):
+            yield chunk
+    finally:
+        handle.close()
+
+
+class PdfExporter:
+
+    def __init__(self, workers: int = PDF_WORKERS, max_entries: int = PDF_CACHE_MAX_ENTRIES,
+                 max_bytes: int = PDF_CACHE_MAX_BYTES, spool_dir: str = PDF_SPOOL_DIR):
+        self.workers = workers
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.spool_dir = spool_dir
+        self._dir = None
+        self._pool = None
+        self._cache = OrderedDict()   # key -> size of <dir>/<key>.pdf
+        self._bytes = 0
+        # a render already in a worker cannot be stopped; let it fill the cache
+        self.flight = SingleFlight("pdf_export", finish_abandoned=True)
+        self.renders = 0
+        self.cache_hits = 0
+        self.evictions = 0
+        self.pool_failures = 0
+        self.render_seconds = deque(maxlen=512)
+
+    # ---------------- rendering ----------------
+
+    def _executor(self):
+        """The process pool, created on first use; None means the default thread pool."""
+        if self._pool is None and self.workers > 0:
+            try:
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_warm_worker,
+                )
+            except (OSError, ImportError, NotImplementedError) as e:
+                # no working multiprocessing (e.g. no /dev/shm on serverless runtimes)
+                logger.warning("PDF process pool unavailable (%s) — rendering in threads", e)
+                self.workers = 0
+        return self._pool
+
+    def _path(self, key: str) -> str:
+        if self._dir is None:
+            # one directory per process: workers of one server never share files
+            os.makedirs(self.spool_dir, exist_ok=True)
+            self._dir = tempfile.mkdtemp(prefix="curricuforge_pdf_", dir=self.spool_dir)
+        return os.path.join(self._dir, f"{key}.pdf")
+
+    async def open(self, curriculum: dict):
+        """
+        (binary file, size) of the PDF for a formatted curriculum, rendered
+        now or taken from the cache. The caller closes the file — iter_file does.
+        """
+        key = pdf_cache_key(curriculum)
+        for _ in range(2):
+            if key in self._cache:
+                self.cache_hits += 1
+                self._cache.move_to_end(key)
+            else:
+                await self.flight.do(key, lambda: self._render(key, curriculum))
+            try:
+                # an open handle keeps the file readable even if it is evicted now
+                handle = open(self._path(key), "rb")
+            except FileNotFoundError:
+                # evicted between the render and this open — render again
+                self._forget(key)
+                continue
+            return handle, os.fstat(handle.fileno()).st_size
+        raise Exception("PDF was evicted before it could be sent")
+
+    async def render(self, curriculum: dict) -> bytes:
+        """The whole PDF as bytes, for callers that need it in memory."""
+        handle, _ = await self.open(curriculum)
+        with handle:
+            return handle.read()
+
+    async def _render(self, key: str, curriculum: dict):
+        loop = asyncio.get_running_loop()
+        path = self._path(key)
+        partial = f"{path}.{uuid.uuid4().hex}.part"
+        started = time.perf_counter()
+        try:
+            try:
+                size = await loop.run_in_executor(self._executor(), write_pdf_file, curriculum, partial)
+            except BrokenProcessPool as e:
+                # a worker died (OOM-killed, or could not start): render this one in a
+                # thread and start a fresh pool next time — or stop trying after a few
+                self._pool = None
+                self.pool_failures += 1
+                if self.pool_failures >= PDF_POOL_MAX_FAILURES:
+                    self.workers = 0
+                logger.warning("PDF worker pool broke (%s) — rendering in a thread", e)
+                size = await loop.run_in_executor(None, write_pdf_file, curriculum, partial)
+            os.replace(partial, path)
+        finally:
+            if os.path.exists(partial):
+                os.unlink(partial)
+        self.render_seconds.append(time.perf_counter() - started)
+        self.renders += 1
+        self._set(key, size)
+
+    # ---------------- cache ----------------
+
+    def _set(self, key: str, size: int):
+        self._forget(key, unlink=False)
+        self._cache[key] = size
+        self._bytes += size
+        while len(self._cache) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._cache))
+            if oldest == key:
+                break   # larger than the whole budget: kept until the next render evicts it
+            self._forget(oldest)
+            self.evictions += 1
+
+    def _forget(self, key: str, unlink: bool = True):
+        size = self._cache.pop(key, None)
+        if size is not None:
+            self._bytes -= size
+        if unlink and self._dir is not None:
+            try:
+                os.unlink(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        for key in list(self._cache):
+            self._forget(key)
+
+    # ---------------- lifecycle ----------------
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+            self._cache.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        seconds = [round(s, 3) for s in self.render_seconds]
+        return {
+            "workers": self.workers,
+            "mode": "process" if self.workers > 0 else "thread",
+            "renders": self.renders,
+            "cache_hits": self.cache_hits,
+            "coalesced": self.flight.coalesced,
+            "cached": len(self._cache),
+            "cached_bytes": self._bytes,
+            "evictions": self.evictions,
+            "pool_failures": self.pool_failures,
+            "render_seconds": {p: _percentile(seconds, n) for p, n in (("p50", 50), ("p95", 95), ("max", 100))},
+        }
+
+
+pdf_exporter = PdfExporter()
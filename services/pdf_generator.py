@@ -3,6 +3,8 @@ CurricuForge AI — Premium PDF Generator
 Supports Semester Mode + Persona Roadmap Mode
 """
 
+import os
+
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
@@ -16,6 +18,7 @@ from reportlab.platypus import (
 from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
 from io import BytesIO
 from datetime import datetime
+from functools import lru_cache
 from xml.sax.saxutils import escape
 
 
@@ -26,24 +29,13 @@ def safe(text):
     return escape(str(text))
 
 
-def generate_pdf_from_curriculum(curriculum: dict) -> bytes:
-    from services.logger import get_logger
-    logger = get_logger("pdf_generator")
-    logger.debug("PDF BUILDER V2 EXECUTED")
-
-    buffer = BytesIO()
-
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=letter,
-        topMargin=0.6 * inch,
-        bottomMargin=0.6 * inch,
-        leftMargin=0.7 * inch,
-        rightMargin=0.7 * inch,
-    )
-
-    elements = []
-
+@lru_cache(maxsize=1)
+def pdf_styles():
+    """
+    Title, heading, subheading, body and meta paragraph styles.
+    Built once per process — the sample stylesheet and ParagraphStyle
+    objects are the same for every document.
+    """
     styles = getSampleStyleSheet()
 
     # =======================
@@ -100,6 +92,33 @@ def generate_pdf_from_curriculum(curriculum: dict) -> bytes:
         spaceAfter=2,
     )
 
+    return title_style, heading_style, subheading_style, body_style, meta_style
+
+
+def generate_pdf_from_curriculum(curriculum: dict, output=None) -> bytes:
+    """
+    Render the curriculum as a PDF and return its bytes — or, with `output`
+    (a path or binary file), write it there and return None.
+    """
+    from services.logger import get_logger
+    logger = get_logger("pdf_generator")
+    logger.debug("PDF BUILDER V2 EXECUTED")
+
+    buffer = BytesIO() if output is None else None
+
+    doc = SimpleDocTemplate(
+        output if output is not None else buffer,
+        pagesize=letter,
+        topMargin=0.6 * inch,
+        bottomMargin=0.6 * inch,
+        leftMargin=0.7 * inch,
+        rightMargin=0.7 * inch,
+    )
+
+    elements = []
+
+    title_style, heading_style, subheading_style, body_style, meta_style = pdf_styles()
+
     # =======================
     # 🧠 TITLE + SUMMARY
     # =======================
@@ -320,5 +339,12 @@ def generate_pdf_from_curriculum(curriculum: dict) -> bytes:
 
     doc.build(elements)
 
-    buffer.seek(0)
+    if buffer is None:
+        return None
     return buffer.getvalue()
+
+
+def write_pdf_file(curriculum: dict, path: str) -> int:
+    """Render the curriculum into `path`; returns the file size."""
+    generate_pdf_from_curriculum(curriculum, path)
+    return os.path.getsize(path)
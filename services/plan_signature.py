@@ -0,0 +1,51 @@
+"""
+Plan Signature — proof that a plan left the formatter unchanged
+formatter_agent signs every plan it produces: an HMAC over the content hash
+of the plan, validation fields included. A plan posted back (e.g. to
+/export-pdf) whose signature still verifies was validated and formatted by
+this service as it stands, so the export renders it directly; any edit to
+its content or validation fields breaks the signature and it is validated
+again.
+"""
+
+import os
+import hmac
+import hashlib
+
+from services.llm_cache import canonical_json
+from services.logger import get_logger
+
+logger = get_logger("plan_signature")
+
+# ================= CONFIG =================
+
+# shared by every worker / instance that should accept each other's plans;
+# without it each process signs with its own random key
+PLAN_SIGNING_KEY = os.getenv("PLAN_SIGNING_KEY", "")
+
+# ==========================================
+
+SIGNATURE_FIELD = "validation_signature"
+# added around the plan after formatting; not part of what is signed
+UNSIGNED_FIELDS = (SIGNATURE_FIELD, "plan_id", "plan_version")
+
+_key = PLAN_SIGNING_KEY.encode("utf-8") or os.urandom(32)
+if not PLAN_SIGNING_KEY:
+    logger.info("PLAN_SIGNING_KEY not set — plan signatures are only valid in this process")
+
+
+def plan_content_hash(plan: dict) -> str:
+    signed = {k: v for k, v in plan.items() if k not in UNSIGNED_FIELDS}
+    return hashlib.sha256(canonical_json(signed).encode("utf-8")).hexdigest()
+
+
+def sign_plan(plan: dict) -> str:
+    return hmac.new(_key, plan_content_hash(plan).encode("ascii"), hashlib.sha256).hexdigest()
+
+
+def verify_plan(plan: dict) -> bool:
+    """True when the plan carries a signature matching its current content."""
+    signature = plan.get(SIGNATURE_FIELD) if isinstance(plan, dict) else None
+    if not isinstance(signature, str):
+        return False
+    return hmac.compare_digest(signature, sign_plan(plan))
@@ -0,0 +1,254 @@
+"""
+Plan Store — server-side, versioned storage of generated plans
+Every /generate run stores its final (validated + formatted) plan under a
+plan_id as version 1; every refinement adds the next version. Refine and
+export then take `plan_id` (+ optional `version`) instead of the whole
+curriculum, and reuse the stored validation and formatting.
+
+Memory backend (LRU, per worker) by default, or a SQLite file shared by all
+workers on the host (PLAN_STORE_BACKEND=sqlite).
+"""
+
+import os
+import json
+import time
+import secrets
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from services.logger import get_logger
+from services.sections import plan_sections, section_hash
+
+logger = get_logger("plan_store")
+
+# ================= CONFIG =================
+
+PLAN_STORE_BACKEND = os.getenv("PLAN_STORE_BACKEND", "memory").lower()  # memory | sqlite
+PLAN_STORE_PATH = os.getenv("PLAN_STORE_PATH", "/tmp/curricuforge_plans.sqlite3")
+PLAN_STORE_MAX_PLANS = int(os.getenv("PLAN_STORE_MAX_PLANS", "500"))
+
+# ==========================================
+
+
+class MemoryPlanBackend:
+    """plan_id -> [version record text, ...], least recently used plan evicted first."""
+
+    def __init__(self):
+        self._plans = OrderedDict()
+
+    def append(self, plan_id: str, record: str, new: bool = False):
+        """The new version number, or None if `plan_id` is unknown (e.g. evicted) and not `new`."""
+        if new:
+            self._plans[plan_id] = []
+        versions = self._plans.get(plan_id)
+        if versions is None:
+            return None
+        versions.append(record)
+        self._plans.move_to_end(plan_id)
+        return len(versions)
+
+    def get(self, plan_id: str, version: int = None):
+        """(version, record text) — the latest version by default — or None."""
+        versions = self._plans.get(plan_id)
+        if not versions:
+            return None
+        self._plans.move_to_end(plan_id)
+        if version is None:
+            version = len(versions)
+        return (version, versions[version - 1]) if 1 <= version <= len(versions) else None
+
+    def versions(self, plan_id: str):
+        return list(self._plans.get(plan_id) or [])
+
+    def evict_lru(self) -> bool:
+        if not self._plans:
+            return False
+        self._plans.popitem(last=False)
+        return True
+
+    def count(self) -> int:
+        return len(self._plans)
+
+
+class SQLitePlanBackend:
+    """Same interface on disk; plans.last_access drives LRU eviction."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS plans ("
+            " plan_id TEXT PRIMARY KEY, latest INTEGER NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS plan_versions ("
+            " plan_id TEXT NOT NULL, version INTEGER NOT NULL, record TEXT NOT NULL,"
+            " PRIMARY KEY (plan_id, version))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS plans_lru ON plans(last_access)")
+
+    def append(self, plan_id: str, record: str, new: bool = False):
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            row = self._conn.execute("SELECT latest FROM plans WHERE plan_id = ?", (plan_id,)).fetchone()
+            if row is None and not new:
+                return None
+            version = (row[0] if row else 0) + 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO plans (plan_id, latest, last_access) VALUES (?, ?, ?)",
+                (plan_id, version, time.time()),
+            )
+            self._conn.execute(
+                "INSERT INTO plan_versions (plan_id, version, record) VALUES (?, ?, ?)",
+                (plan_id, version, record),
+            )
+        return version
+
+    def get(self, plan_id: str, version: int = None):
+        if version is None:
+            row = self._conn.execute(
+                "SELECT v.version, v.record FROM plans p JOIN plan_versions v"
+                " ON v.plan_id = p.plan_id AND v.version = p.latest WHERE p.plan_id = ?",
+                (plan_id,),
+            ).fetchone()
+        else:
+            row = self._conn.execute(
+                "SELECT version, record FROM plan_versions WHERE plan_id = ? AND version = ?", (plan_id, version)
+            ).fetchone()
+        if row is not None:
+            self._conn.execute("UPDATE plans SET last_access = ? WHERE plan_id = ?", (time.time(), plan_id))
+        return tuple(row) if row else None
+
+    def versions(self, plan_id: str):
+        rows = self._conn.execute(
+            "SELECT record FROM plan_versions WHERE plan_id = ? ORDER BY version", (plan_id,)
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    def evict_lru(self) -> bool:
+        row = self._conn.execute("SELECT plan_id FROM plans ORDER BY last_access LIMIT 1").fetchone()
+        if row is None:
+            return False
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DELETE FROM plan_versions WHERE plan_id = ?", (row[0],))
+            self._conn.execute("DELETE FROM plans WHERE plan_id = ?", (row[0],))
+        return True
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM plans").fetchone()[0]
+
+
+class PlanStore:
+
+    def __init__(self, backend, max_plans: int):
+        self.backend = backend
+        self.max_plans = max_plans
+        self._lock = threading.Lock()
+        self.created = 0
+        self.versions_added = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def create(self, plan: dict, validation: dict = None) -> tuple:
+        """Store a new plan as version 1; returns (plan_id, version)."""
+        plan_id = secrets.token_hex(8)
+        version = self._append(plan_id, plan, validation, None, new=True)
+        with self._lock:
+            self.created += 1
+            while self.backend.count() > self.max_plans and self.backend.evict_lru():
+                self.evictions += 1
+        return plan_id, version
+
+    def add_version(self, plan_id: str, plan: dict, validation: dict = None, instruction: str = None):
+        """
+        Store the next version of an existing plan; returns its number, or
+        None when the plan is no longer stored (evicted) — nothing is stored then.
+        """
+        version = self._append(plan_id, plan, validation, instruction)
+        if version is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.versions_added += 1
+        return version
+
+    def _append(self, plan_id: str, plan: dict, validation, instruction, new: bool = False):
+        record = json.dumps({
+            "plan": plan,
+            "section_hashes": [section_hash(s) for s in plan_sections(plan)],
+            "validation": validation,
+            "instruction": instruction,
+            "created_at": time.time(),
+        }, ensure_ascii=False)
+        with self._lock:
+            return self.backend.append(plan_id, record, new)
+
+    def get(self, plan_id: str, version: int = None):
+        """
+        The stored record {plan, section_hashes, validation, instruction,
+        created_at, version} for one version (latest by default), or None.
+        Decoded fresh each call.
+        """
+        with self._lock:
+            found = self.backend.get(plan_id, version)
+            if found is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        version, text = found
+        record = json.loads(text)
+        record["version"] = version
+        return record
+
+    def history(self, plan_id: str):
+        """Version summaries, oldest first (empty list for unknown plans)."""
+        with self._lock:
+            texts = self.backend.versions(plan_id)
+        summaries = []
+        for version, text in enumerate(texts, start=1):
+            record = json.loads(text)
+            summaries.append({
+                "version": version,
+                "created_at": record.get("created_at"),
+                "instruction": record.get("instruction"),
+                "validation_status": (record.get("validation") or {}).get("status"),
+            })
+        return summaries
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.backend).__name__,
+                "plans": self.backend.count(),
+                "max_plans": self.max_plans,
+                "created": self.created,
+                "versions_added": self.versions_added,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _build_backend():
+    if PLAN_STORE_BACKEND == "sqlite":
+        try:
+            return SQLitePlanBackend(PLAN_STORE_PATH)
+        except Exception as e:
+            logger.warning("SQLite plan store unavailable (%s); using memory backend", e)
+    return MemoryPlanBackend()
+
+
+plan_store = PlanStore(_build_backend(), max_plans=PLAN_STORE_MAX_PLANS)
+
+
+def with_plan_ref(plan: dict, plan_id: str, version: int) -> dict:
+    """The response body: the stored plan plus the reference to it."""
+    return {**plan, "plan_id": plan_id, "plan_version": version}
+
+
+def strip_plan_ref(plan: dict) -> dict:
+    return {k: v for k, v in plan.items() if k not in ("plan_id", "plan_version")}
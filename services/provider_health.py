@@ -0,0 +1,220 @@
+"""
+Provider health — rolling error rate, latency percentiles, circuit breaker
+Every LLM provider gets one ProviderHealth. Outcomes of the last
+PROVIDER_HEALTH_WINDOW calls decide whether the provider is usable:
+
+  closed     normal routing
+  open       error rate crossed the threshold (or quota ran out); skipped
+             until the cooldown has passed
+  half_open  cooldown over; exactly one probe request is let through —
+             success closes the circuit, failure re-opens it
+
+All state changes happen under a lock, so concurrent requests (and the
+thread-pool fallback of the Gemini SDK) see a consistent view.
+"""
+
+import os
+import math
+import time
+import threading
+from collections import deque
+
+PROVIDER_HEALTH_WINDOW = int(os.getenv("PROVIDER_HEALTH_WINDOW", "50"))
+PROVIDER_ERROR_THRESHOLD = float(os.getenv("PROVIDER_ERROR_THRESHOLD", "0.5"))
+PROVIDER_MIN_SAMPLES = int(os.getenv("PROVIDER_MIN_SAMPLES", "5"))
+PROVIDER_COOLDOWN_SECONDS = float(os.getenv("PROVIDER_COOLDOWN_SECONDS", "30"))
+# quota errors usually mean "come back in a minute or more"
+PROVIDER_QUOTA_COOLDOWN_SECONDS = float(os.getenv("PROVIDER_QUOTA_COOLDOWN_SECONDS", "120"))
+# "fastest" orders healthy providers by median latency, "ordered" keeps the static order
+LLM_ROUTING = os.getenv("LLM_ROUTING", "fastest").lower()
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _percentile(values, pct: float):
+    """Nearest-rank percentile of an unsorted sequence (None when empty)."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered), math.ceil(pct / 100 * len(ordered))) - 1)
+    return ordered[rank]
+
+
+class ProviderHealth:
+
+    def __init__(self, name: str, clock=time.monotonic):
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=PROVIDER_HEALTH_WINDOW)
+        self._latencies = deque(maxlen=PROVIDER_HEALTH_WINDOW)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._cooldown = 0.0
+        self._probe_in_flight = False
+        self.successes = 0
+        self.failures = 0
+        self.times_opened = 0
+        self.probes = 0
+        self.last_error = None
+
+    # =================================================
+    # ADMISSION
+    # =================================================
+    def allow_request(self) -> bool:
+        """
+        True if a request may be sent now. In half-open state only one
+        caller gets True (the probe) until its outcome is recorded.
+        """
+        with self._lock:
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self._cooldown:
+                    return False
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            if self._state == HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+                self.probes += 1
+            return True
+
+    # =================================================
+    # OUTCOMES
+    # =================================================
+    def record_success(self, latency: float):
+        with self._lock:
+            self.successes += 1
+            if self._state != CLOSED:
+                # recovered: forget the errors that opened the circuit
+                self._outcomes.clear()
+                self._state = CLOSED
+                self._probe_in_flight = False
+            self._outcomes.append(True)
+            self._latencies.append(latency)
+
+    def record_failure(self, error, quota: bool = False):
+        with self._lock:
+            self.failures += 1
+            self.last_error = str(error)[:300]
+            self._outcomes.append(False)
+            if self._state == HALF_OPEN:
+                self._open(PROVIDER_QUOTA_COOLDOWN_SECONDS if quota else PROVIDER_COOLDOWN_SECONDS)
+            elif self._state == CLOSED:
+                if quota:
+                    self._open(PROVIDER_QUOTA_COOLDOWN_SECONDS)
+                elif (
+                    len(self._outcomes) >= PROVIDER_MIN_SAMPLES
+                    and self._error_rate() >= PROVIDER_ERROR_THRESHOLD
+                ):
+                    self._open(PROVIDER_COOLDOWN_SECONDS)
+
+    def release(self):
+        """A request ended without an outcome (cancelled): free the probe slot."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _open(self, cooldown: float):
+        self._state = OPEN
+        self._opened_at = self._clock()
+        self._cooldown = cooldown
+        self._probe_in_flight = False
+        self.times_opened += 1
+
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    # =================================================
+    # INSPECTION
+    # =================================================
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self._cooldown:
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def latency_samples(self) -> int:
+        with self._lock:
+            return len(self._latencies)
+
+    def latency_percentile(self, pct: float):
+        with self._lock:
+            return _percentile(list(self._latencies), pct)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            latencies = list(self._latencies)
+            retry_in = 0.0
+            if self._state == OPEN:
+                retry_in = max(0.0, self._cooldown - (self._clock() - self._opened_at))
+            return {
+                "state": HALF_OPEN if self._state == OPEN and retry_in == 0 else self._state,
+                "retry_in_seconds": round(retry_in, 1),
+                "window": len(self._outcomes),
+                "error_rate": round(self._error_rate(), 3),
+                "latency_p50": _round(_percentile(latencies, 50)),
+                "latency_p90": _round(_percentile(latencies, 90)),
+                "latency_p99": _round(_percentile(latencies, 99)),
+                "successes": self.successes,
+                "failures": self.failures,
+                "times_opened": self.times_opened,
+                "probes": self.probes,
+                "last_error": self.last_error,
+            }
+
+
+def _round(value):
+    return round(value, 3) if value is not None else None
+
+
+class ProviderHealthRegistry:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._providers = {}
+
+    def get(self, name: str) -> ProviderHealth:
+        with self._lock:
+            health = self._providers.get(name)
+            if health is None:
+                health = self._providers[name] = ProviderHealth(name)
+            return health
+
+    def rank(self, names):
+        """
+        Order candidate providers for one request without side effects:
+        providers that are not open first — fastest median latency first under
+        LLM_ROUTING=fastest, unmeasured ones after the measured ones in their
+        configured order — then open ones. Admission is still checked per
+        attempt via allow_request().
+        """
+        names = list(names)
+        usable = [name for name in names if self.get(name).state != OPEN]
+        if LLM_ROUTING == "fastest":
+            def speed(name):
+                # an unmeasured provider must not jump ahead of the configured primary
+                p50 = self.get(name).latency_percentile(50)
+                return float("inf") if p50 is None else p50
+            usable.sort(key=speed)
+        return usable + [name for name in names if name not in usable]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            providers = dict(self._providers)
+        return {
+            "routing": LLM_ROUTING,
+            "providers": {name: health.snapshot() for name, health in providers.items()},
+        }
+
+    def reset(self):
+        with self._lock:
+            self._providers.clear()
+
+
+provider_health = ProviderHealthRegistry()
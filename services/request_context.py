@@ -0,0 +1,125 @@
+"""
+Request Context — per-request scheduling hints carried by contextvars
+Endpoints declare what kind of work a request is (its priority class) and,
+optionally, by when it must be done. Every call_llm made while serving the
+request — including from tasks it spawns, which copy the context — sees
+those values without threading them through each agent's signature.
+
+  interactive  a user waiting on a small edit (/refine-plan)
+  generate     a full /generate run (the default)
+  validation   LLM review stages of a generate run
+  background   batch generation and other work nobody is watching live
+
+A deadline bounds the whole request: call_llm cancels provider calls that
+would run past it, and optional stages (the LLM validator) are skipped when
+too little time is left.
+"""
+
+import time
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+INTERACTIVE = "interactive"
+GENERATE = "generate"
+VALIDATION = "validation"
+BACKGROUND = "background"
+
+PRIORITY_CLASSES = (INTERACTIVE, GENERATE, VALIDATION, BACKGROUND)
+
+# callers whose deadlines are at most this far apart may share one execution
+DEADLINE_BUCKET_SECONDS = 5.0
+
+
+class DeadlineExceeded(Exception):
+    """The request's deadline passed before the work could finish."""
+
+
+_priority = ContextVar("llm_priority", default=None)
+_deadline = ContextVar("llm_deadline", default=None)
+
+
+def request_priority() -> str:
+    return _priority.get() or GENERATE
+
+
+@contextmanager
+def use_priority(name: str):
+    """Run the block (and tasks it spawns) in priority class `name`."""
+    if name not in PRIORITY_CLASSES:
+        raise Exception(f"Unknown priority class: {name!r}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+@contextmanager
+def stage_priority(name: str):
+    """Like use_priority, but only when the entry point chose no class
+    (a batch's validation stays background, a refine's stays interactive)."""
+    if _priority.get() is not None:
+        yield
+        return
+    with use_priority(name):
+        yield
+
+
+def request_deadline():
+    """Monotonic time by which the current request must finish, or None."""
+    return _deadline.get()
+
+
+@contextmanager
+def use_deadline(seconds: float):
+    """Give the block `seconds` from now; an outer, earlier deadline still wins."""
+    deadline = time.monotonic() + seconds
+    outer = _deadline.get()
+    token = _deadline.set(deadline if outer is None else min(outer, deadline))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def reserve_time(seconds: float):
+    """Finish the block `seconds` before the request deadline (no-op without one),
+    keeping time for the stages that follow."""
+    deadline = _deadline.get()
+    if deadline is None:
+        yield
+        return
+    token = _deadline.set(deadline - seconds)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time():
+    """Seconds left before the request deadline (may be negative), or None."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def sharing_key() -> str:
+    """
+    What a shared (single-flight) execution inherits from the caller that
+    started it and must match for others to join: the priority class. The
+    deadline is inherited too; SingleFlight compares it directly.
+    """
+    return request_priority()
+
+
+async def within_deadline(awaitable, what: str):
+    """Await `awaitable` until the current request's deadline, then raise DeadlineExceeded
+    (a shared execution started by another caller may run on a little longer)."""
+    remaining = remaining_time()
+    if remaining is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(remaining, 0))
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(f"{what} did not finish within the remaining {max(remaining, 0):.1f}s")
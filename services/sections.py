@@ -0,0 +1,48 @@
+"""
+Plan Sections — per-semester / per-phase content hashes
+A plan is a list of sections (semesters or roadmap phases) plus a few
+top-level fields. Hashing each section lets refinement reuse validation
+and formatting work for every section it did not touch.
+"""
+
+import hashlib
+
+from services.llm_cache import canonical_json
+
+# fields the formatter adds; they do not change what a section teaches
+FORMATTER_FIELDS = ("video_url",)
+
+
+def section_list_key(plan: dict):
+    """'roadmap', 'semesters' or None."""
+    if not isinstance(plan, dict):
+        return None
+    if plan.get("roadmap"):
+        return "roadmap"
+    if plan.get("semesters"):
+        return "semesters"
+    return None
+
+
+def plan_sections(plan: dict):
+    key = section_list_key(plan)
+    return list(plan.get(key) or []) if key else []
+
+
+def _strip(value):
+    if isinstance(value, dict):
+        return {k: _strip(v) for k, v in value.items() if k not in FORMATTER_FIELDS}
+    if isinstance(value, list):
+        return [_strip(v) for v in value]
+    return value
+
+
+def section_hash(section) -> str:
+    """Hash of the exact section, formatter output included."""
+    return hashlib.sha256(canonical_json(section).encode("utf-8")).hexdigest()[:24]
+
+
+def content_hash(value) -> str:
+    """Hash of what a section teaches: formatter-added fields are ignored,
+    so a raw section and its formatted copy hash the same."""
+    return section_hash(_strip(value))
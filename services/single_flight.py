@@ -0,0 +1,102 @@
+"""
+Single-flight — coalesce identical in-flight async calls
+The first caller for a key starts the work; everyone who arrives with the
+same key before it finishes awaits that same execution. Each caller gets its
+own deep copy of the result, so downstream mutation stays private.
+A caller that is cancelled leaves the execution running for the others; when
+the last one is cancelled the execution is cancelled too, unless the flight
+was created with finish_abandoned=True.
+A caller that passes a deadline only joins an execution started with a
+deadline at most DEADLINE_BUCKET_SECONDS away from its own; otherwise it
+starts one of its own under the same key.
+"""
+
+import os
+import copy
+import asyncio
+
+from services.request_context import DEADLINE_BUCKET_SECONDS
+
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() in ("1", "true", "yes")
+
+
+class _Flight:
+
+    def __init__(self, task, deadline):
+        self.task = task
+        self.deadline = deadline
+        self.awaiters = 0
+
+    def accepts(self, deadline) -> bool:
+        if self.deadline is None or deadline is None:
+            return self.deadline is None and deadline is None
+        return abs(self.deadline - deadline) <= DEADLINE_BUCKET_SECONDS
+
+
+class SingleFlight:
+
+    def __init__(self, name: str, finish_abandoned: bool = False):
+        self.name = name
+        self.finish_abandoned = finish_abandoned
+        self._inflight = {}   # key -> executions in flight, one per deadline window
+        self.executions = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def do(self, key: str, fn, deadline: float = None):
+        """Run `fn()` once per key among concurrent callers and share the result."""
+        if not SINGLE_FLIGHT_ENABLED:
+            return await fn()
+
+        flights = self._inflight.setdefault(key, [])
+        flight = next((f for f in flights if f.accepts(deadline)), None)
+        if flight is None:
+            self.executions += 1
+            flight = _Flight(asyncio.ensure_future(fn()), deadline)
+            flights.append(flight)
+            flight.task.add_done_callback(lambda t: self._finish(key, flight))
+        else:
+            self.coalesced += 1
+
+        flight.awaiters += 1
+        try:
+            # shield: a caller going away must not cancel the others' execution
+            result = await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.awaiters == 1 and not flight.task.done():
+                self._abandon(key, flight)
+            raise
+        finally:
+            flight.awaiters -= 1
+        return copy.deepcopy(result)
+
+    def _abandon(self, key: str, flight: _Flight):
+        """The last awaiter was cancelled: nobody is left to use the result."""
+        if self.finish_abandoned:
+            return
+        self.abandoned += 1
+        # a new caller starts afresh instead of joining the cancelled execution
+        self._drop(key, flight)
+        flight.task.cancel()
+
+    def _finish(self, key: str, flight: _Flight):
+        self._drop(key, flight)
+        # mark the exception retrieved even if every awaiter went away
+        if not flight.task.cancelled():
+            flight.task.exception()
+
+    def _drop(self, key: str, flight: _Flight):
+        flights = self._inflight.get(key, [])
+        if flight in flights:
+            flights.remove(flight)
+        if not flights:
+            self._inflight.pop(key, None)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": SINGLE_FLIGHT_ENABLED,
+            "in_flight": sum(len(flights) for flights in self._inflight.values()),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
@@ -0,0 +1,244 @@
+"""
+Structural Validator — deterministic curriculum checks, no LLM
+The mechanical half of validation: counts, ordering, week arithmetic and
+duplicates. Runs in microseconds and returns the same shape as
+validator_agent (status / issues / suggestions / metadata_warnings), so it
+can stand in for the LLM validator or run in front of it.
+"""
+
+import re
+
+DIFFICULTY_LEVELS = {"beginner": 1, "intermediate": 2, "advanced": 3}
+MIN_SKILLS = 2
+MAX_SKILLS = 4
+
+_WEEK_RANGE = re.compile(r"(\d+)\s*(?:-|–|—|to)\s*(\d+)")
+_SINGLE_WEEK = re.compile(r"(\d+)")
+
+
+def _level(difficulty):
+    if not isinstance(difficulty, str):
+        return None
+    return DIFFICULTY_LEVELS.get(difficulty.strip().lower())
+
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_week_range(text):
+    """'Week 1-8' → (1, 8), 'Week 5' → (5, 5), anything else → None."""
+    if not isinstance(text, str):
+        return None
+    m = _WEEK_RANGE.search(text)
+    if m:
+        return int(m.group(1)), int(m.group(2))
+    m = _SINGLE_WEEK.search(text)
+    if m:
+        return int(m.group(1)), int(m.group(1))
+    return None
+
+
+def _list(value) -> list:
+    return value if isinstance(value, list) else []
+
+
+def _objects(value, what: str, report) -> list:
+    """The JSON-object entries of a list; anything else is reported, not checked."""
+    if not isinstance(value, list):
+        report.malformed = True
+        report.issue(f"{what} is not a list", "Regenerate the plan")
+        return []
+    entries = [entry for entry in value if isinstance(entry, dict)]
+    if len(entries) != len(value):
+        report.malformed = True
+        report.issue(
+            f"{what} has {len(value) - len(entries)} entries that are not objects",
+            "Make every semester, course, phase and milestone a JSON object",
+        )
+    return entries
+
+
+def _topic_name(topic):
+    name = topic.get("name") if isinstance(topic, dict) else topic
+    return name.strip() if isinstance(name, str) else ""
+
+
+class _Report:
+
+    def __init__(self):
+        self.issues = []
+        self.suggestions = []
+        self.metadata_warnings = []
+        self.malformed = False
+
+    def issue(self, text: str, suggestion: str = None):
+        self.issues.append(text)
+        if suggestion and suggestion not in self.suggestions:
+            self.suggestions.append(suggestion)
+
+    def result(self) -> dict:
+        result = {
+            "status": "needs_revision" if self.issues else "approved",
+            "issues": self.issues,
+            "suggestions": self.suggestions,
+            "metadata_warnings": self.metadata_warnings,
+        }
+        if self.malformed:
+            # entries the formatter and renderers cannot read
+            result["malformed"] = True
+        return result
+
+
+# =====================================================
+# 🎓 SEMESTER FORMAT
+# =====================================================
+def _check_semesters(curriculum: dict, plan: dict, report: _Report):
+    semesters = _objects(curriculum.get("semesters"), "Semesters", report)
+
+    expected = _as_int((plan or {}).get("semesters"))
+    if expected and len(semesters) != expected:
+        report.issue(
+            f"Program has {len(semesters)} semesters but {expected} were requested",
+            f"Regenerate the program with exactly {expected} semesters",
+        )
+
+    numbers = [_as_int(s.get("semester")) for s in semesters]
+    if None not in numbers and numbers != list(range(1, len(semesters) + 1)):
+        report.issue(
+            f"Semester numbers are not sequential: {numbers}",
+            "Number semesters 1, 2, 3, ... in order",
+        )
+
+    previous_level = None
+    seen_topics = {}
+    for position, semester in enumerate(semesters, start=1):
+        number = semester.get("semester", position)
+        courses = _objects(semester.get("courses") or [], f"Semester {number} courses", report)
+        if not courses:
+            report.issue(f"Semester {number} has no courses", f"Add courses to Semester {number}")
+            continue
+
+        levels = []
+        for course in courses:
+            title = course.get("title") or "Untitled course"
+            level = _level(course.get("difficulty"))
+            if level is None:
+                report.metadata_warnings.append(f"Semester {number} — '{title}' has no recognised difficulty")
+            else:
+                levels.append(level)
+
+            skills = _list(course.get("skills"))
+            if not MIN_SKILLS <= len(skills) <= MAX_SKILLS:
+                report.issue(
+                    f"Semester {number} — '{title}' lists {len(skills)} skills (expected {MIN_SKILLS}-{MAX_SKILLS})",
+                    f"Give every course {MIN_SKILLS}-{MAX_SKILLS} concrete skills",
+                )
+            if not course.get("outcome_project"):
+                report.metadata_warnings.append(f"Semester {number} — '{title}' has no outcome_project")
+
+            _check_topics(_list(course.get("topics")), f"Semester {number} — '{title}'", seen_topics, report)
+
+        if levels:
+            level = sum(levels) / len(levels)
+            if previous_level is not None and level < previous_level:
+                report.issue(
+                    f"Semester {number} is easier on average than the semester before it",
+                    f"Move advanced courses out of earlier semesters or raise the difficulty of Semester {number}",
+                )
+            previous_level = level
+
+
+# =====================================================
+# 🧠 ROADMAP FORMAT
+# =====================================================
+def _check_roadmap(curriculum: dict, report: _Report):
+    phases = _objects(curriculum.get("roadmap"), "Roadmap phases", report)
+
+    total_weeks = _as_int(curriculum.get("total_weeks"))
+    durations = [_as_int(p.get("duration_weeks")) for p in phases]
+    if total_weeks is None:
+        report.metadata_warnings.append("Roadmap has no total_weeks")
+    elif None in durations:
+        report.metadata_warnings.append("Some phases have no duration_weeks")
+    elif sum(durations) != total_weeks:
+        report.issue(
+            f"Phase durations add up to {sum(durations)} weeks but total_weeks is {total_weeks}",
+            "Make phase duration_weeks sum to total_weeks",
+        )
+
+    next_week = 1
+    seen_topics = {}
+    for position, phase in enumerate(phases, start=1):
+        name = phase.get("phase") or f"Phase {position}"
+        span = parse_week_range(phase.get("weeks"))
+        if span is None:
+            report.metadata_warnings.append(f"{name} has no parsable week range")
+        else:
+            start, end = span
+            if start != next_week:
+                report.issue(
+                    f"{name} starts at week {start}, expected week {next_week}",
+                    "Keep phase week ranges sequential with no gaps or overlaps",
+                )
+            duration = _as_int(phase.get("duration_weeks"))
+            if duration is not None and end - start + 1 != duration:
+                report.issue(
+                    f"{name} spans weeks {start}-{end} but duration_weeks is {duration}",
+                    "Keep each phase's week range consistent with its duration_weeks",
+                )
+            next_week = end + 1
+
+        milestones = _objects(phase.get("milestones") or [], f"{name} milestones", report)
+        if not milestones:
+            report.issue(f"{name} has no milestones", f"Add milestones to {name}")
+        for milestone in milestones:
+            title = milestone.get("title") or "Untitled milestone"
+            if not milestone.get("skills"):
+                report.metadata_warnings.append(f"{name} — '{title}' lists no skills")
+            _check_topics(_list(milestone.get("topics")), f"{name} — '{title}'", seen_topics, report)
+
+
+# =====================================================
+# SHARED
+# =====================================================
+def _check_topics(topics, where: str, seen: dict, report: _Report):
+    for topic in topics:
+        name = _topic_name(topic)
+        if not name:
+            continue
+        key = name.lower()
+        if key in seen:
+            found = where if seen[key] == where else f"{seen[key]} and {where}"
+            report.issue(
+                f"Duplicate topic '{name}' in {found}",
+                "Replace repeated topics with new material or merge the duplicates",
+            )
+        else:
+            seen[key] = where
+
+
+def structural_validate(curriculum: dict, plan: dict = None) -> dict:
+    """
+    Check a curriculum's structure. `plan` (the generation input) adds checks
+    against what was requested, e.g. the semester count. Semesters, courses,
+    phases or milestones that are not objects are reported as issues and the
+    result gets `malformed: True`.
+    """
+    report = _Report()
+    if not isinstance(curriculum, dict):
+        report.malformed = True
+        report.issue("Curriculum is not a JSON object")
+    elif curriculum.get("roadmap"):
+        _check_roadmap(curriculum, report)
+    elif curriculum.get("semesters"):
+        _check_semesters(curriculum, plan, report)
+    else:
+        report.issue(
+            "Curriculum has neither 'semesters' nor 'roadmap'",
+            "Regenerate the plan",
+        )
+    return report.result()
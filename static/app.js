@@ -75,34 +75,10 @@ async function generate(){
     // AGENT ANIMATION
     // ========================
     planner.classList.add("agent-active");
-    await sleep(700);
-
-    planner.classList.remove("agent-active");
-    planner.classList.add("agent-done");
-
-    generator.classList.add("agent-active");
 
     try{
 
-        const res = await fetch("/generate",{
-            method:"POST",
-            headers:{
-                "Content-Type":"application/json"
-            },
-            body:JSON.stringify(payload)
-        });
-
-        const data = await res.json();
-
-        generator.classList.remove("agent-active");
-        generator.classList.add("agent-done");
-
-        validator.classList.add("agent-active");
-
-        await sleep(600);
-
-        validator.classList.remove("agent-active");
-        validator.classList.add("agent-done");
+        const data = await generateStreaming(payload, { planner, generator, validator });
 
         renderCurriculum(data);
         // Show refinement UI after rendering
@@ -116,15 +92,150 @@ async function generate(){
 }
 
 
+// ===============================
+// STREAMING GENERATION (SSE over fetch)
+// ===============================
+function markAgentDone(el){
+    el.classList.remove("agent-active");
+    el.classList.add("agent-done");
+}
+
+async function generateStreaming(payload, steps){
+
+    const res = await fetch("/generate/stream",{
+        method:"POST",
+        headers:{
+            "Content-Type":"application/json"
+        },
+        body:JSON.stringify(payload)
+    });
+
+    // Older proxies / browsers without streaming bodies → plain /generate
+    if(!res.ok || !res.body || !res.body.getReader){
+        return generateBlocking(payload, steps);
+    }
+
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+    let partial = null;
+    let result = null;
+
+    while(true){
+        const { value, done } = await reader.read();
+        if(done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE frames are separated by a blank line
+        let boundary;
+        while((boundary = buffer.indexOf("\n\n")) !== -1){
+            const frame = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = "message";
+            let dataText = "";
+            frame.split("\n").forEach(line => {
+                if(line.startsWith("event:")) event = line.slice(6).trim();
+                else if(line.startsWith("data:")) dataText += line.slice(5).trim();
+            });
+            const msg = dataText ? JSON.parse(dataText) : {};
+
+            if(event === "stage"){
+                if(msg.stage === "planner"){
+                    markAgentDone(steps.planner);
+                    steps.generator.classList.add("agent-active");
+                }else if(msg.stage === "generator"){
+                    markAgentDone(steps.generator);
+                    steps.validator.classList.add("agent-active");
+                }else if(msg.stage === "validator"){
+                    markAgentDone(steps.validator);
+                }
+            }
+            else if(event === "skeleton"){
+                partial = {
+                    program_title: msg.program_title,
+                    summary: msg.summary,
+                    total_weeks: msg.total_weeks,
+                    weekly_hours: msg.weekly_hours
+                };
+                if(msg.kind === "phase") partial.roadmap = new Array(msg.total).fill(null);
+                else partial.semesters = new Array(msg.total).fill(null);
+            }
+            else if(event === "reset"){
+                // fan-out failed: the single-call fallback resends every section
+                partial = null;
+            }
+            else if(event === "section"){
+                // single-call generation streams sections without a skeleton
+                if(!partial){
+                    partial = {};
+                    if(msg.kind === "phase") partial.roadmap = [];
+                    else partial.semesters = [];
+                }
+                const list = msg.kind === "phase" ? partial.roadmap : partial.semesters;
+                list[msg.index] = msg.section;
+                // render what has arrived so far, in program order
+                const shown = Object.assign({}, partial);
+                if(partial.roadmap) shown.roadmap = partial.roadmap.filter(Boolean);
+                else shown.semesters = partial.semesters.filter(Boolean);
+                renderCurriculum(shown, { partial: true });
+            }
+            else if(event === "result"){
+                result = msg;
+            }
+            else if(event === "error"){
+                throw new Error(msg.detail || "Generation failed");
+            }
+        }
+    }
+
+    if(!result){
+        throw new Error("Stream ended before the curriculum was complete");
+    }
+
+    [steps.planner, steps.generator, steps.validator].forEach(markAgentDone);
+    return result;
+}
+
+async function generateBlocking(payload, steps){
+
+    markAgentDone(steps.planner);
+    steps.generator.classList.add("agent-active");
+
+    const res = await fetch("/generate",{
+        method:"POST",
+        headers:{
+            "Content-Type":"application/json"
+        },
+        body:JSON.stringify(payload)
+    });
+
+    const data = await res.json();
+
+    markAgentDone(steps.generator);
+    steps.validator.classList.add("agent-active");
+
+    await sleep(600);
+
+    markAgentDone(steps.validator);
+    return data;
+}
+
+
 
 // ===============================
 // RENDER RESULT
 // ===============================
-function renderCurriculum(data){
+function renderCurriculum(data, options){
+
+    // partial = sections still streaming in: no downloads, don't store yet
+    const partial = !!(options && options.partial);
 
     let html = "";    
     // Store data globally FIRST for download buttons
-    window.currentCurriculumData = data;
+    if(!partial){
+        window.currentCurriculumData = data;
+    }
     
     // === DETAILED DEBUG LOGGING ===
     console.log("=== RENDER CURRICULUM DEBUG ===");
@@ -159,7 +270,7 @@ function renderCurriculum(data){
     // � PERSONAL ROADMAP MODE (NEW)
     // =====================================================
     if(data.roadmap){
-        renderPersonalRoadmap(data);
+        renderPersonalRoadmap(data, partial);
         return;
     }
 
@@ -175,7 +286,9 @@ function renderCurriculum(data){
         resultDiv.innerHTML = "";
 
         // Add download bar
-        resultDiv.appendChild(createDownloadBar(data));
+        if(!partial){
+            resultDiv.appendChild(createDownloadBar(data));
+        }
 
         // Create HTML content
         const contentDiv = document.createElement("div");
@@ -255,7 +368,7 @@ function renderCurriculum(data){
 // ===============================
 // RENDER PERSONAL ROADMAP
 // ===============================
-function renderPersonalRoadmap(data){
+function renderPersonalRoadmap(data, partial){
 
     let html = "";
 
@@ -274,7 +387,9 @@ function renderPersonalRoadmap(data){
     resultDiv.innerHTML = "";
 
     // Add download bar
-    resultDiv.appendChild(createDownloadBar(data));
+    if(!partial){
+        resultDiv.appendChild(createDownloadBar(data));
+    }
 
     // Create HTML content
     const contentDiv = document.createElement("div");
@@ -401,18 +516,14 @@ function downloadPDF(data, event) {
     const originalText = btn ? btn.textContent : "";
     if(btn){ btn.textContent = "Generating PDF..."; btn.disabled = true; }
     
-    // Log what we're sending to backend
-    const payloadToSend = { curriculum: data };
+    // Stored plans are referenced by ID; the server still has them validated and formatted
+    const payloadToSend = data.plan_id
+        ? { plan_id: data.plan_id, version: data.plan_version }
+        : { curriculum: data };
     console.log("Sending to /export-pdf:", payloadToSend);
     
     // POST to backend PDF generator
-    fetch("/export-pdf", {
-        method: "POST",
-        headers: {
-            "Content-Type": "application/json"
-        },
-        body: JSON.stringify(payloadToSend)
-    })
+    postWithPlanFallback("/export-pdf", payloadToSend, { curriculum: data })
     .then(response => {
         if (!response.ok) {
             throw new Error(`HTTP error! status: ${response.status}`);
@@ -467,6 +578,23 @@ function createDownloadBar(data){
 }
 
 
+// POST a plan reference; if the server no longer has the plan (404),
+// resend the request with the full plan body instead.
+async function postWithPlanFallback(url, payload, fullPayload){
+    const post = body => fetch(url, {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify(body)
+    });
+    const response = await post(payload);
+    if(response.status === 404 && payload.plan_id){
+        console.warn("Stored plan not found, sending the full plan");
+        return post(fullPayload);
+    }
+    return response;
+}
+
+
 // ===============================
 // REFINEMENT UI HANDLERS
 // ===============================
@@ -501,11 +629,14 @@ async function refinePlan(){
         btn.disabled = true;
         btn.textContent = "Refining...";
 
-        const res = await fetch('/refine-plan',{
-            method: 'POST',
-            headers: { 'Content-Type': 'application/json' },
-            body: JSON.stringify({ instruction: instruction, current_plan: window.currentCurriculumData })
-        });
+        const current = window.currentCurriculumData;
+        const fullPayload = { instruction: instruction, current_plan: current };
+        const res = await postWithPlanFallback('/refine-plan',
+            current.plan_id
+                ? { instruction: instruction, plan_id: current.plan_id, version: current.plan_version }
+                : fullPayload,
+            fullPayload
+        );
 
         if(!res.ok){
             const err = await res.text();